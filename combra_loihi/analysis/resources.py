@@ -0,0 +1,345 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the static Loihi resource estimator.
+
+A network is described by compartment groups and connection masks (destination x source, the
+layout of connectionMask) without nxsdk. Compartments are packed in order on cores within the
+per-core limits below, which gives the core count and the occupancy of every core in
+milliseconds, before the NxSDK compile. Output axons depend on the cores of the destinations, so
+the packing is repeated with the output axons of every compartment counted on the previous one.
+The limits are those of a Loihi core and the synapse memory model is an approximation, the
+estimate is meant to reject or resize configurations.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+CORE_COMPARTMENTS = 1024
+CORE_INPUT_AXONS = 4096
+CORE_OUTPUT_AXONS = 4096
+CORE_SYNAPSE_BITS = 16384 * 64
+CORE_COMPARTMENT_PROTOTYPES = 32
+CHIP_CORES = 128
+# bits of the target compartment index stored with every synapse next to the weight
+SYNAPSE_INDEX_BITS = 10
+# packings at most tried while output axons of a core exceed the limit
+PACKING_ROUNDS = 8
+
+
+class NetworkDescription:
+    def __init__(self):
+        """
+        Compartment groups and connections of a network
+        """
+        self.groups = {}
+        self.group_order = []
+        self.connections = []
+
+    def addGroup(self, name: str, size: int, prototypes=1, spikeGenerator=False):
+        """
+        Add a group of compartments, or of spike generator ports
+
+        :param name: name of the group
+        :param size: number of compartments or ports
+        :param prototypes: number of distinct compartment prototypes of the group
+        :param spikeGenerator: True for spike generator ports, they use no compartment
+        :return:
+        """
+        assert name not in self.groups
+        self.groups[name] = {'size': size, 'prototypes': prototypes, 'spike_generator': spikeGenerator}
+        self.group_order.append(name)
+
+    def addConnection(self, name: str, source: str, destination: str, connectionMask=1, numWeightBits=8):
+        """
+        Add a connection between two groups
+
+        :param name: name of the connection
+        :param source: name of the source group
+        :param destination: name of the destination group
+        :param connectionMask: int for full connection, numpy or scipy.sparse (destination, source)
+        :param numWeightBits: weight bits of the connection prototype
+        :return:
+        """
+        shape = (self.groups[destination]['size'], self.groups[source]['size'])
+        if isinstance(connectionMask, int):
+            mask = sp.csr_matrix(np.ones(shape, dtype=np.int8))
+        else:
+            mask = sp.csr_matrix(connectionMask != 0 if sp.issparse(connectionMask)
+                                 else np.asarray(connectionMask) != 0, dtype=np.int8)
+        assert mask.shape == shape
+        self.connections.append({'name': name, 'source': source, 'destination': destination,
+                                 'mask': mask, 'weight_bits': numWeightBits})
+
+
+def astrocyte_description(description: NetworkDescription, n=1, prefix='astro', prototypes=None):
+    """
+    Add the compartments and internal connections of n astrocytes
+
+    :param description: NetworkDescription
+    :param n: number of astrocytes
+    :param prefix: prefix of the group names, groups are prefix_sr, prefix_ip3, prefix_sic and prefix_sg
+    :param prototypes: role -> number of distinct prototypes, e.g. from PrototypeRegistry.counts(), default 1
+    :return: description
+    """
+    prototypes = prototypes if prototypes is not None else {}
+    diagonal = sp.identity(n, dtype=np.int8, format='csr')
+    for role in ('sr', 'ip3', 'sic', 'sg'):
+        description.addGroup(prefix + '_' + role, n, prototypes.get(role, 1))
+    description.addConnection(prefix + '_sr2ip3', prefix + '_sr', prefix + '_ip3', diagonal)
+    description.addConnection(prefix + '_ip32sic', prefix + '_ip3', prefix + '_sic', diagonal)
+    return description
+
+
+def feedforward_nan_description(pre_num: int, post_num: int, pre_post_mask=1, astro_input_mask=1,
+                                astro_output_mask=1, astrocytes=1, prototypes=None):
+    """
+    Describe a FeedforwardNAN network
+
+    :param pre_num: number of presynaptic neurons
+    :param post_num: number of postsynaptic neurons
+    :param pre_post_mask: mask (post_num, pre_num) of the pre to post connection
+    :param astro_input_mask: mask (astrocytes, pre_num) given to connectInputNeurons
+    :param astro_output_mask: mask (post_num, astrocytes) given to connectOutputNeurons
+    :param astrocytes: number of astrocytes
+    :param prototypes: role -> number of distinct astrocyte prototypes
+    :return: description
+    """
+    description = NetworkDescription()
+    description.addGroup('pre', pre_num, prototypes=0, spikeGenerator=True)
+    description.addGroup('post', post_num)
+    astrocyte_description(description, astrocytes, prototypes=prototypes)
+    description.addConnection('pre_2_post', 'pre', 'post', pre_post_mask)
+    description.addConnection('astro_input', 'pre', 'astro_sr', astro_input_mask)
+    description.addConnection('astro_output', 'astro_sg', 'post', astro_output_mask)
+    return description
+
+
+def describe_feedforward_nan(nan, prototypes=None):
+    """
+    Describe a built FeedforwardNAN from its attributes, nxsdk is not needed
+
+    :param nan: FeedforwardNAN (or an object with the same attributes)
+    :param prototypes: role -> number of distinct astrocyte prototypes, e.g. AstrocytePopulation.prototypeCounts()
+    :return: description
+    """
+    astrocyte = nan.astrocyte
+    input_mask = astrocyte.astrocyte_input_mask if astrocyte.astrocyte_input_mask is not None else 1
+    output_mask = astrocyte.astrocyte_output_mask if astrocyte.astrocyte_output_mask is not None else 1
+    return feedforward_nan_description(nan.pre_num, nan.post_num, nan.pre_2_post_mask, input_mask, output_mask,
+                                       astrocytes=getattr(astrocyte, 'n', 1), prototypes=prototypes)
+
+
+def _pack_cores(synapses, bits_cumsum, prototypes_cumsum, group_prototypes, group_of_compartment,
+                outputs_cumsum=None):
+    """
+    Pack compartments in order, a core is closed when the next compartment would exceed the
+    compartment, synapse memory, input axon, output axon or prototype limit. Synapse memory,
+    output axons and prototypes are cumulative sums searched for the end of every core, input
+    axons are only counted on the compartments left, from the first synapse of every source in that block
+
+    :param synapses: csr_matrix (compartments x sources) of all synapses
+    :param bits_cumsum: cumulative synapse bits of the compartments with a leading zero
+    :param prototypes_cumsum: cumulative new prototypes of the compartments with a leading zero
+    :param group_prototypes: number of prototypes of every compartment group
+    :param group_of_compartment: group index of every compartment
+    :param outputs_cumsum: cumulative output axons of the compartments with a leading zero, None for no limit
+    :return: core_bounds: first compartment of every core and the compartment number
+    :return: core_bits: synapse bits of every core
+    :return: core_inputs: input axons of every core
+    :return: core_prototypes: prototypes of every core
+    """
+    compartment_num = synapses.shape[0]
+    core_bounds = [0]
+    core_bits = []
+    core_inputs = []
+    core_prototypes = []
+    start = 0
+    block_size = 1
+    # scratch of the first synapse of every source inside the current block
+    first_synapse = np.zeros(synapses.shape[1], dtype=np.int64)
+    while start < compartment_num:
+        first_prototypes = group_prototypes[group_of_compartment[start]]
+        stop = min(start + CORE_COMPARTMENTS, compartment_num)
+        stop = min(stop, np.searchsorted(bits_cumsum, bits_cumsum[start] + CORE_SYNAPSE_BITS, side='right') - 1)
+        stop = min(stop, np.searchsorted(prototypes_cumsum, prototypes_cumsum[start + 1] - first_prototypes
+                                         + CORE_COMPARTMENT_PROTOTYPES, side='right') - 1)
+        if outputs_cumsum is not None:
+            stop = min(stop, np.searchsorted(outputs_cumsum, outputs_cumsum[start] + CORE_OUTPUT_AXONS,
+                                             side='right') - 1)
+        stop = max(stop, start + 1)
+        """
+        count input axons on a block one compartment longer than the last core, doubled until the
+        limit is hit: reversed assignment leaves the first synapse of every source in the scratch
+        """
+        block_size = min(block_size, stop - start)
+        while True:
+            indptr = synapses.indptr[start:start + block_size + 1]
+            sources = synapses.indices[indptr[0]:indptr[-1]]
+            positions = np.arange(sources.shape[0])
+            first_synapse[sources[::-1]] = positions[::-1]
+            new_input_cumsum = np.zeros(sources.shape[0] + 1, dtype=np.int64)
+            np.cumsum(first_synapse[sources] == positions, out=new_input_cumsum[1:])
+            inputs_cumsum = new_input_cumsum[indptr[1:] - indptr[0]]
+            over = np.nonzero(inputs_cumsum[1:] > CORE_INPUT_AXONS)[0]
+            if over.shape[0] > 0:
+                stop = start + 1 + over[0]
+                break
+            if start + block_size == stop:
+                break
+            block_size = min(2 * block_size, stop - start)
+        block_size = stop - start + 1
+        core_bounds.append(stop)
+        core_bits.append(bits_cumsum[stop] - bits_cumsum[start])
+        core_inputs.append(inputs_cumsum[stop - start - 1])
+        core_prototypes.append(first_prototypes + prototypes_cumsum[stop] - prototypes_cumsum[start + 1])
+        start = stop
+    return np.array(core_bounds, dtype=np.int64), core_bits, core_inputs, core_prototypes
+
+
+def _compartment_outputs(targets, core_of_compartment):
+    """
+    Output axons of every compartment, one per destination core of its synapses
+
+    :param targets: csr_matrix (compartments x compartments) of the destinations of every compartment, sorted indices
+    :param core_of_compartment: core of every compartment
+    :return: outputs: number of destination cores of every compartment
+    """
+    cores = core_of_compartment[targets.indices]
+    new_core = np.ones(cores.shape[0], dtype=bool)
+    new_core[1:] = cores[1:] != cores[:-1]
+    new_core[targets.indptr[:-1][np.diff(targets.indptr) > 0]] = True
+    new_core_cumsum = np.zeros(cores.shape[0] + 1, dtype=np.int64)
+    np.cumsum(new_core, out=new_core_cumsum[1:])
+    return new_core_cumsum[targets.indptr[1:]] - new_core_cumsum[targets.indptr[:-1]]
+
+
+def estimate_resources(description: NetworkDescription):
+    """
+    Count the resources of a network and pack its compartments on cores. The cost is linear in
+    the number of synapses with one Python iteration per core and packing, e.g. 0.1 s for 200k
+    compartments with 800k synapses, 0.8 s for 10M random synapses and 1.1 s for a dense 3000 x 3000
+    connection, where output axons limit the source cores and the packing is repeated
+
+    :param description: NetworkDescription
+    :return: report: dict of compartments, synapses, fan_in, fan_out, prototypes, weight_bits,
+             cores, chips and core_occupancy (cores x [compartments, synapse memory, input axons,
+             output axons, prototypes] as fractions of the core limits). fits is False over one chip or when a core
+             stays over a limit, e.g. a compartment alone over the output axon limit
+    """
+    """
+    global compartment and axon source indexes of the groups
+    """
+    compartment_offset = {}
+    source_offset = {}
+    compartment_num = 0
+    source_num = 0
+    for name in description.group_order:
+        group = description.groups[name]
+        source_offset[name] = source_num
+        source_num += group['size']
+        if not group['spike_generator']:
+            compartment_offset[name] = compartment_num
+            compartment_num += group['size']
+    group_of_compartment = np.zeros(compartment_num, dtype=np.int64)
+    compartment_groups = [name for name in description.group_order if name in compartment_offset]
+    for num, name in enumerate(compartment_groups):
+        start = compartment_offset[name]
+        group_of_compartment[start:start + description.groups[name]['size']] = num
+    """
+    one sparse (compartments x sources) matrix of all synapses, and the synapse bits of every compartment
+    """
+    rows = []
+    cols = []
+    synapse_bits = np.zeros(compartment_num, dtype=np.int64)
+    report = {'synapses': {}, 'fan_in': {}, 'fan_out': {}, 'weight_bits': {}}
+    for connection in description.connections:
+        mask = connection['mask']
+        coo = mask.tocoo()
+        rows.append(coo.row.astype(np.int64) + compartment_offset[connection['destination']])
+        cols.append(coo.col.astype(np.int64) + source_offset[connection['source']])
+        in_degree = np.diff(mask.indptr)
+        out_degree = np.bincount(mask.indices, minlength=mask.shape[1])
+        start = compartment_offset[connection['destination']]
+        synapse_bits[start:start + mask.shape[0]] += in_degree * (connection['weight_bits'] + SYNAPSE_INDEX_BITS)
+        report['synapses'][connection['name']] = int(mask.nnz)
+        report['fan_in'][connection['name']] = (int(in_degree.max(initial=0)), float(in_degree.mean()))
+        report['fan_out'][connection['name']] = (int(out_degree.max(initial=0)), float(out_degree.mean()))
+        report['weight_bits'][connection['name']] = connection['weight_bits']
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    synapses = sp.csr_matrix((np.ones(rows.shape[0], dtype=np.int8), (rows, cols)),
+                             shape=(compartment_num, source_num))
+    synapses.sum_duplicates()
+    group_prototypes = np.array([description.groups[name]['prototypes'] for name in compartment_groups],
+                                dtype=np.int64)
+    bits_cumsum = np.zeros(compartment_num + 1, dtype=np.int64)
+    np.cumsum(synapse_bits, out=bits_cumsum[1:])
+    # a compartment adds the prototypes of its group when it is the first of the group
+    group_start = np.ones(compartment_num, dtype=bool)
+    group_start[1:] = group_of_compartment[1:] != group_of_compartment[:-1]
+    prototypes_cumsum = np.zeros(compartment_num + 1, dtype=np.int64)
+    np.cumsum(np.where(group_start, group_prototypes[group_of_compartment], 0), out=prototypes_cumsum[1:])
+    """
+    output axons are one per pair of source compartment and destination core, they are counted
+    on the previous packing and only grow, so the packing converges
+    """
+    compartment_sources = np.full(source_num, -1, dtype=np.int64)
+    for name in compartment_groups:
+        size = description.groups[name]['size']
+        compartment_sources[source_offset[name]:source_offset[name] + size] = \
+            np.arange(compartment_offset[name], compartment_offset[name] + size)
+    targets = synapses[:, np.nonzero(compartment_sources >= 0)[0]].T.tocsr()
+    targets.sort_indices()
+    outputs_limit = np.zeros(compartment_num, dtype=np.int64)
+    outputs_cumsum = None
+    for _ in range(PACKING_ROUNDS):
+        core_bounds, core_bits, core_inputs, core_prototypes = _pack_cores(
+            synapses, bits_cumsum, prototypes_cumsum, group_prototypes, group_of_compartment, outputs_cumsum)
+        core_num = core_bounds.shape[0] - 1
+        core_of_compartment = np.repeat(np.arange(core_num), np.diff(core_bounds))
+        outputs = _compartment_outputs(targets, core_of_compartment)
+        output_axons = np.bincount(core_of_compartment, weights=outputs, minlength=core_num)
+        if (output_axons <= CORE_OUTPUT_AXONS).all():
+            break
+        np.maximum(outputs_limit, outputs, out=outputs_limit)
+        outputs_cumsum = np.zeros(compartment_num + 1, dtype=np.int64)
+        np.cumsum(outputs_limit, out=outputs_cumsum[1:])
+    occupancy = np.zeros((core_num, 5))
+    occupancy[:, 0] = np.diff(core_bounds) / CORE_COMPARTMENTS
+    occupancy[:, 1] = np.array(core_bits) / CORE_SYNAPSE_BITS
+    occupancy[:, 2] = np.array(core_inputs) / CORE_INPUT_AXONS
+    occupancy[:, 3] = output_axons / CORE_OUTPUT_AXONS
+    occupancy[:, 4] = np.array(core_prototypes) / CORE_COMPARTMENT_PROTOTYPES
+    report['compartments'] = {name: description.groups[name]['size'] for name in compartment_groups}
+    report['compartments']['total'] = compartment_num
+    report['prototypes'] = {name: description.groups[name]['prototypes'] for name in compartment_groups}
+    report['prototypes']['total'] = int(group_prototypes.sum())
+    report['cores'] = core_num
+    report['chips'] = -(-core_num // CHIP_CORES)
+    report['core_occupancy'] = occupancy
+    report['fits'] = bool(core_num <= CHIP_CORES and (occupancy <= 1).all())
+    return report
@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the synaptic operation cost model of a run.
+
+Every spike of a source compartment is delivered to all its targets, so the synaptic operations
+of a connection at time step t are out_degree . spikes[:, t]. The spikes of each group are kept
+as a sparse (neurons x time steps) matrix and the load of all time steps is one sparse
+matrix-vector product per connection. Connections come from a NetworkDescription of
+combra_loihi.analysis.resources.
+"""
+import numpy as np
+import scipy.sparse as sp
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+from combra_loihi.plothelper.packedraster import PackedRaster
+from combra_loihi.analysis.resources import describe_feedforward_nan
+
+
+def spike_matrix(spikes, time_steps=None):
+    """
+    Sparse spike matrix (neurons x time steps), column 0 is the first time step of the data
+
+    :param spikes: SpikeTrains, PackedRaster or spike probe data (neurons x time steps)
+    :param time_steps: number of time steps of the matrix, default the time steps of the data
+    :return: spike_matrix: csr_matrix of spike counts
+    """
+    if isinstance(spikes, PackedRaster):
+        spikes = spikes.toSpikeTrains()
+    elif not isinstance(spikes, SpikeTrains):
+        spikes = SpikeTrains.fromProbeData(spikes)
+    time_steps = spikes.time_steps if time_steps is None else time_steps
+    rows, times = spikes.flatTimes()
+    steps = times.astype(np.int64) - spikes.t_start
+    valid = steps < time_steps
+    return sp.csr_matrix((np.ones(int(valid.sum()), dtype=np.int32), (rows[valid], steps[valid])),
+                         shape=(len(spikes), time_steps))
+
+
+def synaptic_ops(description, spikes: dict, time_steps=None):
+    """
+    Synaptic operations per time step of every connection driven by recorded or generated spikes
+
+    :param description: NetworkDescription
+    :param spikes: group name -> spike data of the group (see spike_matrix)
+    :param time_steps: number of time steps, default the longest spike data
+    :return: report: dict of ops (connection -> ops per time step), peak, peak_step and mean
+             of each connection, spikes (group -> spikes per time step) and total ops per time step
+    """
+    matrices = {name: spike_matrix(data) for name, data in spikes.items()}
+    if time_steps is None:
+        time_steps = max(matrix.shape[1] for matrix in matrices.values()) if matrices else 0
+    """
+    pad or cut all spike matrices to the same time steps
+    """
+    for name, matrix in matrices.items():
+        assert matrix.shape[0] == description.groups[name]['size']
+        if matrix.shape[1] != time_steps:
+            matrix = matrix.tocoo()
+            valid = matrix.col < time_steps
+            matrices[name] = sp.csr_matrix((matrix.data[valid], (matrix.row[valid], matrix.col[valid])),
+                                           shape=(matrix.shape[0], time_steps))
+    report = {'ops': {}, 'peak': {}, 'peak_step': {}, 'mean': {}, 'spikes': {}}
+    for name, matrix in matrices.items():
+        report['spikes'][name] = np.asarray(matrix.sum(axis=0)).ravel()
+    total = np.zeros(time_steps, dtype=np.int64)
+    for connection in description.connections:
+        if connection['source'] not in matrices:
+            continue
+        out_degree = np.bincount(connection['mask'].indices, minlength=connection['mask'].shape[1])
+        ops = matrices[connection['source']].T.dot(out_degree.astype(np.int64))
+        name = connection['name']
+        report['ops'][name] = ops
+        report['peak'][name] = int(ops.max(initial=0))
+        report['peak_step'][name] = int(ops.argmax()) if time_steps > 0 else -1
+        report['mean'][name] = float(ops.mean()) if time_steps > 0 else 0.
+        total += ops
+    report['total'] = total
+    return report
+
+
+def feedforward_nan_synops(nan, post_spikes=None, astrocyte_spikes=None, pre_spikes=None, description=None):
+    """
+    Synaptic operations of a FeedforwardNAN run
+
+    :param nan: FeedforwardNAN
+    :param post_spikes: spike probe data of the post neurons, only counted in report['spikes']
+    :param astrocyte_spikes: spike probe data of the spike generators of the astrocytes, or role -> spike probe data
+           of the astrocyte compartments ('sr', 'ip3', 'sic', 'sg')
+    :param pre_spikes: spikes of the pre neurons, default nan.poisson_spike
+    :param description: NetworkDescription of the network, default describe_feedforward_nan(nan)
+    :return: report: see synaptic_ops
+    """
+    description = describe_feedforward_nan(nan) if description is None else description
+    pre_spikes = nan.poisson_spike if pre_spikes is None else pre_spikes
+    assert pre_spikes is not None, "streamed input has no poisson_spike, pass pre_spikes"
+    spikes = {'pre': pre_spikes}
+    if post_spikes is not None:
+        spikes['post'] = post_spikes
+    if astrocyte_spikes is not None:
+        if not isinstance(astrocyte_spikes, dict):
+            astrocyte_spikes = {'sg': astrocyte_spikes}
+        for role, data in astrocyte_spikes.items():
+            spikes['astro_' + role] = data
+    return synaptic_ops(description, spikes, time_steps=nan.sim_time)
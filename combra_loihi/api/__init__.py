@@ -24,6 +24,9 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 from combra_loihi.astro.astrocyte import Astrocyte
+from combra_loihi.astro.population import AstrocytePopulation
+from combra_loihi.astro.emulator import AstrocyteEmulator
 from combra_loihi.api.api_enums import *
 from combra_loihi.nan.feedforwardnan import FeedforwardNAN
+from combra_loihi.nan.emulator import FeedforwardNANEmulator
 from combra_loihi.plothelper.plothelper import *
\ No newline at end of file
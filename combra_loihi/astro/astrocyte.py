@@ -27,7 +27,22 @@ SOFTWARE.
 import nxsdk.api.n2a as nx
 from nxsdk.arch.n2a.net.process.basicspikegen import BasicSpikeGen
 from combra_loihi.astro.astrocyte_base import AstrocytePrototypeBase
-import numpy as np
+from combra_loihi.astro.connection import connection_arrays
+
+# probe condition -> (index of the compartment in astrocyte_setup, probe parameter)
+ASTRO_PROBE_TARGETS = {
+    1: (0, nx.ProbeParameter.COMPARTMENT_CURRENT),
+    2: (0, nx.ProbeParameter.COMPARTMENT_VOLTAGE),
+    3: (0, nx.ProbeParameter.SPIKE),
+    4: (2, nx.ProbeParameter.COMPARTMENT_CURRENT),
+    5: (2, nx.ProbeParameter.COMPARTMENT_VOLTAGE),
+    6: (2, nx.ProbeParameter.SPIKE),
+    7: (4, nx.ProbeParameter.COMPARTMENT_CURRENT),
+    8: (4, nx.ProbeParameter.COMPARTMENT_VOLTAGE),
+    9: (5, nx.ProbeParameter.COMPARTMENT_CURRENT),
+    10: (5, nx.ProbeParameter.COMPARTMENT_VOLTAGE),
+    11: (5, nx.ProbeParameter.SPIKE),
+}
 
 
 class Astrocyte(AstrocytePrototypeBase):
@@ -87,6 +102,8 @@ class Astrocyte(AstrocytePrototypeBase):
         self.astrocyte_setup = self.__core()
         self.astrocyte_input_conn = None
         self.astrocyte_output_conn = None
+        self.astrocyte_input_mask = None
+        self.astrocyte_output_mask = None
         # ---------------------------------------------------
 
     def __core(self):
@@ -105,41 +122,8 @@ class Astrocyte(AstrocytePrototypeBase):
         :return: sic_generator: nx.Compartment
         :return: spike_generator: nx.CompartmentGroup
         """
-        spike_receiver_prototype = nx.CompartmentPrototype(
-            vThMant=self.srVThMant,
-            compartmentCurrentDecay=self.srCurrentDecay,
-            compartmentVoltageDecay=self.srVoltageDecay,
-            activityImpulse=self.srActivityImpulse,
-            activityTimeConstant=self.srActivityTimeConstant,
-            enableHomeostasis=self.srEnableHomeostasis,
-            maxActivity=self.srMinActivity,
-            minActivity=self.srMaxActivity,
-            homeostasisGain=self.srHomeostasisGain,
-            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE
-        )
-        ip3_integrator_prototype = nx.CompartmentPrototype(
-            vThMant=self.ip3VThMant,
-            compartmentCurrentDecay=self.ip3CurrentDecay,
-            compartmentVoltageDecay=self.ip3VoltageDecay,
-            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE
-        )
-        sic_generator_prototype = nx.CompartmentPrototype(
-            compartmentCurrentDecay=self.sicCurrentDecay,
-            compartmentVoltageDecay=self.sicVoltageDecay,
-            thresholdBehavior=nx.COMPARTMENT_THRESHOLD_MODE.NO_SPIKE_AND_PASS_V_LG_VTH_TO_PARENT,
-            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE,
-            stackOut=nx.COMPARTMENT_OUTPUT_MODE.PUSH
-        )
-        spike_generator_prototype = nx.CompartmentPrototype(
-            vThMant=self.sgVThMant,
-            compartmentCurrentDecay=self.sgCurrentDecay,
-            compartmentVoltageDecay=self.sgVoltageDecay,
-            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE,
-            compartmentJoinOperation=nx.COMPARTMENT_JOIN_OPERATION.ADD,
-            stackIn=nx.COMPARTMENT_INPUT_MODE.POP_A
-        )
-        sr_2_ip3_conn_prototype = nx.ConnectionPrototype(signMode=2, numWeightBits=8, weight=self.sr2ip3Weight)
-        ip3_2_sic_conn_prototype = nx.ConnectionPrototype(signMode=2, numWeightBits=8, weight=self.ip32sicWeight)
+        spike_receiver_prototype, ip3_integrator_prototype, sic_generator_prototype, spike_generator_prototype, \
+            sr_2_ip3_conn_prototype, ip3_2_sic_conn_prototype = self._createPrototypes()
         """
         Astrocyte model part 1: simulate IP3 integration
         """
@@ -165,25 +149,19 @@ class Astrocyte(AstrocytePrototypeBase):
 
         :param inputs: CompartmentGroup
         :param num: input number
-        :param connectionMask: int for full connection, numpy for connection
-        :param weight: int for full connection, numpy for connection
+        :param connectionMask: int for full connection, numpy for connection,
+                               index array or scipy.sparse (1, num) for sparse connection
+        :param weight: int for full connection, numpy for connection,
+                       array aligned with index array or scipy.sparse (1, num) for sparse connection
         :return:
         """
         assert (isinstance(inputs, nx.CompartmentGroup) or isinstance(inputs, BasicSpikeGen))
-        mask = connectionMask
-        w = weight
-        if isinstance(mask, int):
-            mask = np.int_(np.ones((1, num)))
-        if isinstance(w, int):
-            w = np.int_(np.ones((1, num))) * w
-        assert isinstance(mask, np.ndarray)
-        assert isinstance(w, np.ndarray)
-        assert (mask.shape[1] == num)
-        assert (w.shape[1] == num)
+        mask, w = connection_arrays(connectionMask, weight, (1, num))
         """
         Create connection
         """
         input_conn_prototype = nx.ConnectionPrototype(numWeightBits=8, signMode=2)
+        self.astrocyte_input_mask = mask
         self.astrocyte_input_conn = inputs.connect(
             self.astrocyte_setup[0],
             prototype=input_conn_prototype,
@@ -197,25 +175,19 @@ class Astrocyte(AstrocytePrototypeBase):
 
         :param outputs: CompartmentGroup
         :param num: output number
-        :param connectionMask: int for full connection, numpy for connection
-        :param weight: int for full connection, numpy for connection
+        :param connectionMask: int for full connection, numpy for connection,
+                               index array or scipy.sparse (num, 1) for sparse connection
+        :param weight: int for full connection, numpy for connection,
+                       array aligned with index array or scipy.sparse (num, 1) for sparse connection
         :return:
         """
         assert isinstance(outputs, nx.CompartmentGroup)
-        mask = connectionMask
-        w = weight
-        if isinstance(mask, int):
-            mask = np.int_(np.ones((num, 1)))
-        if isinstance(w, int):
-            w = np.int_(np.ones((num, 1))) * w
-        assert isinstance(mask, np.ndarray)
-        assert isinstance(w, np.ndarray)
-        assert (mask.shape[0] == num)
-        assert (w.shape[0] == num)
+        mask, w = connection_arrays(connectionMask, weight, (num, 1))
         """
         Create connection
         """
         output_conn_prototype = nx.ConnectionPrototype(numWeightBits=8, signMode=2)
+        self.astrocyte_output_mask = mask
         self.astrocyte_output_conn = self.astrocyte_setup[-1].connect(
             outputs,
             prototype=output_conn_prototype,
@@ -223,46 +195,53 @@ class Astrocyte(AstrocytePrototypeBase):
             weight=w
         )
 
-    def probe(self, probeConditions):
+    def probe(self, probeConditions, dt=1, tStart=1, tEnd=-1, spikeCountDt=None):
         """
-        create probes for astrocyte compartments
+        create probes for astrocyte compartments, conditions on the same compartment share one
+        multi-parameter probe
 
         :param probeConditions: int for single plot, list for list of probes
+        :param dt: sampling interval of current and voltage probes, spike probes are not sampled
+        :param tStart: first timestep probed
+        :param tEnd: last timestep probed, -1 for the end of the run
+        :param spikeCountDt: if set spike probes record spike counts over intervals of spikeCountDt
+                             instead of the full spike trace
         :return: probe objects
         """
         if isinstance(probeConditions, int):
-            assert (probeConditions > 0 or probeConditions < 12)
-            """
-            compute what probe is needed
-            """
-            if probeConditions in [1, 2, 3]:
-                probe_compartment = self.astrocyte_setup[0]
-                probe_choice = probeConditions
-            elif probeConditions in [4, 5, 6]:
-                probe_compartment = self.astrocyte_setup[2]
-                probe_choice = probeConditions - 3
-            elif probeConditions in [7, 8]:
-                probe_compartment = self.astrocyte_setup[4]
-                probe_choice = probeConditions - 6
-            else:
-                probe_compartment = self.astrocyte_setup[5]
-                probe_choice = probeConditions - 8
-            """
-            generate probe
-            """
-            if probe_choice == 1:
-                astrocyte_probe = probe_compartment.probe([nx.ProbeParameter.COMPARTMENT_CURRENT])
-            elif probe_choice == 2:
-                astrocyte_probe = probe_compartment.probe([nx.ProbeParameter.COMPARTMENT_VOLTAGE])
+            return self.probe([probeConditions], dt, tStart, tEnd, spikeCountDt)[0]
+        assert isinstance(probeConditions, list)
+        """
+        group probe parameters by compartment
+        """
+        compartment_parameters = {}
+        for condition in probeConditions:
+            assert 0 < condition < 12
+            compartment, parameter = ASTRO_PROBE_TARGETS[condition]
+            parameters = compartment_parameters.setdefault(compartment, [])
+            if parameter not in parameters:
+                parameters.append(parameter)
+        """
+        generate one probe per compartment
+        """
+        customized = (dt, tStart, tEnd, spikeCountDt) != (1, 1, -1, None)
+        parameter_probes = {}
+        for compartment in sorted(compartment_parameters):
+            parameters = compartment_parameters[compartment]
+            if customized:
+                conditions = []
+                for parameter in parameters:
+                    if parameter == nx.ProbeParameter.SPIKE:
+                        """
+                        dt only samples current and voltage, spike probes keep the full trace unless counted
+                        """
+                        conditions.append(nx.SpikeProbeCondition(
+                            dt=1 if spikeCountDt is None else spikeCountDt, tStart=tStart, tEnd=tEnd))
+                    else:
+                        conditions.append(nx.IntervalProbeCondition(dt=dt, tStart=tStart, tEnd=tEnd))
+                compartment_probes = self.astrocyte_setup[compartment].probe(parameters, probeConditions=conditions)
             else:
-                astrocyte_probe = probe_compartment.probe([nx.ProbeParameter.SPIKE])
-            return astrocyte_probe[0]
-        else:
-            assert isinstance(probeConditions, list)
-            """
-            generate probe list
-            """
-            astrocyte_probe = []
-            for condition in probeConditions:
-                astrocyte_probe.append(self.probe(condition))
-            return astrocyte_probe
+                compartment_probes = self.astrocyte_setup[compartment].probe(parameters)
+            for parameter, compartment_probe in zip(parameters, compartment_probes):
+                parameter_probes[(compartment, parameter)] = compartment_probe
+        return [parameter_probes[ASTRO_PROBE_TARGETS[condition]] for condition in probeConditions]
@@ -27,9 +27,8 @@ SOFTWARE.
 """
 This module contains the base class for the Astrocyte class.
 """
-import os
-import numpy as np
 import nxsdk.api.n2a as nx
+from combra_loihi.astro import prototypes, sic_table
 
 
 class AstrocyteInterfaceBase():
@@ -37,15 +36,21 @@ class AstrocyteInterfaceBase():
     # Validators
     @staticmethod
     def _validate_sic_window(val):
-        assert 0 <= val <= 608, \
+        max_window = sic_table.sic_limits()[1]
+        assert 0 <= val <= max_window, \
             "Illegal SIC window size = " + str(val) + " ms. " + \
-            "Must be an integer >= 0 and <= 608. For a value greater than 608 ms, please configure manually."
+            "Must be an integer >= 0 and <= " + str(max_window) + ". " + \
+            "For a greater value, please extend the table with sic_calibration.build_extended_sic_table " + \
+            "or configure manually."
 
     @staticmethod
     def _validate_sic_firing_rate(val):
-        assert 0 <= val <= 356, \
+        max_firing_rate = sic_table.sic_limits()[0]
+        assert 0 <= val <= max_firing_rate, \
             "Illegal SIC maximum firing rate = " + str(val) + " Hz. " + \
-            "Must be an integer >= 0 and <= 356. For a value greater than 356 Hz., please configure manually."
+            "Must be an integer >= 0 and <= " + str(max_firing_rate) + ". " + \
+            "For a greater value, please extend the table with sic_calibration.build_extended_sic_table " + \
+            "or configure manually."
 
     @staticmethod
     def _validate_ip3_sensitivity(val):
@@ -214,17 +219,18 @@ class AstrocytePrototypeBase(AstrocyteInterfaceBase):
         :param window_size:
         :return: ip32sicWeight, sicCurrentDecay
         """
-        configs = np.load(os.path.join(os.path.dirname(__file__), "sic_data_table.npy"))
+        ip32sicWeight, sicCurrentDecay = sic_table.calculate_sic_props_batch([firing_rate], [window_size])
+        return ip32sicWeight[0], sicCurrentDecay[0]
 
-        optimal_config = configs[15]
-        min_diff = AstrocytePrototypeBase._calc_diff(optimal_config[2], optimal_config[3], firing_rate, window_size)
-        for config in configs:
-            cost = AstrocytePrototypeBase._calc_diff(config[2], config[3], firing_rate, window_size)
-            if min_diff > cost:
-                min_diff = cost
-                optimal_config = config
-        return optimal_config[0], optimal_config[1]
+    calculate_sic_props_batch = staticmethod(sic_table.calculate_sic_props_batch)
 
-    @staticmethod
-    def _calc_diff(config_fr, config_ws, firing_rate, window_size):
-        return np.power(config_fr - firing_rate, 2) + np.power(config_ws - window_size, 2)
+    def _createPrototypes(self):
+        """
+        Get the compartment and connection prototypes of the astrocyte parameters from the registry of the net
+
+        :return: spike_receiver_prototype, ip3_integrator_prototype, sic_generator_prototype,
+                 spike_generator_prototype, sr_2_ip3_conn_prototype, ip3_2_sic_conn_prototype
+        """
+        registry = prototypes.prototype_registry(self.net)
+        return tuple(registry.get(role, tuple(getattr(self, name) for name in prototypes.ROLE_PARAMETERS[role]))
+                     for role in prototypes.ROLES)
@@ -0,0 +1,153 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the normalization of connection masks and weights passed to astrocyte connections.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def connection_arrays(connectionMask, weight, shape):
+    """
+    Normalize a connection mask and weight to arrays of the connection shape.
+    Dense masks give dense arrays, index arrays and scipy.sparse masks give CSR (inputs)
+    or CSC (outputs) matrices built without a dense intermediate, so their size only
+    depends on the number of synapses.
+
+    :param connectionMask: int for full connection, numpy for dense connection (a 1-D 0/1 vector of
+                           length num included), 1-D integer array of distinct connected neuron indexes
+                           or scipy.sparse matrix for sparse connection. An index array of length num
+                           holding only 0 and 1 reads as a dense 0/1 vector, give such connections
+                           (num <= 2) as a 2-D mask. Bool 1-D arrays are rejected.
+    :param weight: int for all connections, numpy for dense weight,
+                   1-D array aligned with an index array mask or scipy.sparse matrix for sparse weight
+    :param shape: shape of the connection, (1, num) for inputs and (num, 1) for outputs
+    :return: mask: ndarray or sparse matrix
+    :return: weight: ndarray or sparse matrix
+    """
+    axis = 1 if shape[0] == 1 else 0
+    # compressed along the single astrocyte so the index pointer has two entries
+    compressed = sp.csr_matrix if axis == 1 else sp.csc_matrix
+    mask = connectionMask
+    w = weight
+    if isinstance(mask, int) and sp.issparse(w):
+        mask = (w != 0).astype(np.int_)
+    if isinstance(mask, int):
+        mask = np.int_(np.ones(shape))
+    elif isinstance(mask, np.ndarray) and mask.ndim == 1 and _is_dense_vector(mask, shape[axis]):
+        mask = mask.reshape(shape)
+        if isinstance(w, np.ndarray) and w.ndim == 1:
+            w = w.reshape(shape)
+    elif isinstance(mask, np.ndarray) and mask.ndim == 1:
+        """
+        index array of connected neurons
+        """
+        assert np.issubdtype(mask.dtype, np.integer), \
+            "1-D connection mask must be an integer index array, got dtype " + str(mask.dtype)
+        index = np.asarray(mask, dtype=np.int64)
+        assert index.shape[0] == 0 or (index.min() >= 0 and index.max() < shape[axis]), \
+            "Index array of connected neurons out of range [0, " + str(shape[axis]) + ")"
+        assert np.unique(index).shape[0] == index.shape[0], "Index array of connected neurons has duplicates"
+        other = np.zeros(index.shape[0], dtype=np.int64)
+        rows, cols = (other, index) if axis == 1 else (index, other)
+        if isinstance(w, np.ndarray) and w.ndim == 1:
+            assert w.shape == index.shape
+            w = compressed((w, (rows, cols)), shape=shape)
+        mask = compressed((np.ones(index.shape[0], dtype=np.int_), (rows, cols)), shape=shape)
+        mask.data[:] = 1
+    if sp.issparse(mask):
+        mask = compressed(mask, dtype=np.int_)
+        assert mask.shape == shape
+        mask.eliminate_zeros()
+        if isinstance(w, int):
+            w = mask * w
+        elif isinstance(w, np.ndarray):
+            assert w.shape == shape
+            """
+            pick the weights of the connected neurons only
+            """
+            masked = mask.tocoo()
+            w = compressed((w[masked.row, masked.col], (masked.row, masked.col)), shape=shape)
+        else:
+            assert sp.issparse(w)
+            w = compressed(w)
+        assert w.shape == shape
+        return mask, w
+    if isinstance(w, int):
+        w = np.int_(np.ones(shape)) * w
+    assert isinstance(mask, np.ndarray)
+    assert isinstance(w, np.ndarray)
+    assert mask.shape[axis] == shape[axis]
+    assert w.shape[axis] == shape[axis]
+    return mask, w
+
+
+def _is_dense_vector(mask: np.ndarray, num: int):
+    """
+    A 1-D integer mask of length num holding only 0 and 1 is a dense connection vector, bool masks are rejected
+    """
+    assert mask.dtype != np.bool_, "1-D bool connection masks are ambiguous, give a 2-D mask or an index array"
+    return np.issubdtype(mask.dtype, np.integer) and mask.shape[0] == num and \
+        bool(((mask == 0) | (mask == 1)).all())
+
+
+def population_connection_arrays(connectionMask, weight, shape):
+    """
+    Normalize a connection mask and weight of a whole astrocyte population to arrays of the connection shape.
+    scipy.sparse masks give CSR matrices holding only the synapses.
+
+    :param connectionMask: int for full connection, numpy for dense connection or scipy.sparse matrix
+    :param weight: int for all connections, numpy for dense weight or scipy.sparse matrix
+    :param shape: shape of the connection, (astrocytes, num) for inputs and (num, astrocytes) for outputs
+    :return: mask: ndarray or sparse matrix
+    :return: weight: ndarray or sparse matrix
+    """
+    mask = connectionMask
+    w = weight
+    if isinstance(mask, int) and sp.issparse(w):
+        mask = (w != 0).astype(np.int_)
+    if isinstance(mask, int):
+        mask = np.int_(np.ones(shape))
+    if sp.issparse(mask):
+        mask = sp.csr_matrix(mask != 0, dtype=np.int_)
+        assert mask.shape == shape
+        if isinstance(w, int):
+            w = mask * w
+        elif isinstance(w, np.ndarray):
+            assert w.shape == shape
+            masked = mask.tocoo()
+            w = sp.csr_matrix((w[masked.row, masked.col], (masked.row, masked.col)), shape=shape)
+        else:
+            assert sp.issparse(w)
+            w = sp.csr_matrix(w)
+        assert w.shape == shape
+        return mask, w
+    if isinstance(w, int):
+        w = np.int_(np.ones(shape)) * w
+    assert isinstance(mask, np.ndarray) and mask.shape == shape
+    assert isinstance(w, np.ndarray) and w.shape == shape
+    return mask, w
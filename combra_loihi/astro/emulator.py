@@ -0,0 +1,282 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains a CPU emulator of the Astrocyte core.
+
+The emulator runs the four compartment topology of Astrocyte.__core for many astrocytes at once
+with the same fixed-point arithmetic as Loihi: states are integers, decays are in units of 2**-12,
+8-bit weights are scaled by 2**6 and spikes are delivered one timestep after they are emitted.
+Homeostasis of the spike receiver is not emulated.
+"""
+import numpy as np
+from combra_loihi.astro.sic_calibration import DECAY_UNIT, WEIGHT_SCALE, MAX_WEIGHT
+from combra_loihi.astro.sic_table import calculate_sic_props_batch
+
+# probe condition of api_enums -> (compartment role, state), kept free of the nxsdk import of combra_loihi.api
+PROBE_STATES = {
+    1: ('sr', 'u'), 2: ('sr', 'v'), 3: ('sr', 's'),
+    4: ('ip3', 'u'), 5: ('ip3', 'v'), 6: ('ip3', 's'),
+    7: ('sic', 'u'), 8: ('sic', 'v'),
+    9: ('sg', 'u'), 10: ('sg', 'v'), 11: ('sg', 's'),
+}
+SG_SPIKE = 11
+
+
+def quantize_weight(weight, numWeightBits=8, signMode=2):
+    """
+    Quantize connection weights the way a Loihi connection prototype stores them (truncation toward zero)
+
+    :param weight: weights
+    :param numWeightBits: number of weight bits
+    :param signMode: 1 for mixed, 2 for excitatory, 3 for inhibitory
+    :return: quantized weights (int64)
+    """
+    weight = np.asarray(weight, dtype=np.int64)
+    if signMode == 1:
+        weight = np.clip(weight, -MAX_WEIGHT - 1, MAX_WEIGHT - 1)
+        step = 2 ** (9 - numWeightBits)
+    elif signMode == 2:
+        weight = np.clip(weight, 0, MAX_WEIGHT)
+        step = 2 ** (8 - numWeightBits)
+    else:
+        weight = np.clip(weight, -MAX_WEIGHT, 0)
+        step = 2 ** (8 - numWeightBits)
+    return np.sign(weight) * (np.abs(weight) // step * step)
+
+
+def decay_shift(x):
+    """
+    Divide decayed states by 2**12 in place, rounding toward zero like Loihi
+
+    :param x: states multiplied by 2**12 minus their decay (int64)
+    :return:
+    """
+    negative = x < 0
+    if negative.any():
+        np.negative(x, out=x, where=negative)
+        x >>= 12
+        np.negative(x, out=x, where=negative)
+    else:
+        x >>= 12
+
+
+def cuba_step(u, v, current_keep, voltage_keep, synaptic_input, vth=None, spike=None, join_input=None):
+    """
+    Advance compartments by one timestep in place with Loihi fixed-point arithmetic.
+    Decay rounds toward zero, so states driven negative by mixed sign weights decay like on Loihi.
+
+    :param u: compartment currents
+    :param v: compartment voltages
+    :param current_keep: 2**12 minus current decay
+    :param voltage_keep: 2**12 minus voltage decay
+    :param synaptic_input: synaptic input of this timestep, None for compartments without input
+    :param vth: voltage thresholds, None for non-spiking compartments
+    :param spike: output array of spikes
+    :param join_input: value joined by ADD from a child compartment, added to the current fed into
+                       the voltage without being stored in u
+    :return:
+    """
+    if synaptic_input is not None:
+        u *= current_keep
+        decay_shift(u)
+        u += synaptic_input
+    v *= voltage_keep
+    decay_shift(v)
+    v += u
+    if join_input is not None:
+        v += join_input
+    if vth is not None:
+        np.greater(v, vth, out=spike)
+        v[spike] = 0
+
+
+class AstrocyteEmulator:
+    def __init__(self,
+                 num=1,
+                 ip3_sensitivity=None,
+                 sic_amplitude=None,
+                 sic_window=None,
+                 srVThMant=100,
+                 srCurrentDecay=int(1 / 10 * 2 ** 12),
+                 srVoltageDecay=int(1 / 4 * 2 ** 12),
+                 ip3VThMant=15000,
+                 ip3CurrentDecay=int(2 ** 12),
+                 ip3VoltageDecay=1,
+                 sicCurrentDecay=int(1 / 100 * 2 ** 12),
+                 sicVoltageDecay=int(1 / 100 * 2 ** 12),
+                 sgVThMant=5000,
+                 sgCurrentDecay=int(1 / 10 * 2 ** 12),
+                 sgVoltageDecay=int(1 / 100 * 2 ** 12),
+                 sr2ip3Weight=20,
+                 ip32sicWeight=20):
+        """
+        Emulate num astrocytes with the parameters of Astrocyte. Every parameter is either
+        a scalar shared by all astrocytes or an array with one value per astrocyte.
+
+        :param num: number of astrocytes
+        :param ip3_sensitivity: Spike time gap of ip3 integrator in ms
+        :param sic_amplitude: Max firing rate of SIC spike generator in Hz
+        :param sic_window: Firing window of SIC spike generator in ms
+        """
+        self.num = num
+        if ip3_sensitivity is not None:
+            sr2ip3Weight = ip3_sensitivity
+        if sic_window is not None and sic_amplitude is not None:
+            rates, windows = np.broadcast_arrays(sic_amplitude, sic_window)
+            ip32sicWeight, sic_decay = calculate_sic_props_batch(rates, windows)
+            sicCurrentDecay = (sic_decay * DECAY_UNIT).astype(np.int64)
+        """
+        parameters in Loihi units, one entry per astrocyte
+        """
+        self.vth = {'sr': self._param(srVThMant) * WEIGHT_SCALE,
+                    'ip3': self._param(ip3VThMant) * WEIGHT_SCALE,
+                    'sg': self._param(sgVThMant) * WEIGHT_SCALE}
+        self.current_keep = {'sr': DECAY_UNIT - self._param(srCurrentDecay),
+                             'ip3': DECAY_UNIT - self._param(ip3CurrentDecay),
+                             'sic': DECAY_UNIT - self._param(sicCurrentDecay),
+                             'sg': DECAY_UNIT - self._param(sgCurrentDecay)}
+        self.voltage_keep = {'sr': DECAY_UNIT - self._param(srVoltageDecay),
+                             'ip3': DECAY_UNIT - self._param(ip3VoltageDecay),
+                             'sic': DECAY_UNIT - self._param(sicVoltageDecay),
+                             'sg': DECAY_UNIT - self._param(sgVoltageDecay)}
+        self.sr2ip3Weight = quantize_weight(self._param(sr2ip3Weight)) * WEIGHT_SCALE
+        self.ip32sicWeight = quantize_weight(self._param(ip32sicWeight)) * WEIGHT_SCALE
+        self.input_weight = None
+        self.output_weight = None
+        self.reset()
+
+    def _param(self, val):
+        val = np.asarray(val, dtype=np.int64)
+        return np.broadcast_to(val, (self.num,)).copy()
+
+    def reset(self):
+        """
+        Reset all compartment states to zero
+        """
+        self.state = {role: {'u': np.zeros(self.num, dtype=np.int64),
+                             'v': np.zeros(self.num, dtype=np.int64),
+                             's': np.zeros(self.num, dtype=bool)}
+                      for role in ('sr', 'ip3', 'sic', 'sg')}
+
+    def connectInputNeurons(self, num, connectionMask=1, weight=10):
+        """
+        connection Presynaptic neurons with astrocytes
+
+        :param num: input number
+        :param connectionMask: int for full connection, numpy (1, num) or (astrocytes, num) for connection
+        :param weight: int for full connection, numpy (1, num) or (astrocytes, num) for connection
+        :return:
+        """
+        mask = np.ones((1, num), dtype=np.int64) if isinstance(connectionMask, int) else connectionMask
+        w = np.ones((1, num), dtype=np.int64) * weight if isinstance(weight, int) else weight
+        assert mask.shape[1] == num
+        assert w.shape[1] == num
+        self.input_weight = np.broadcast_to(quantize_weight(mask * w), (self.num, num)) * WEIGHT_SCALE
+
+    def connectOutputNeurons(self, num, connectionMask=1, weight=30):
+        """
+        connection Postsynaptic neurons with astrocytes
+
+        :param num: output number
+        :param connectionMask: int for full connection, numpy (num, 1) or (num, astrocytes) for connection
+        :param weight: int for full connection, numpy (num, 1) or (num, astrocytes) for connection
+        :return:
+        """
+        mask = np.ones((num, 1), dtype=np.int64) if isinstance(connectionMask, int) else connectionMask
+        w = np.ones((num, 1), dtype=np.int64) * weight if isinstance(weight, int) else weight
+        assert mask.shape[0] == num
+        assert w.shape[0] == num
+        self.output_weight = np.broadcast_to(quantize_weight(mask * w), (num, self.num)) * WEIGHT_SCALE
+
+    def outputCurrent(self, sg_spikes: np.ndarray):
+        """
+        Synaptic input of the postsynaptic neurons driven by spike generator spikes
+
+        :param sg_spikes: spike generator spikes (astrocytes,) or (astrocytes, time)
+        :return: input to postsynaptic neurons
+        """
+        assert self.output_weight is not None, "connectOutputNeurons must be called first"
+        return self.output_weight.dot(np.asarray(sg_spikes, dtype=np.int64))
+
+    def step(self, sr_input: np.ndarray):
+        """
+        Advance all astrocytes by one timestep
+
+        :param sr_input: synaptic input of the spike receivers in this timestep
+        :return: spike generator spikes of this timestep
+        """
+        sr, ip3, sic, sg = self.state['sr'], self.state['ip3'], self.state['sic'], self.state['sg']
+        # spikes of the previous timestep arrive through sr_2_ip3_conn and ip3_2_sic_conn
+        ip3_input = ip3['s'] * self.ip32sicWeight
+        self._integrate('ip3', sr['s'] * self.sr2ip3Weight)
+        self._integrate('sr', sr_input)
+        self._integrate('sic', ip3_input)
+        # sic_generator pushes its voltage, spike_generator pops it and its ADD join feeds current plus
+        # popped voltage into its voltage, the stored current of spike_generator is left unchanged
+        self._integrate('sg', None, sic['v'])
+        return sg['s']
+
+    def _integrate(self, role, synaptic_input, join_input=None):
+        state = self.state[role]
+        cuba_step(state['u'], state['v'], self.current_keep[role], self.voltage_keep[role],
+                  synaptic_input, self.vth.get(role), state['s'], join_input)
+
+    def run(self, input_spikes: np.ndarray, probeConditions=SG_SPIKE, chunk=1024):
+        """
+        Run the astrocytes on presynaptic spikes
+
+        :param input_spikes: presynaptic spikes (input number, time), spikes at t arrive at t + 1
+        :param probeConditions: int for single probe, list for list of probes
+        :param chunk: number of timesteps whose input is computed at once
+        :return: probe data (astrocytes, time) for each probe condition
+        """
+        assert self.input_weight is not None, "connectInputNeurons must be called first"
+        conditions = [probeConditions] if isinstance(probeConditions, int) else list(probeConditions)
+        states = [PROBE_STATES[condition] for condition in conditions]
+        sim_time = input_spikes.shape[1]
+        data = [np.zeros((self.num, sim_time), dtype=bool if state == 's' else np.int64)
+                for _, state in states]
+        """
+        inputs and records are kept time major within a chunk so every step touches contiguous rows
+        """
+        # weighted sums stay far below 2**53 so the float product is exact and runs on BLAS
+        input_weight_t = np.ascontiguousarray(self.input_weight.T, dtype=np.float64)
+        for start in range(0, sim_time, chunk):
+            stop = min(start + chunk, sim_time)
+            sr_input = np.zeros((stop - start, self.num), dtype=np.int64)
+            delayed = np.asarray(input_spikes[:, max(start - 1, 0):stop - 1], dtype=np.float64)
+            sr_input[stop - start - delayed.shape[1]:] = delayed.T.dot(input_weight_t)
+            records = [np.zeros((stop - start, self.num), dtype=record.dtype) for record in data]
+            for t in range(stop - start):
+                self.step(sr_input[t])
+                for num, (role, state) in enumerate(states):
+                    records[num][t] = self.state[role][state]
+            for num, record in enumerate(records):
+                data[num][:, start:stop] = record.T
+        if isinstance(probeConditions, int):
+            return data[0]
+        return data
@@ -0,0 +1,330 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the astrocyte population built in one pass.
+
+Each compartment role of all astrocytes is one compartment group and the internal connections are
+one diagonal connection each, instead of 4 compartments, 1 group and 6 prototypes per astrocyte.
+Parameters may differ between astrocytes, each role then uses the fewest distinct prototypes
+of the registry of the net with a prototype map. The sic generator pushes its voltage on the
+compartment stack popped by the spike generator of the same astrocyte, so the two roles are
+created interleaved by one group with a prototype map and exposed as two groups of the same
+compartments.
+"""
+import numpy as np
+import scipy.sparse as sp
+import nxsdk.api.n2a as nx
+from nxsdk.arch.n2a.net.process.basicspikegen import BasicSpikeGen
+from combra_loihi.astro.astrocyte import Astrocyte
+from combra_loihi.astro.astrocyte_base import AstrocytePrototypeBase
+from combra_loihi.astro.connection import population_connection_arrays
+from combra_loihi.astro import prototypes, sic_table
+
+
+class AstrocytePopulation(Astrocyte):
+    def __init__(self,
+                 net: nx.NxNet,
+                 n: int,
+                 ip3_sensitivity=None,
+                 sic_amplitude=None,
+                 sic_window=None,
+                 srVThMant=100,
+                 srCurrentDecay=int(1 / 10 * 2 ** 12),
+                 srVoltageDecay=int(1 / 4 * 2 ** 12),
+                 srActivityImpulse=0,
+                 srActivityTimeConstant=0,
+                 srMinActivity=0,
+                 srMaxActivity=127,
+                 srHomeostasisGain=0,
+                 srEnableHomeostasis=0,
+                 ip3VThMant=15000,
+                 ip3CurrentDecay=int(2 ** 12),
+                 ip3VoltageDecay=1,
+                 sicCurrentDecay=int(1 / 100 * 2 ** 12),
+                 sicVoltageDecay=int(1 / 100 * 2 ** 12),
+                 sgVThMant=5000,
+                 sgCurrentDecay=int(1 / 10 * 2 ** 12),
+                 sgVoltageDecay=int(1 / 100 * 2 ** 12),
+                 sr2ip3Weight=20,
+                 ip32sicWeight=20,
+                 DEBUG=False):
+        """
+        Population of n astrocytes with the parameters of Astrocyte, every parameter is either
+        a scalar shared by all astrocytes or an array of n values
+
+        :param n: number of astrocytes
+        """
+        assert n > 0
+        heterogeneous = any(np.ndim(value) > 0 for value in (ip3_sensitivity, sic_amplitude, sic_window))
+        AstrocytePrototypeBase.__init__(self,
+                                        net,
+                                        None if heterogeneous else ip3_sensitivity,
+                                        None if heterogeneous else sic_amplitude,
+                                        None if heterogeneous else sic_window,
+                                        srVThMant,
+                                        srCurrentDecay,
+                                        srVoltageDecay,
+                                        srActivityImpulse,
+                                        srActivityTimeConstant,
+                                        srMinActivity,
+                                        srMaxActivity,
+                                        srHomeostasisGain,
+                                        srEnableHomeostasis,
+                                        ip3VThMant,
+                                        ip3CurrentDecay,
+                                        ip3VoltageDecay,
+                                        sicCurrentDecay,
+                                        sicVoltageDecay,
+                                        sgVThMant,
+                                        sgCurrentDecay,
+                                        sgVoltageDecay,
+                                        sr2ip3Weight,
+                                        ip32sicWeight,
+                                        DEBUG)
+        self.n = n
+        if heterogeneous:
+            self.__configure(ip3_sensitivity, sic_amplitude, sic_window, DEBUG)
+        # declare internal properties
+        # ---------------------------------------------------
+        # population compartment groups and connection list, same layout as Astrocyte
+        self.astrocyte_setup = self.__core()
+        self.astrocyte_input_conn = None
+        self.astrocyte_output_conn = None
+        self.astrocyte_input_mask = None
+        self.astrocyte_output_mask = None
+        self.astrocyte_views = {}
+        # ---------------------------------------------------
+
+    def __configure(self, ip3_sensitivity, sic_amplitude, sic_window, DEBUG):
+        """
+        Private function transforming per-astrocyte ip3 sensitivity, sic amplitude and sic window
+        into Loihi parameters, like AstrocytePrototypeBase does for scalars
+        """
+        if sic_window is not None and sic_amplitude is not None:
+            if DEBUG:
+                print("DEBUG: Configuring based on provided window size and maximum firing rate")
+            sic_window = np.broadcast_to(sic_window, (self.n,))
+            sic_amplitude = np.broadcast_to(sic_amplitude, (self.n,))
+            for val in np.unique(sic_window):
+                self._validate_sic_window(val)
+            for val in np.unique(sic_amplitude):
+                self._validate_sic_firing_rate(val)
+            ip32sicWeight, sicCurrentDecay = sic_table.calculate_sic_props_batch(sic_amplitude, sic_window)
+            self.ip32sicWeight = ip32sicWeight.astype(np.int_)
+            self.sicCurrentDecay = (sicCurrentDecay * 2 ** 12).astype(np.int_)
+            self._sicWindow = sic_window
+            self._sicAmplitude = sic_amplitude
+        if ip3_sensitivity is not None:
+            if DEBUG:
+                print("DEBUG: Configuring based on provided IP3 Sensitivity level")
+            ip3_sensitivity = np.broadcast_to(ip3_sensitivity, (self.n,))
+            for val in np.unique(ip3_sensitivity):
+                self._validate_ip3_sensitivity(val.item())
+            self._ip3Sensitivity = ip3_sensitivity
+            self.sr2ip3Weight = ip3_sensitivity
+
+    def __prototypeGroups(self, role):
+        """
+        Private function getting the distinct prototypes of a role and the prototype of each astrocyte
+
+        :param role: role in prototypes.ROLES
+        :return: role_prototypes: list of prototypes
+        :return: prototype_map: index in role_prototypes of each astrocyte
+        """
+        registry = prototypes.prototype_registry(self.net)
+        values, prototype_map = prototypes.prototype_groups(role, self, self.n)
+        return [registry.get(role, value) for value in values], prototype_map
+
+    def __createGroup(self, role):
+        """
+        Private function creating the compartment group of a role
+        """
+        role_prototypes, prototype_map = self.__prototypeGroups(role)
+        if len(role_prototypes) == 1:
+            return self.net.createCompartmentGroup(size=self.n, prototype=role_prototypes[0])
+        return self.net.createCompartmentGroup(size=self.n, prototype=role_prototypes,
+                                               prototypeMap=prototype_map.tolist())
+
+    def __connectDiagonal(self, role, source, destination):
+        """
+        Private function connecting astrocyte i of source to astrocyte i of destination, weights
+        shared by all astrocytes stay in the prototype
+        """
+        diagonal = sp.identity(self.n, dtype=np.int_, format='csr')
+        registry = prototypes.prototype_registry(self.net)
+        values, _ = prototypes.prototype_groups(role, self, self.n)
+        if len(values) == 1:
+            return source.connect(destination, prototype=registry.get(role, values[0]), connectionMask=diagonal)
+        name = prototypes.ROLE_PARAMETERS[role][0]
+        weight = sp.diags(np.broadcast_to(getattr(self, name), (self.n,)).astype(np.int_), format='csr', dtype=np.int_)
+        return source.connect(destination, prototype=registry.get(role, (None,)), connectionMask=diagonal,
+                              weight=weight)
+
+    def __core(self):
+        """
+        Private function creating the compartment groups and internal connections of the population
+
+        :return: spike_receiver: nx.CompartmentGroup
+        :return: sr_2_ip3_conn: nx.Connection
+        :return: ip3_integrator: nx.CompartmentGroup
+        :return: ip3_2_sic_conn: nx.Connection
+        :return: sic_generator: nx.CompartmentGroup
+        :return: spike_generator: nx.CompartmentGroup
+        """
+        """
+        Astrocyte model part 1: simulate IP3 integration
+        """
+        spike_receiver = self.__createGroup('sr')
+        ip3_integrator = self.__createGroup('ip3')
+        sr_2_ip3_conn = self.__connectDiagonal('sr2ip3', spike_receiver, ip3_integrator)
+        """
+        Astrocyte model part 2: simulate SIC, sic generator i is directly followed by spike generator i
+        """
+        sic_prototypes, sic_map = self.__prototypeGroups('sic')
+        sg_prototypes, sg_map = self.__prototypeGroups('sg')
+        pair_map = np.empty(2 * self.n, dtype=np.int64)
+        pair_map[0::2] = sic_map
+        pair_map[1::2] = sg_map + len(sic_prototypes)
+        sic_sg_pairs = self.net.createCompartmentGroup(size=2 * self.n,
+                                                       prototype=sic_prototypes + sg_prototypes,
+                                                       prototypeMap=pair_map.tolist())
+        sic_generator = self.net.createCompartmentGroup()
+        sic_generator.addCompartments([sic_sg_pairs[2 * num] for num in range(self.n)])
+        spike_generator = self.net.createCompartmentGroup()
+        spike_generator.addCompartments([sic_sg_pairs[2 * num + 1] for num in range(self.n)])
+        ip3_2_sic_conn = self.__connectDiagonal('ip32sic', ip3_integrator, sic_generator)
+        """
+        return
+        """
+        return [spike_receiver, sr_2_ip3_conn, ip3_integrator, ip3_2_sic_conn, sic_generator, spike_generator]
+
+    def __len__(self):
+        return self.n
+
+    def prototypeCounts(self):
+        """
+        Number of distinct prototypes of each role the net of the population needs
+
+        :return: counts: role -> number of prototypes
+        """
+        return prototypes.prototype_registry(self.net).counts()
+
+    def __getitem__(self, index):
+        """
+        View of one astrocyte, usable like an Astrocyte for probe and connections, created once per index
+
+        :param index: index of the astrocyte
+        :return: AstrocyteView
+        """
+        assert -self.n <= index < self.n
+        index = index % self.n
+        if index not in self.astrocyte_views:
+            self.astrocyte_views[index] = AstrocyteView(self, index)
+        return self.astrocyte_views[index]
+
+    def connectInputNeurons(self, inputs, num, connectionMask=1, weight=10):
+        """
+        connection Presynaptic neurons with all astrocytes of the population at once
+
+        :param inputs: CompartmentGroup
+        :param num: input number
+        :param connectionMask: int for full connection, numpy or scipy.sparse (n, num) for connection
+        :param weight: int for full connection, numpy or scipy.sparse (n, num) for connection
+        :return:
+        """
+        assert (isinstance(inputs, nx.CompartmentGroup) or isinstance(inputs, BasicSpikeGen))
+        mask, w = population_connection_arrays(connectionMask, weight, (self.n, num))
+        """
+        Create connection
+        """
+        input_conn_prototype = nx.ConnectionPrototype(numWeightBits=8, signMode=2)
+        self.astrocyte_input_mask = mask
+        self.astrocyte_input_conn = inputs.connect(
+            self.astrocyte_setup[0],
+            prototype=input_conn_prototype,
+            connectionMask=mask,
+            weight=w
+        )
+
+    def connectOutputNeurons(self, outputs, num, connectionMask=1, weight=30):
+        """
+        connection Postsynaptic neurons with all astrocytes of the population at once
+
+        :param outputs: CompartmentGroup
+        :param num: output number
+        :param connectionMask: int for full connection, numpy or scipy.sparse (num, n) for connection
+        :param weight: int for full connection, numpy or scipy.sparse (num, n) for connection
+        :return:
+        """
+        assert isinstance(outputs, nx.CompartmentGroup)
+        mask, w = population_connection_arrays(connectionMask, weight, (num, self.n))
+        """
+        Create connection
+        """
+        output_conn_prototype = nx.ConnectionPrototype(numWeightBits=8, signMode=2)
+        self.astrocyte_output_mask = mask
+        self.astrocyte_output_conn = self.astrocyte_setup[-1].connect(
+            outputs,
+            prototype=output_conn_prototype,
+            connectionMask=mask,
+            weight=w
+        )
+
+
+class AstrocyteView(Astrocyte):
+    def __init__(self, population: AstrocytePopulation, index: int):
+        """
+        One astrocyte of a population, Astrocyte probe and connections work on its compartments
+
+        :param population: AstrocytePopulation
+        :param index: index of the astrocyte
+        """
+        self.net = population.net
+        self.population = population
+        self.index = index
+        setup = population.astrocyte_setup
+        """
+        like Astrocyte the spike generator is a one-member group, so connect gives a group connection
+        """
+        spike_generator = self.net.createCompartmentGroup()
+        spike_generator.addCompartments([setup[5][index]])
+        self.astrocyte_setup = [setup[0][index], setup[1], setup[2][index], setup[3], setup[4][index], spike_generator]
+        self.astrocyte_input_conn = None
+        self.astrocyte_output_conn = None
+        self.astrocyte_input_mask = None
+        self.astrocyte_output_mask = None
+
+    def __getattr__(self, name):
+        """
+        astrocyte parameters are the ones of the population, per-astrocyte arrays give the astrocyte value
+        """
+        if name == 'population':
+            raise AttributeError(name)
+        value = getattr(self.population, name)
+        if isinstance(value, np.ndarray) and value.ndim > 0:
+            return value[self.index]
+        return value
@@ -0,0 +1,187 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the aggregated probe view of many probed units.
+
+Probes of one condition are stacked along units (astrocytes or neurons of a compartment group)
+and all conditions along a second axis, so a whole population is read as one
+(units x conditions x T) array instead of by iterating probe objects. The probes of a condition
+are read and stacked once, later accesses slice the cached array.
+"""
+import numpy as np
+
+
+def astro_probe_labels():
+    """
+    Label of every astrocyte probe condition from the api_enums probe classes
+
+    :return: labels: condition -> label, e.g. 5 -> 'ASTRO_IP3_INTEGRATOR_PROBE.COMPARTMENT_VOLTAGE'
+    """
+    # imported here as the api package imports the modules using this one
+    from combra_loihi.api import api_enums
+    labels = {}
+    for enum_class in (api_enums.ASTRO_SPIKE_RECEIVER_PROBE, api_enums.ASTRO_IP3_INTEGRATOR_PROBE,
+                       api_enums.ASTRO_SIC_GENERATOR_PROBE, api_enums.ASTRO_SPIKE_GENERATOR_PROBE):
+        for member in enum_class:
+            labels[int(member)] = enum_class.__name__ + '.' + member.name
+    return labels
+
+
+class ProbeView:
+    def __init__(self, probes: list, labels: list, rows=None):
+        """
+        Aggregated view of probes
+
+        :param probes: for each condition the list of probes stacked along units
+        :param labels: label of each condition
+        :param rows: number of units of each probe in a condition list, None to read it from the data
+        """
+        assert len(probes) == len(labels) > 0
+        assert all(len(condition_probes) == len(probes[0]) for condition_probes in probes)
+        self.probes = probes
+        self.labels = list(labels)
+        self.offsets = None
+        self.__cache = {}
+        if rows is not None:
+            self.__setRows(rows)
+
+    def __setRows(self, rows):
+        assert len(rows) == len(self.probes[0])
+        self.offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(rows, out=self.offsets[1:])
+
+    @staticmethod
+    def __probeData(probe):
+        data = np.asarray(probe.data)
+        return data.reshape(-1, data.shape[-1]) if data.ndim > 0 and data.size > 0 else data.reshape(1, 0)
+
+    def __conditionData(self, condition):
+        """
+        Data of all probes of a condition stacked along units, read once and cached
+
+        :param condition: index of the condition
+        :return: data: ndarray (units x T)
+        """
+        if condition not in self.__cache:
+            pieces = [self.__probeData(probe) for probe in self.probes[condition]]
+            if self.offsets is None:
+                self.__setRows([piece.shape[0] for piece in pieces])
+            self.__cache[condition] = np.concatenate(pieces, axis=0)
+        return self.__cache[condition]
+
+    def refresh(self):
+        """
+        Drop the cached data, e.g. after running the network again
+        """
+        self.__cache = {}
+
+    @property
+    def unit_num(self):
+        if self.offsets is None:
+            self.__conditionData(0)
+        return int(self.offsets[-1])
+
+    def conditionIndex(self, condition):
+        """
+        Index of a condition in the view
+
+        :param condition: index or label
+        :return: index
+        """
+        if isinstance(condition, str):
+            return self.labels.index(condition)
+        return int(condition)
+
+    def data(self, units=None, conditions=None, time=None):
+        """
+        Stacked probe data
+
+        :param units: slice of units, None for all
+        :param conditions: list of condition indexes or labels, None for all
+        :param time: slice of time, None for all
+        :return: data: ndarray (units x conditions x T)
+        """
+        start, stop, step = (units if units is not None else slice(None)).indices(self.unit_num)
+        assert step == 1 and start <= stop
+        condition_indexes = [self.conditionIndex(condition) for condition in
+                             (conditions if conditions is not None else range(len(self.labels)))]
+        time = time if time is not None else slice(None)
+        stacked = None
+        for num, condition in enumerate(condition_indexes):
+            condition_data = self.__conditionData(condition)
+            assert condition_data.shape[0] == self.unit_num, "Probes of the view have different units"
+            condition_data = condition_data[start:stop, time]
+            if stacked is None:
+                stacked = np.zeros((stop - start, len(condition_indexes), condition_data.shape[1]),
+                                   dtype=np.result_type(condition_data.dtype, np.int64))
+            assert condition_data.shape[1] == stacked.shape[2], "Probes of the view have different lengths"
+            stacked[:, num, :] = condition_data
+        return stacked
+
+    def __getitem__(self, item):
+        """
+        view[units], view[units, conditions] or view[units, conditions, time] with slices
+
+        :param item: slices
+        :return: data: ndarray (units x conditions x T)
+        """
+        if not isinstance(item, tuple):
+            item = (item,)
+        units = item[0]
+        conditions = item[1] if len(item) > 1 else slice(None)
+        time = item[2] if len(item) > 2 else None
+        if isinstance(conditions, slice):
+            conditions = list(range(len(self.labels)))[conditions]
+        return self.data(units, conditions, time)
+
+
+def astrocyte_probe_view(astrocytes: list, probeConditions: list, **probeOptions):
+    """
+    Probe every astrocyte with the same conditions and aggregate the probes
+
+    :param astrocytes: list of Astrocyte
+    :param probeConditions: list of astrocyte probe conditions
+    :param probeOptions: dt, tStart, tEnd and spikeCountDt of Astrocyte.probe
+    :return: ProbeView with one unit per astrocyte
+    """
+    astro_probes = [astrocyte.probe(list(probeConditions), **probeOptions) for astrocyte in astrocytes]
+    labels = astro_probe_labels()
+    return ProbeView([[probes[num] for probes in astro_probes] for num in range(len(probeConditions))],
+                     [labels[int(condition)] for condition in probeConditions],
+                     rows=[1] * len(astrocytes))
+
+
+def compartment_probe_view(probes: list, probeConditions: list, unit_num=None):
+    """
+    Aggregate the probes of a compartment group, one probe per condition
+
+    :param probes: probes returned by CompartmentGroup.probe
+    :param probeConditions: list of nx.ProbeParameter of the probes
+    :param unit_num: number of compartments of the group, None to read it from the data
+    :return: ProbeView with one unit per compartment
+    """
+    labels = [getattr(condition, 'name', str(condition)) for condition in probeConditions]
+    return ProbeView([[probe] for probe in probes], labels, rows=None if unit_num is None else [unit_num])
@@ -0,0 +1,186 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the prototype registry of astrocyte compartments and connections.
+
+Loihi cores only hold a few distinct compartment prototypes, so every astrocyte built on a net
+takes its prototypes from one registry per net keyed by the parameters of each role, and
+heterogeneous populations are grouped into the fewest distinct prototypes.
+"""
+import weakref
+import numpy as np
+
+# parameters defining the prototype of each role, in key order
+ROLE_PARAMETERS = {
+    'sr': ('srVThMant', 'srCurrentDecay', 'srVoltageDecay', 'srActivityImpulse', 'srActivityTimeConstant',
+           'srMinActivity', 'srMaxActivity', 'srHomeostasisGain', 'srEnableHomeostasis'),
+    'ip3': ('ip3VThMant', 'ip3CurrentDecay', 'ip3VoltageDecay'),
+    'sic': ('sicCurrentDecay', 'sicVoltageDecay'),
+    'sg': ('sgVThMant', 'sgCurrentDecay', 'sgVoltageDecay'),
+    'sr2ip3': ('sr2ip3Weight',),
+    'ip32sic': ('ip32sicWeight',),
+}
+ROLES = ('sr', 'ip3', 'sic', 'sg', 'sr2ip3', 'ip32sic')
+COMPARTMENT_ROLES = ('sr', 'ip3', 'sic', 'sg')
+
+
+def _new_prototype(role: str, values: tuple):
+    """
+    Create the prototype of a role
+
+    :param role: role in ROLES
+    :param values: values of ROLE_PARAMETERS[role], a None connection weight leaves it to the connection
+    :return: nx.CompartmentPrototype or nx.ConnectionPrototype
+    """
+    # imported here so the grouping and the registry keys work without nxsdk
+    import nxsdk.api.n2a as nx
+    p = dict(zip(ROLE_PARAMETERS[role], values))
+    if role == 'sr':
+        return nx.CompartmentPrototype(
+            vThMant=p['srVThMant'],
+            compartmentCurrentDecay=p['srCurrentDecay'],
+            compartmentVoltageDecay=p['srVoltageDecay'],
+            activityImpulse=p['srActivityImpulse'],
+            activityTimeConstant=p['srActivityTimeConstant'],
+            enableHomeostasis=p['srEnableHomeostasis'],
+            maxActivity=p['srMinActivity'],
+            minActivity=p['srMaxActivity'],
+            homeostasisGain=p['srHomeostasisGain'],
+            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE
+        )
+    if role == 'ip3':
+        return nx.CompartmentPrototype(
+            vThMant=p['ip3VThMant'],
+            compartmentCurrentDecay=p['ip3CurrentDecay'],
+            compartmentVoltageDecay=p['ip3VoltageDecay'],
+            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE
+        )
+    if role == 'sic':
+        return nx.CompartmentPrototype(
+            compartmentCurrentDecay=p['sicCurrentDecay'],
+            compartmentVoltageDecay=p['sicVoltageDecay'],
+            thresholdBehavior=nx.COMPARTMENT_THRESHOLD_MODE.NO_SPIKE_AND_PASS_V_LG_VTH_TO_PARENT,
+            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE,
+            stackOut=nx.COMPARTMENT_OUTPUT_MODE.PUSH
+        )
+    if role == 'sg':
+        return nx.CompartmentPrototype(
+            vThMant=p['sgVThMant'],
+            compartmentCurrentDecay=p['sgCurrentDecay'],
+            compartmentVoltageDecay=p['sgVoltageDecay'],
+            functionalState=nx.COMPARTMENT_FUNCTIONAL_STATE.IDLE,
+            compartmentJoinOperation=nx.COMPARTMENT_JOIN_OPERATION.ADD,
+            stackIn=nx.COMPARTMENT_INPUT_MODE.POP_A
+        )
+    weight = values[0]
+    if weight is None:
+        return nx.ConnectionPrototype(signMode=2, numWeightBits=8)
+    return nx.ConnectionPrototype(signMode=2, numWeightBits=8, weight=weight)
+
+
+def _key_value(value):
+    """
+    Plain python value of a parameter, integral floats become int
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value
+
+
+class PrototypeRegistry:
+    def __init__(self):
+        """
+        Prototypes of one net keyed by (role, parameter values)
+        """
+        self.prototypes = {}
+
+    def get(self, role: str, values: tuple):
+        """
+        Prototype of a role with the parameter values, created on first use
+
+        :param role: role in ROLES
+        :param values: values of ROLE_PARAMETERS[role]
+        :return: prototype
+        """
+        assert len(values) == len(ROLE_PARAMETERS[role])
+        key = (role, tuple(_key_value(value) for value in values))
+        if key not in self.prototypes:
+            self.prototypes[key] = _new_prototype(role, key[1])
+        return self.prototypes[key]
+
+    def counts(self):
+        """
+        Number of distinct prototypes of each role
+
+        :return: counts: role -> number of prototypes
+        """
+        counts = {role: 0 for role in ROLES}
+        for role, _ in self.prototypes:
+            counts[role] += 1
+        return counts
+
+    def numCompartmentPrototypes(self):
+        """
+        Number of distinct compartment prototypes the net needs
+
+        :return: number of compartment prototypes
+        """
+        counts = self.counts()
+        return sum(counts[role] for role in COMPARTMENT_ROLES)
+
+
+_REGISTRIES = weakref.WeakKeyDictionary()
+
+
+def prototype_registry(net):
+    """
+    Prototype registry of a net, it lives as long as the net
+
+    :param net: NxNet
+    :return: PrototypeRegistry
+    """
+    if net not in _REGISTRIES:
+        _REGISTRIES[net] = PrototypeRegistry()
+    return _REGISTRIES[net]
+
+
+def prototype_groups(role: str, parameters, n: int):
+    """
+    Group astrocytes with per-astrocyte parameters into the fewest distinct parameter tuples of a role
+
+    :param role: role in ROLES
+    :param parameters: object with the ROLE_PARAMETERS[role] attributes, scalars or arrays of n values
+    :param n: number of astrocytes
+    :return: values: list of distinct parameter tuples
+    :return: prototype_map: index in values of each astrocyte
+    """
+    table = np.stack([np.broadcast_to(np.asarray(getattr(parameters, name)), (n,))
+                      for name in ROLE_PARAMETERS[role]], axis=1)
+    distinct, prototype_map = np.unique(table, axis=0, return_inverse=True)
+    return [tuple(row) for row in distinct.tolist()], prototype_map.reshape(-1)
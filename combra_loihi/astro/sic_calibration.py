@@ -0,0 +1,237 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the SIC calibration subsystem of the Astrocyte smart setup.
+
+The sic_generator / spike_generator pair of the CPU AstrocyteEmulator is swept over
+(ip32sicWeight, sicCurrentDecay) to extend sic_data_table.npy beyond its limits.
+The extended grid is cached next to the package as a memory-mapped .npy file, with a .json
+sidecar recording the max firing rate and window the sweep was built for.
+Regenerate both with: python -m combra_loihi.astro.sic_calibration
+The table is committed like sic_data_table.npy: the sweep is deterministic but takes seconds,
+which the smart setup of every Astrocyte should not pay on first use or write into the package.
+Lookups on it are nearest neighbour in fractions of the build target, SicInverseModel only sets
+the sic current decays the sweep covers.
+"""
+import os
+import json
+import numpy as np
+
+EXTENDED_SIC_DATA_TABLE = os.path.join(os.path.dirname(__file__), "sic_data_table_extended.npy")
+
+# Loihi fixed-point constants
+DECAY_UNIT = 2 ** 12
+WEIGHT_SCALE = 2 ** 6
+MAX_WEIGHT = 2 ** 8 - 1
+
+# Window used to measure the max firing rate of the spike generator in ms
+RATE_WINDOW = 250
+
+
+def simulate_sic_response(ip32sicWeight, sicCurrentDecay,
+                          sicVoltageDecay=int(1 / 100 * 2 ** 12),
+                          sgVThMant=5000,
+                          sgCurrentDecay=int(1 / 10 * 2 ** 12),
+                          sgVoltageDecay=int(1 / 100 * 2 ** 12),
+                          max_time=20000):
+    """
+    Simulate the response of the sic_generator / spike_generator pair to a single ip3 spike
+    for many parameter sets at once
+
+    :param ip32sicWeight: 8-bit ip3 to sic weights
+    :param sicCurrentDecay: sic current decays in units of 2**-12
+    :param sicVoltageDecay: sic voltage decay in units of 2**-12
+    :param sgVThMant: spike generator vth mantissa
+    :param sgCurrentDecay: spike generator current decay in units of 2**-12
+    :param sgVoltageDecay: spike generator voltage decay in units of 2**-12
+    :param max_time: maximum simulation time in ms
+    :return: firing_rate: max firing rate of spike generator in Hz
+    :return: window: time between first and last spike generator spike in ms (-1 for no spike,
+                     nan if still spiking at max_time)
+    """
+    from combra_loihi.astro.emulator import AstrocyteEmulator
+    weight = np.asarray(ip32sicWeight, dtype=np.int64).reshape(-1)
+    sic_decay = np.asarray(sicCurrentDecay, dtype=np.int64).reshape(-1)
+    assert weight.shape == sic_decay.shape
+    assert ((0 <= weight) & (weight <= MAX_WEIGHT)).all()
+    num = weight.shape[0]
+    emulator = AstrocyteEmulator(num,
+                                 sicCurrentDecay=sic_decay,
+                                 sicVoltageDecay=sicVoltageDecay,
+                                 sgVThMant=sgVThMant,
+                                 sgCurrentDecay=sgCurrentDecay,
+                                 sgVoltageDecay=sgVoltageDecay,
+                                 ip32sicWeight=weight)
+    sic, sg = emulator.state['sic'], emulator.state['sg']
+    vth = sgVThMant * WEIGHT_SCALE
+    no_input = np.zeros(num, dtype=np.int64)
+    """
+    ring buffer of spike generator spikes for the max firing rate window
+    """
+    ring = np.zeros((RATE_WINDOW, num), dtype=np.int64)
+    count = np.zeros(num, dtype=np.int64)
+    max_count = np.zeros(num, dtype=np.int64)
+    first_spike = np.full(num, -1, dtype=np.int64)
+    last_spike = np.full(num, -1, dtype=np.int64)
+    # the ip3 spike is delivered to sic_generator at t = 0
+    emulator.state['ip3']['s'][:] = True
+    finished = False
+    for t in range(max_time):
+        spike = emulator.step(no_input)
+        emulator.state['ip3']['s'][:] = False
+        count += spike - ring[t % RATE_WINDOW]
+        ring[t % RATE_WINDOW] = spike
+        np.maximum(max_count, count, out=max_count)
+        first_spike[spike & (first_spike < 0)] = t
+        last_spike[spike] = t
+        """
+        stop once no compartment can reach threshold again
+        """
+        if t % RATE_WINDOW == 0 and not sic['u'].any() and not sg['u'].any():
+            bound = sg['v'] + sic['v'] * DECAY_UNIT // max(sicVoltageDecay, 1)
+            if (bound <= vth).all():
+                finished = True
+                break
+    firing_rate = max_count * (1000. / RATE_WINDOW)
+    window = np.where(first_spike < 0, -1., np.float64(last_spike - first_spike))
+    if not finished:
+        bound = sg['v'] + sic['v'] * DECAY_UNIT // max(sicVoltageDecay, 1)
+        window[(bound > vth) | (sic['u'] != 0) | (sg['u'] != 0)] = np.nan
+    return firing_rate, window
+
+
+def sweep_sic_configs(weights, decays, **kwargs):
+    """
+    Sweep ip32sicWeight and sicCurrentDecay through the CPU model into calibration table rows
+
+    :param weights: 8-bit ip3 to sic weights
+    :param decays: sic current decays in units of 2**-12
+    :param kwargs: keyword arguments of simulate_sic_response
+    :return: configs: rows of (ip32sicWeight, sicCurrentDecay, firing rate, window),
+                      parameter sets still spiking at max_time are dropped
+    """
+    weight_grid, decay_grid = np.meshgrid(np.asarray(weights), np.asarray(decays), indexing='ij')
+    weight_grid = weight_grid.reshape(-1)
+    decay_grid = decay_grid.reshape(-1)
+    firing_rate, window = simulate_sic_response(weight_grid, decay_grid, **kwargs)
+    # decays are stored as fractions like sic_data_table.npy, int(fraction * 2**12) restores them exactly
+    configs = np.column_stack((weight_grid, decay_grid / DECAY_UNIT, firing_rate, window)).astype(np.float64)
+    return configs[~np.isnan(window)]
+
+
+class SicInverseModel:
+    def __init__(self, degree=2):
+        """
+        Smooth inverse model of the SIC calibration, from (firing rate, window) to
+        (ip32sicWeight, sicCurrentDecay), fitted by least squares on log features
+
+        :param degree: polynomial degree
+        """
+        self.degree = degree
+        self.coef = None
+
+    def _features(self, rates, windows):
+        x = np.log1p(np.asarray(rates, dtype=np.float64).reshape(-1))
+        y = np.log1p(np.asarray(windows, dtype=np.float64).reshape(-1))
+        return np.column_stack([x ** i * y ** j
+                                for i in range(self.degree + 1)
+                                for j in range(self.degree + 1 - i)])
+
+    def fit(self, configs: np.ndarray):
+        """
+        Fit the model on calibration table rows
+
+        :param configs: rows of (ip32sicWeight, sicCurrentDecay, firing rate, window)
+        :return: self
+        """
+        configs = configs[configs[:, 3] > 0]
+        targets = np.column_stack((np.log(configs[:, 0]), np.log(configs[:, 1] * DECAY_UNIT)))
+        self.coef = np.linalg.lstsq(self._features(configs[:, 2], configs[:, 3]), targets, rcond=None)[0]
+        return self
+
+    def predict(self, rates, windows):
+        """
+        Predict the SIC parameters for (firing rate, window) pairs
+
+        :param rates: max firing rates in Hz
+        :param windows: firing windows in ms
+        :return: ip32sicWeight: 8-bit weights
+        :return: sicCurrentDecay: current decays in units of 2**-12
+        """
+        assert self.coef is not None, "SicInverseModel must be fit before predict"
+        pred = np.exp(self._features(rates, windows).dot(self.coef))
+        weight = np.clip(np.rint(pred[:, 0]), 1, MAX_WEIGHT).astype(np.int64)
+        sic_decay = np.clip(np.rint(pred[:, 1]), 1, DECAY_UNIT - 1).astype(np.int64)
+        return weight, sic_decay
+
+
+def extended_table_target(path=EXTENDED_SIC_DATA_TABLE):
+    """
+    Path of the sidecar file holding the build target of an extended SIC calibration table
+
+    :param path: table file
+    :return: target_path: .json file next to the table
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def build_extended_sic_table(path=EXTENDED_SIC_DATA_TABLE, max_rate=1000, max_window=4000,
+                             num_decays=96, **kwargs):
+    """
+    Extend the SIC calibration table offline and cache it as a memory-mapped .npy file.
+    The inverse model fitted on sic_data_table.npy sets the smallest sic current decay
+    the sweep needs to reach max_window, all 8-bit weights are swept.
+    max_rate and max_window are written to the .json sidecar, the smart setup only accepts
+    specifications up to them even if some parameter sets ran further.
+
+    :param path: output file
+    :param max_rate: target max firing rate in Hz
+    :param max_window: target firing window in ms
+    :param num_decays: number of log spaced sic current decays
+    :param kwargs: keyword arguments of simulate_sic_response
+    :return: configs: memory-mapped table rows
+    """
+    from combra_loihi.astro.sic_table import load_sic_table, load_extended_sic_table
+    model = SicInverseModel().fit(np.asarray(load_sic_table().configs))
+    _, min_decay = model.predict([max_rate, 0], [max_window, max_window])
+    min_decay = max(int(min_decay.min()) // 2, 1)
+    max_decay = int(np.asarray(load_sic_table().configs)[:, 1].max() * DECAY_UNIT)
+    decays = np.unique(np.rint(np.geomspace(min_decay, max_decay, num_decays)).astype(np.int64))
+    kwargs.setdefault('max_time', 2 * max_window + RATE_WINDOW)
+    configs = sweep_sic_configs(np.arange(1, MAX_WEIGHT + 1), decays, **kwargs)
+    table = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=configs.shape)
+    table[:] = configs
+    table.flush()
+    with open(extended_table_target(path), 'w') as f:
+        json.dump({'max_rate': max_rate, 'max_window': max_window, 'num_decays': num_decays}, f, indent=2)
+    load_extended_sic_table.cache_clear()
+    return np.load(path, mmap_mode='r')
+
+
+if __name__ == '__main__':
+    configs = build_extended_sic_table()
+    print("Extended SIC table: %d rows written to %s" % (configs.shape[0], EXTENDED_SIC_DATA_TABLE))
@@ -0,0 +1,192 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the SIC calibration table lookup used by the Astrocyte smart setup.
+"""
+import os
+import json
+from functools import lru_cache
+import numpy as np
+from scipy.spatial import cKDTree
+from combra_loihi.astro.sic_calibration import EXTENDED_SIC_DATA_TABLE, extended_table_target
+
+SIC_DATA_TABLE = os.path.join(os.path.dirname(__file__), "sic_data_table.npy")
+# Range covered by sic_data_table.npy, lookups inside it never use the extended table
+MAX_SIC_FIRING_RATE = 356
+MAX_SIC_WINDOW = 608
+
+# Row of the table the original linear scan starts from, it wins every tie it is part of
+_DEFAULT_ROW = 15
+# Number of distinct table points compared exactly for every query
+_NEIGHBOURS = 4
+
+
+class SicTableIndex:
+    def __init__(self, configs: np.ndarray, default_row=None, limits=None, normalize=False):
+        """
+        Nearest neighbour index over the (firing rate, window) columns of a SIC calibration table
+
+        :param configs: table rows of (ip32sicWeight, sicCurrentDecay, firing rate, window)
+        :param default_row: row that wins every tie it is part of
+        :param limits: (max firing rate, max window) the table was built to cover
+        :param normalize: if True distances are measured in fractions of limits on both axes,
+                          otherwise in raw (Hz, ms) like the original linear scan
+        """
+        self.configs = configs
+        self.limits = limits
+        self.scale = np.array(limits, dtype=np.float64) if normalize else np.ones(2)
+        # Duplicated (firing rate, window) points only keep the row the linear scan would have chosen
+        points, inverse = np.unique(configs[:, 2:4], axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        winner = np.full(points.shape[0], configs.shape[0], dtype=np.int64)
+        np.minimum.at(winner, inverse, np.arange(configs.shape[0]))
+        if default_row is not None:
+            winner[inverse[default_row]] = default_row
+        self.default_row = default_row
+        self.points = points
+        self.scaled_points = points / self.scale
+        self.winner = winner
+        self.tree = cKDTree(self.scaled_points)
+
+    def query(self, rates, windows):
+        """
+        Find the table row closest to each (firing rate, window) pair
+
+        :param rates: firing rates in Hz
+        :param windows: window sizes in ms
+        :return: rows: table row index for each pair
+        """
+        rates = np.asarray(rates, dtype=np.float64).reshape(-1) / self.scale[0]
+        windows = np.asarray(windows, dtype=np.float64).reshape(-1) / self.scale[1]
+        assert rates.shape == windows.shape
+        k = min(_NEIGHBOURS, self.points.shape[0])
+        _, candidates = self.tree.query(np.column_stack((rates, windows)), k=k)
+        candidates = candidates.reshape(rates.shape[0], k)
+        cost = self._cost(self.scaled_points[candidates], rates[:, None], windows[:, None])
+        min_cost = cost.min(axis=1)
+        rows = self._resolve(self.winner[candidates], cost == min_cost[:, None])
+        """
+        fall back to a full scan when the ties may reach past the compared neighbours
+        """
+        if k < self.points.shape[0]:
+            unsure = np.where(np.isclose(cost[:, -1], min_cost, rtol=1e-9, atol=1e-9))[0]
+            for num in unsure:
+                full_cost = self._cost(self.scaled_points, rates[num], windows[num])
+                rows[num] = self._resolve(self.winner[None, :], (full_cost == full_cost.min())[None, :])[0]
+        return rows
+
+    @staticmethod
+    def _cost(points, rates, windows):
+        return np.square(points[..., 0] - rates) + np.square(points[..., 1] - windows)
+
+    def _resolve(self, winners, tied):
+        """
+        Pick the row the linear scan keeps among tied candidates: the default row, else the first row
+        """
+        tied_winners = np.where(tied, winners, np.iinfo(np.int64).max)
+        rows = tied_winners.min(axis=1)
+        if self.default_row is not None:
+            rows[(tied_winners == self.default_row).any(axis=1)] = self.default_row
+        return rows
+
+
+@lru_cache(maxsize=None)
+def load_sic_table(path=SIC_DATA_TABLE):
+    """
+    Load a SIC calibration table and build its index, once per process
+
+    :param path: path to the table file
+    :return: SicTableIndex
+    """
+    configs = np.load(path)
+    configs.setflags(write=False)
+    return SicTableIndex(configs, default_row=_DEFAULT_ROW)
+
+
+@lru_cache(maxsize=None)
+def load_extended_sic_table(path=EXTENDED_SIC_DATA_TABLE):
+    """
+    Memory-map the extended SIC calibration table and build its index, once per process
+
+    :param path: path to the table file built by sic_calibration.build_extended_sic_table
+    :return: SicTableIndex with the (max firing rate, max window) build target as limits and
+             distances normalized to them, so neither axis dominates requests off the reachable
+             band, None if the table or its target sidecar has not been built
+    """
+    target_path = extended_table_target(path)
+    if not (os.path.exists(path) and os.path.exists(target_path)):
+        return None
+    with open(target_path) as f:
+        target = json.load(f)
+    return SicTableIndex(np.load(path, mmap_mode='r'), limits=(target['max_rate'], target['max_window']),
+                         normalize=True)
+
+
+def sic_limits():
+    """
+    Largest max firing rate and window the smart setup can resolve, the extended table only
+    counts up to the target it was built for, not up to parameter sets that happened to run longer
+
+    :return: max_firing_rate: in Hz
+    :return: max_window: in ms
+    """
+    index = load_extended_sic_table()
+    if index is None:
+        return MAX_SIC_FIRING_RATE, MAX_SIC_WINDOW
+    max_rate = min(index.limits[0], int(index.points[:, 0].max()))
+    max_window = min(index.limits[1], int(index.points[:, 1].max()))
+    return max(MAX_SIC_FIRING_RATE, max_rate), max(MAX_SIC_WINDOW, max_window)
+
+
+def calculate_sic_props_batch(rates, windows):
+    """
+    Calculate the optimal values to achieve closest specifications to those provided for the SIC
+    for many (firing rate, window) pairs in one call.
+
+    :param rates: max firing rates of SIC spike generator in Hz
+    :param windows: firing windows of SIC spike generator in ms
+    :return: ip32sicWeight: ndarray of weights
+    :return: sicCurrentDecay: ndarray of current decays (fraction of 2**12)
+    """
+    shape = np.shape(rates)
+    rates = np.asarray(rates, dtype=np.float64).reshape(-1)
+    windows = np.asarray(windows, dtype=np.float64).reshape(-1)
+    weight = np.zeros(rates.shape[0])
+    sic_decay = np.zeros(rates.shape[0])
+    """
+    pairs inside the range of sic_data_table.npy always resolve on it
+    """
+    in_table = (rates <= MAX_SIC_FIRING_RATE) & (windows <= MAX_SIC_WINDOW)
+    extended = load_extended_sic_table()
+    if extended is None:
+        in_table[:] = True
+    for index, select in ((load_sic_table(), in_table), (extended, ~in_table)):
+        if select.any():
+            optimal_configs = index.configs[index.query(rates[select], windows[select])]
+            weight[select] = optimal_configs[:, 0]
+            sic_decay[select] = optimal_configs[:, 1]
+    return weight.reshape(shape), sic_decay.reshape(shape)
@@ -0,0 +1,152 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the sparse connectivity builders of NAN networks.
+
+Masks are sampled edge by edge into int8 CSR matrices of shape (post, pre), the layout of
+connectionMask, so build time and memory scale with the number of synapses. Rows denser than
+DENSE_P are drawn from random permutations instead.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+# Above this density sampling edges is no cheaper than drawing the dense mask
+DENSE_P = 0.25
+
+
+def _distinct_per_row(counts: np.ndarray, cols: int, rng, block=2 ** 22):
+    """
+    Draw counts[r] distinct sorted column indices for every row r without replacement.
+    Rows above DENSE_P of the columns take the first columns of a random permutation,
+    redrawing repeated columns there would be as slow as collecting coupons.
+
+    :param counts: number of columns of every row
+    :param cols: number of columns
+    :param rng: np.random.Generator
+    :param block: number of edges (or dense entries) drawn at once
+    :return: indptr, indices of a CSR structure
+    """
+    indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    start = 0
+    while start < counts.shape[0]:
+        stop = max(int(np.searchsorted(indptr, indptr[start] + block, side='right')) - 1, start + 1)
+        if counts[start:stop].max() > DENSE_P * cols:
+            stop = min(stop, start + max(block // max(cols, 1), 1))
+            """
+            rank columns by random keys, row r keeps the columns ranked below counts[r]
+            """
+            order = np.argsort(rng.random((stop - start, cols)), axis=1)
+            selected = np.zeros((stop - start, cols), dtype=bool)
+            np.put_along_axis(selected, order, np.arange(cols) < counts[start:stop, None], axis=1)
+            indices[indptr[start]:indptr[stop]] = np.nonzero(selected)[1]
+            start = stop
+            continue
+        rows = np.repeat(np.arange(stop - start, dtype=np.int64), counts[start:stop])
+        block_indices = rng.integers(0, cols, size=rows.shape[0])
+        """
+        redraw repeated columns of a row until all are distinct
+        """
+        while True:
+            keys = np.sort(rows * cols + block_indices)
+            repeated = np.zeros(keys.shape[0], dtype=bool)
+            repeated[1:] = keys[1:] == keys[:-1]
+            block_indices = keys - rows * cols
+            if not repeated.any():
+                break
+            block_indices[repeated] = rng.integers(0, cols, size=int(repeated.sum()))
+        indices[indptr[start]:indptr[stop]] = block_indices
+        start = stop
+    return indptr, indices
+
+
+def bernoulli_mask(rows: int, cols: int, p: float, rng=None):
+    """
+    Sample a mask with every edge present with probability p
+
+    :param rows: number of postsynaptic neurons
+    :param cols: number of presynaptic neurons
+    :param p: connection probability
+    :param rng: np.random.Generator (or seed)
+    :return: mask: csr_matrix (rows, cols)
+    """
+    rng = np.random.default_rng(rng)
+    if p > DENSE_P:
+        return sp.csr_matrix(np.int8(rng.random((rows, cols)) < p))
+    indptr, indices = _distinct_per_row(rng.binomial(cols, p, size=rows), cols, rng)
+    return sp.csr_matrix((np.ones(indices.shape[0], dtype=np.int8), indices, indptr), shape=(rows, cols))
+
+
+def fixed_indegree_mask(rows: int, cols: int, indegree: int, rng=None):
+    """
+    Sample a mask where every postsynaptic neuron has exactly indegree presynaptic neurons
+
+    :param rows: number of postsynaptic neurons
+    :param cols: number of presynaptic neurons
+    :param indegree: number of presynaptic neurons of every postsynaptic neuron
+    :param rng: np.random.Generator (or seed)
+    :return: mask: csr_matrix (rows, cols)
+    """
+    assert 0 <= indegree <= cols
+    rng = np.random.default_rng(rng)
+    indptr, indices = _distinct_per_row(np.full(rows, indegree, dtype=np.int64), cols, rng)
+    return sp.csr_matrix((np.ones(indices.shape[0], dtype=np.int8), indices, indptr), shape=(rows, cols))
+
+
+def fixed_outdegree_mask(rows: int, cols: int, outdegree: int, rng=None):
+    """
+    Sample a mask where every presynaptic neuron has exactly outdegree postsynaptic neurons
+
+    :param rows: number of postsynaptic neurons
+    :param cols: number of presynaptic neurons
+    :param outdegree: number of postsynaptic neurons of every presynaptic neuron
+    :param rng: np.random.Generator (or seed)
+    :return: mask: csr_matrix (rows, cols)
+    """
+    return fixed_indegree_mask(cols, rows, outdegree, rng).T.tocsr()
+
+
+def pre_post_mask(post_num: int, pre_num: int, p: float, mode='bernoulli', rng=None):
+    """
+    Sample the presynaptic to postsynaptic mask of a NAN
+
+    :param post_num: number of postsynaptic neurons
+    :param pre_num: number of presynaptic neurons
+    :param p: connection density
+    :param mode: 'bernoulli' for independent edges, 'fixed_indegree' or 'fixed_outdegree'
+                 for round(p * pre_num) or round(p * post_num) edges per neuron
+    :param rng: np.random.Generator (or seed)
+    :return: mask: csr_matrix (post_num, pre_num)
+    """
+    if mode == 'bernoulli':
+        return bernoulli_mask(post_num, pre_num, p, rng)
+    elif mode == 'fixed_indegree':
+        return fixed_indegree_mask(post_num, pre_num, int(round(p * pre_num)), rng)
+    elif mode == 'fixed_outdegree':
+        return fixed_outdegree_mask(post_num, pre_num, int(round(p * post_num)), rng)
+    raise ValueError("Connection mode must be 'bernoulli', 'fixed_indegree' or 'fixed_outdegree'")
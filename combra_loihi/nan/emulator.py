@@ -0,0 +1,181 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains a batched CPU emulator of FeedforwardNAN.
+
+Every trial draws its own Poisson input and pre to post mask and all trials advance in lockstep:
+the post neurons hold a (trials, post_num) state and the astrocytes a (trials,) state per compartment.
+"""
+import numpy as np
+from combra_loihi.astro.emulator import AstrocyteEmulator, PROBE_STATES, quantize_weight, cuba_step
+from combra_loihi.astro.sic_calibration import DECAY_UNIT, WEIGHT_SCALE
+
+# nx.ProbeParameter names of post neuron probes -> state
+POST_PROBE_STATES = {'COMPARTMENT_CURRENT': 'u', 'COMPARTMENT_VOLTAGE': 'v', 'SPIKE': 's'}
+# Host memory in bytes a chunk of run may use for its inputs and records
+CHUNK_MEMORY = 2 ** 28
+
+
+class FeedforwardNANEmulator:
+    def __init__(self,
+                 trials=1,
+                 pre_num=20,
+                 post_num=20,
+                 pre_fr=20,
+                 pre_post_w=20,
+                 pre_post_conn_p=0.1,
+                 post_vth=100,
+                 post_cdecay=int(1/10*2**12),
+                 post_vdecay=int(1/4*2**12),
+                 sim_time=30000,
+                 seed=None,
+                 astrocyte_kwargs=None):
+        """
+
+        :param trials: number of independent trials
+        :param pre_num: number of presynaptic neurons
+        :param post_num: number of postsynaptic neurons
+        :param pre_fr: presynaptic neuron mean firing rate
+        :param pre_post_w: weight between presynaptic neuron and postsynaptic neuron
+        :param pre_post_conn_p: connection density
+        :param post_vth: postsynaptic neuron vth
+        :param post_cdecay: postsynaptic neuron current decay
+        :param post_vdecay: postsynaptic neuron voltage decay
+        :param sim_time: simulation time in ms
+        :param seed: seed of the random generator of inputs and masks
+        :param astrocyte_kwargs: keyword arguments of AstrocyteEmulator
+        """
+        assert isinstance(trials, int)
+        assert isinstance(pre_num, int)
+        assert isinstance(post_num, int)
+        assert isinstance(pre_fr, int)
+        assert isinstance(pre_post_w, int)
+        assert isinstance(pre_post_conn_p, float)
+        assert isinstance(post_vth, int)
+        assert isinstance(post_cdecay, int)
+        assert isinstance(post_vdecay, int)
+        assert isinstance(sim_time, int)
+        self.trials = trials
+        self.pre_num = pre_num
+        self.post_num = post_num
+        self.pre_fr = pre_fr
+        self.pre_post_w = pre_post_w
+        self.pre_post_conn_p = pre_post_conn_p
+        self.post_vth = post_vth
+        self.post_cdecay = post_cdecay
+        self.post_vdecay = post_vdecay
+        self.sim_time = sim_time
+        self.rng = np.random.default_rng(seed)
+        self.astrocyte_kwargs = dict() if astrocyte_kwargs is None else astrocyte_kwargs
+        """
+        Define network
+        """
+        self.mask, self.pre_2_post_weight, self.astrocyte = self.__core()
+
+    def __core(self):
+        """
+        Private function for setup feedforward nan of every trial
+
+        :return: mask: ndarray (trials, post_num, pre_num)
+        :return: pre_2_post_weight: ndarray (trials, pre_num, post_num) in Loihi units
+        :return: astrocyte: AstrocyteEmulator with one astrocyte per trial
+        """
+        # drawn one trial at a time in float32, the mask itself is int8
+        mask = np.stack([self.rng.random((self.post_num, self.pre_num), dtype=np.float32) < self.pre_post_conn_p
+                         for _ in range(self.trials)]).astype(np.int8)
+        # default connection prototype has 8 mixed sign weight bits
+        weight = quantize_weight(self.pre_post_w, signMode=1) * WEIGHT_SCALE
+        astrocyte = AstrocyteEmulator(self.trials, **self.astrocyte_kwargs)
+        astrocyte.connectInputNeurons(self.pre_num)
+        astrocyte.connectOutputNeurons(self.post_num)
+        pre_2_post_weight = np.ascontiguousarray(mask.transpose(0, 2, 1), dtype=np.float64)
+        pre_2_post_weight *= weight
+        return mask, pre_2_post_weight, astrocyte
+
+    def run(self, postConditions, astroConditions, chunk=1024, memory=CHUNK_MEMORY):
+        """
+        Run all trials for sim_time
+
+        :param postConditions: list of nx.ProbeParameter (or their names) for post neurons
+        :param astroConditions: list of astrocyte probe conditions
+        :param chunk: maximum number of timesteps whose input is drawn at once
+        :param memory: host memory in bytes for the inputs and records of one chunk, shortens chunk
+        :return: postData: list of ndarray (trials, post_num, sim_time)
+        :return: astroData: list of ndarray (trials, 1, sim_time)
+        """
+        post_states = [POST_PROBE_STATES[getattr(condition, 'name', condition)] for condition in postConditions]
+        astro_states = [PROBE_STATES[condition] for condition in astroConditions]
+        post_data = [np.zeros((self.trials, self.post_num, self.sim_time), dtype=bool if state == 's' else np.int64)
+                     for state in post_states]
+        astro_data = [np.zeros((self.trials, 1, self.sim_time), dtype=bool if state == 's' else np.int64)
+                      for _, state in astro_states]
+        post = {'u': np.zeros((self.trials, self.post_num), dtype=np.int64),
+                'v': np.zeros((self.trials, self.post_num), dtype=np.int64),
+                's': np.zeros((self.trials, self.post_num), dtype=bool)}
+        post_vth = self.post_vth * WEIGHT_SCALE
+        astro_input_weight = self.astrocyte.input_weight[0].astype(np.float64)
+        astro_output_weight = self.astrocyte.output_weight[:, 0]
+        self.astrocyte.reset()
+        sg_spike = np.zeros(self.trials, dtype=bool)
+        pre_spike = np.zeros((1, self.trials, self.pre_num), dtype=np.float64)
+        """
+        per timestep: float32 draw, bool spikes and float64 delayed spikes of the pre neurons,
+        float64 and int64 input and one record per probe of the post neurons
+        """
+        step_bytes = self.trials * (self.pre_num * (4 + 1 + 8) + self.post_num * (8 + 8 + 8 * len(post_data)))
+        chunk = max(1, min(chunk, memory // max(step_bytes, 1)))
+        for start in range(0, self.sim_time, chunk):
+            stop = min(start + chunk, self.sim_time)
+            """
+            inputs are time major, spikes emitted at t arrive at t + 1 so the last spikes
+            of the previous chunk come first
+            """
+            spikes = self.rng.random((stop - start, self.trials, self.pre_num), dtype=np.float32)
+            spikes = spikes < (self.pre_fr / 1000.)
+            delayed = np.concatenate((pre_spike, spikes[:-1]))
+            pre_spike = np.float64(spikes[-1:])
+            # integer weighted sums are exact in float64 and run on BLAS
+            post_input = np.matmul(delayed.transpose(1, 0, 2), self.pre_2_post_weight).transpose(1, 0, 2)
+            post_input = post_input.astype(np.int64)
+            astro_input = delayed.dot(astro_input_weight).astype(np.int64)
+            post_records = [np.zeros((stop - start, self.trials, self.post_num), dtype=data.dtype)
+                            for data in post_data]
+            astro_records = [np.zeros((stop - start, self.trials), dtype=data.dtype) for data in astro_data]
+            for t in range(stop - start):
+                synaptic_input = post_input[t] + sg_spike[:, None] * astro_output_weight
+                cuba_step(post['u'], post['v'], DECAY_UNIT - self.post_cdecay, DECAY_UNIT - self.post_vdecay,
+                          synaptic_input, post_vth, post['s'])
+                sg_spike = self.astrocyte.step(astro_input[t]).copy()
+                for num, state in enumerate(post_states):
+                    post_records[num][t] = post[state]
+                for num, (role, state) in enumerate(astro_states):
+                    astro_records[num][t] = self.astrocyte.state[role][state]
+            for num, record in enumerate(post_records):
+                post_data[num][:, :, start:stop] = record.transpose(1, 2, 0)
+            for num, record in enumerate(astro_records):
+                astro_data[num][:, 0, start:stop] = record.T
+        return post_data, astro_data
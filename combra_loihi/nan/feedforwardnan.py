@@ -26,6 +26,11 @@ SOFTWARE.
 
 import nxsdk.api.n2a as nx
 from combra_loihi.astro.astrocyte import Astrocyte
+from combra_loihi.astro.probe_view import astrocyte_probe_view, compartment_probe_view
+from combra_loihi.nan.poisson import poisson_spike_times
+from combra_loihi.nan.connectivity import pre_post_mask
+from combra_loihi.nan.segmented import PoissonInput
+from combra_loihi.plothelper.spiketrains import SpikeTrains
 import numpy as np
 
 
@@ -40,7 +45,10 @@ class FeedforwardNAN:
                  post_vth=100,
                  post_cdecay=int(1/10*2**12),
                  post_vdecay=int(1/4*2**12),
-                 sim_time=30000):
+                 sim_time=30000,
+                 seed=None,
+                 pre_post_conn_mode='bernoulli',
+                 stream_input=False):
         """
 
         :param net: NxNet
@@ -53,6 +61,9 @@ class FeedforwardNAN:
         :param post_cdecay: postsynaptic neuron current decay
         :param post_vdecay: postsynaptic neuron voltage decay
         :param sim_time: simulation time in ms
+        :param seed: seed of the random generator of input spikes and connections
+        :param pre_post_conn_mode: 'bernoulli', 'fixed_indegree' or 'fixed_outdegree' connectivity
+        :param stream_input: if True input spikes are not registered up front, use poissonInput with SegmentedRun
         """
         assert isinstance(net, nx.NxNet)
         assert isinstance(pre_num, int)
@@ -73,17 +84,24 @@ class FeedforwardNAN:
         self.post_cdecay = post_cdecay
         self.post_vdecay = post_vdecay
         self.sim_time = sim_time
+        self.rng = np.random.default_rng(seed)
+        self.pre_post_conn_mode = pre_post_conn_mode
+        self.pre_2_post_mask = None
+        self.stream_input = stream_input
+        self.pre_neurons = None
         """
         Define network
         """
         self.net = net
+        # poisson_spike is a SpikeTrains (a list of lists before): it indexes and iterates per neuron
+        # like the list did, poisson_spike.toSpikeTimes() gives the list of spike time arrays
         self.poisson_spike, self.pre_2_post_conn, self.post_neurons, self.astrocyte = self.__core()
 
     def __core(self):
         """
         Private function for setup feedforward nan
 
-        :return: poisson_spikes: list
+        :return: poisson_spikes: SpikeTrains, None for streamed input
         :return: pre_2_post_conn: nx.Connection
         :return: post_neurons: nx.CompartmentGroup
         :return: astrocyte: combra.Astrocyte
@@ -92,13 +110,16 @@ class FeedforwardNAN:
         define spike generator as presynaptic neurons
         """
         pre_neurons = self.net.createSpikeGenProcess(self.pre_num)
-        random_spikes = np.random.rand(self.pre_num, self.sim_time) < (self.pre_fr / 1000.)
-        poisson_spikes = [np.where(random_spikes[num, :])[0].tolist() for num in range(self.pre_num)]
-        # add spikes to spike generator
-        pre_neurons.addSpikes(
-            spikeInputPortNodeIds=[num for num in range(self.pre_num)],
-            spikeTimes=poisson_spikes
-        )
+        self.pre_neurons = pre_neurons
+        poisson_spikes = None
+        if not self.stream_input:
+            indptr, times = poisson_spike_times(self.pre_num, self.sim_time, self.pre_fr, self.rng)
+            poisson_spikes = SpikeTrains.fromIndptr(indptr, times, self.sim_time)
+            # add spikes to spike generator
+            pre_neurons.addSpikes(
+                spikeInputPortNodeIds=[num for num in range(self.pre_num)],
+                spikeTimes=poisson_spikes.toSpikeTimes()
+            )
         """
         define post synaptic neurons
         """
@@ -120,8 +141,9 @@ class FeedforwardNAN:
         define connection between presynaptic neurons and postsynaptic neurons
         """
         pre_2_post_conn_prototype = nx.ConnectionPrototype()
-        mask = np.int_(np.random.rand(self.post_num, self.pre_num) < self.pre_post_conn_p)
-        weight = self.pre_post_w * mask
+        mask = pre_post_mask(self.post_num, self.pre_num, self.pre_post_conn_p, self.pre_post_conn_mode, self.rng)
+        weight = mask.astype(np.int_) * self.pre_post_w
+        self.pre_2_post_mask = mask
         pre_2_post_conn = pre_neurons.connect(
             post_neurons,
             prototype=pre_2_post_conn_prototype,
@@ -138,16 +160,39 @@ class FeedforwardNAN:
         """
         return poisson_spikes, pre_2_post_conn, post_neurons, astrocyte
 
-    def probeNAN(self, postConditions, astroConditions):
+    def poissonInput(self):
+        """
+        Poisson input of the presynaptic neurons drawn window by window, for streamed input
+
+        :return: PoissonInput
+        """
+        return PoissonInput(self.pre_neurons, self.pre_num, self.pre_fr, self.rng)
+
+    def probeNAN(self, postConditions, astroConditions, **astroProbeOptions):
         """
         create probes for nan networks
 
         :param postConditions: int for single probe, list for list of probes
         :param astroConditions: int for single probe, list for list of probes
+        :param astroProbeOptions: dt, tStart, tEnd and spikeCountDt of Astrocyte.probe
         :return: postProbes
         :return: astroProbes
         """
         postProbes = self.post_neurons.probe(postConditions)
-        astroProbes = self.astrocyte.probe(astroConditions)
+        astroProbes = self.astrocyte.probe(astroConditions, **astroProbeOptions)
         return postProbes, astroProbes
 
+    def probeNANView(self, postConditions: list, astroConditions: list, **astroProbeOptions):
+        """
+        create probes for nan networks as aggregated views
+
+        :param postConditions: list of post neuron probe parameters
+        :param astroConditions: list of astrocyte probe conditions
+        :param astroProbeOptions: dt, tStart, tEnd and spikeCountDt of Astrocyte.probe
+        :return: postView: ProbeView (post neurons x conditions x T)
+        :return: astroView: ProbeView (astrocytes x conditions x T)
+        """
+        postView = compartment_probe_view(self.post_neurons.probe(postConditions), postConditions,
+                                          unit_num=self.post_num)
+        astroView = astrocyte_probe_view([self.astrocyte], astroConditions, **astroProbeOptions)
+        return postView, astroView
@@ -0,0 +1,96 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the Poisson spike time generator of presynaptic neurons.
+
+Spikes are drawn as a Bernoulli process with one draw per ms, so inter-spike intervals
+are geometric. The generator works on blocks of neurons and only ever holds spike times,
+memory is O(total spikes) instead of O(neurons x time).
+"""
+import numpy as np
+
+
+def poisson_spike_times(num: int, sim_time: int, firing_rate, rng=None, block=1024):
+    """
+    Generate Poisson spike times of neurons
+
+    :param num: number of neurons
+    :param sim_time: number of millisecond timesteps
+    :param firing_rate: mean firing rate in Hz
+    :param rng: np.random.Generator (or seed) of the spikes
+    :param block: largest number of neurons generated at once
+    :return: indptr: spike times of neuron n are times[indptr[n]:indptr[n+1]]
+    :return: times: int32 spike times sorted per neuron
+    """
+    rng = np.random.default_rng(rng)
+    p = firing_rate / 1000.
+    if p <= 0 or sim_time <= 0:
+        return np.zeros(num + 1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    p = min(p, 1.)
+    expected = sim_time * p
+    draws = int(expected + 5 * np.sqrt(expected) + 10)
+    # keep the working set of a block of neurons around 2**22 spike times
+    block = max(1, min(block, 2 ** 22 // draws))
+    indptr = np.zeros(num + 1, dtype=np.int64)
+    # few neurons ever need more than draws spikes, the buffer only grows for them
+    buffer = np.empty(num * draws, dtype=np.int32)
+    for start in range(0, num, block):
+        stop = min(start + block, num)
+        """
+        cumulated geometric gaps are spike times, draw more for neurons not yet past sim_time
+        """
+        times = np.cumsum(rng.geometric(p, size=(stop - start, draws)), axis=1) - 1
+        for row in range(stop - start):
+            row_times = times[row]
+            last = row_times[-1]
+            while last < sim_time:
+                more = last + np.cumsum(rng.geometric(p, size=draws))
+                row_times = np.concatenate((row_times, more))
+                last = more[-1]
+            row_times = row_times[:np.searchsorted(row_times, sim_time)]
+            begin = indptr[start + row]
+            end = begin + row_times.shape[0]
+            if end > buffer.shape[0]:
+                buffer = np.resize(buffer, max(end, buffer.shape[0] * 3 // 2))
+            buffer[begin:end] = row_times
+            indptr[start + row + 1] = end
+    return indptr, buffer[:indptr[-1]]
+
+
+def poisson_spike_trains(num: int, sim_time: int, firing_rate, rng=None, block=1024):
+    """
+    Generate Poisson spike times of neurons as a list of int32 arrays
+
+    :param num: number of neurons
+    :param sim_time: number of millisecond timesteps
+    :param firing_rate: mean firing rate in Hz
+    :param rng: np.random.Generator (or seed) of the spikes
+    :param block: number of neurons generated at once
+    :return: spike_times: list of int32 arrays, views into one buffer
+    """
+    indptr, times = poisson_spike_times(num, sim_time, firing_rate, rng, block)
+    return np.split(times, indptr[1:-1])
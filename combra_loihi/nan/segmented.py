@@ -0,0 +1,180 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the segmented run driver of long simulations.
+
+Input spikes are registered window by window, the net advances one chunk at a time and
+the new columns of every probe are drained after every chunk into a callback or an on-disk sink.
+Input and sink memory stay flat. Probe memory only stays flat for probes with a clear() method:
+NxSDK probes have none and keep their whole trace on the host, so with them probe memory still
+grows with the simulation time and only the columns of the last chunk are copied per drain.
+The driver only calls net.run, addSpikes of the spike generators and reads probe.data (and
+probe.clear when present), any stand-in with those members can replace NxSDK.
+"""
+import os
+import numpy as np
+from combra_loihi.nan.poisson import poisson_spike_times
+
+
+class SpikeTimesInput:
+    def __init__(self, spike_gen, spike_times: list):
+        """
+        Input of precomputed spike times, injected one window at a time
+
+        :param spike_gen: spike generator process
+        :param spike_times: list of sorted spike time arrays, one per port
+        """
+        self.spike_gen = spike_gen
+        self.spike_times = [np.asarray(times) for times in spike_times]
+
+    def inject(self, t_start: int, t_stop: int):
+        """
+        Register the spikes of [t_start, t_stop) with the spike generator
+
+        :param t_start: first timestep of the window
+        :param t_stop: timestep after the window
+        :return:
+        """
+        ports = []
+        windows = []
+        for port, times in enumerate(self.spike_times):
+            window = times[np.searchsorted(times, t_start):np.searchsorted(times, t_stop)]
+            if window.shape[0] > 0:
+                ports.append(port)
+                windows.append(window)
+        if ports:
+            self.spike_gen.addSpikes(spikeInputPortNodeIds=ports, spikeTimes=windows)
+
+
+class PoissonInput:
+    def __init__(self, spike_gen, num: int, firing_rate, rng=None):
+        """
+        Poisson input drawn one window at a time
+
+        :param spike_gen: spike generator process
+        :param num: number of ports
+        :param firing_rate: mean firing rate in Hz
+        :param rng: np.random.Generator (or seed)
+        """
+        self.spike_gen = spike_gen
+        self.num = num
+        self.firing_rate = firing_rate
+        self.rng = np.random.default_rng(rng)
+
+    def inject(self, t_start: int, t_stop: int):
+        """
+        Draw and register the spikes of [t_start, t_stop) with the spike generator
+
+        :param t_start: first timestep of the window
+        :param t_stop: timestep after the window
+        :return:
+        """
+        indptr, times = poisson_spike_times(self.num, t_stop - t_start, self.firing_rate, self.rng)
+        counts = np.diff(indptr)
+        ports = np.where(counts > 0)[0]
+        if ports.shape[0] > 0:
+            windows = np.split(times + np.int32(t_start), indptr[1:-1])
+            self.spike_gen.addSpikes(spikeInputPortNodeIds=ports.tolist(),
+                                     spikeTimes=[windows[port] for port in ports])
+
+
+class ChunkFileSink:
+    def __init__(self, directory: str):
+        """
+        On-disk sink writing every drained chunk of every probe to its own .npy file
+
+        :param directory: directory of the files, one sub directory per probe
+        """
+        self.directory = directory
+
+    def __call__(self, name: str, t_start: int, t_stop: int, data: np.ndarray):
+        probe_directory = os.path.join(self.directory, name)
+        os.makedirs(probe_directory, exist_ok=True)
+        np.save(os.path.join(probe_directory, "%010d.npy" % t_start), data)
+
+
+class SegmentedRun:
+    def __init__(self, net, probes: dict, sink, inputs=(), chunk=1000, probe_info=None):
+        """
+        Drive a net in chunks
+
+        :param net: NxNet (or any object with run(steps))
+        :param probes: name -> probe
+        :param sink: called with (name, t_start, t_stop, data) for every probe after every chunk,
+                     a sink with register(name, condition, role) and flush(), like ProbeRecorder,
+                     is registered every probe up front and flushed after every run
+        :param inputs: inputs with inject(t_start, t_stop), e.g. SpikeTimesInput or PoissonInput
+        :param chunk: number of timesteps per chunk
+        :param probe_info: name -> (probe condition, compartment role) passed to sink.register
+        """
+        assert chunk > 0
+        self.net = net
+        self.probes = probes
+        self.sink = sink
+        self.inputs = list(inputs)
+        self.chunk = chunk
+        self.time = 0
+        self.cursor = {name: 0 for name in probes}
+        probe_info = dict() if probe_info is None else probe_info
+        if hasattr(sink, 'register'):
+            for name in probes:
+                sink.register(name, *probe_info.get(name, (None, None)))
+
+    def run(self, sim_time: int):
+        """
+        Run the net for sim_time more timesteps
+
+        :param sim_time: number of timesteps
+        :return:
+        """
+        stop = self.time + sim_time
+        while self.time < stop:
+            steps = min(self.chunk, stop - self.time)
+            for source in self.inputs:
+                source.inject(self.time, self.time + steps)
+            self.net.run(steps)
+            self._drain(self.time, self.time + steps)
+            self.time += steps
+        if hasattr(self.sink, 'flush'):
+            self.sink.flush()
+
+    def _drain(self, t_start, t_stop):
+        """
+        Hand the data of the last chunk to the sink and release it when the probe allows it,
+        otherwise only move the cursor past it
+        """
+        for name, probe in self.probes.items():
+            # no copy of ndarray probe data, only the columns of the last chunk are copied
+            data = np.asarray(probe.data)
+            if data.ndim == 1:
+                data = data.reshape(1, -1)
+            self.sink(name, t_start, t_stop, data[:, self.cursor[name]:].copy())
+            if hasattr(probe, 'clear'):
+                probe.clear()
+                self.cursor[name] = 0
+            else:
+                self.cursor[name] = data.shape[1]
@@ -0,0 +1,154 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the territory tiling builder of multi-astrocyte networks.
+
+A territory is the set of neurons one astrocyte listens to (pre) or acts on (post). Territories
+are int8 CSR masks of shape (astrocytes, neurons) built in bulk from a spec: contiguous blocks,
+overlapping windows, disks on a 2D neuron grid or explicit index lists. All astrocytes are then
+created as one AstrocytePopulation and wired with one input and one output connection.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+
+
+def _territory_mask(indptr: np.ndarray, indices: np.ndarray, num: int):
+    mask = sp.csr_matrix((np.ones(indices.shape[0], dtype=np.int8), indices.astype(np.int32), indptr),
+                         shape=(indptr.shape[0] - 1, num))
+    mask.sort_indices()
+    return mask
+
+
+def block_territories(num: int, size: int):
+    """
+    Contiguous non overlapping blocks of neurons, the last block may be smaller
+
+    :param num: number of neurons
+    :param size: neurons per block
+    :return: mask: int8 CSR (territories, num)
+    """
+    assert 0 < size
+    return window_territories(num, size, size)
+
+
+def window_territories(num: int, size: int, stride: int):
+    """
+    Windows of size neurons starting every stride neurons, overlapping when stride < size
+    and leaving neurons between windows out when stride > size
+
+    :param num: number of neurons
+    :param size: neurons per window
+    :param stride: distance between the first neurons of two windows
+    :return: mask: int8 CSR (territories, num)
+    """
+    assert 0 < size and 0 < stride
+    starts = np.arange(0, max(num - size, 0) + 1, stride, dtype=np.int64)
+    if starts[-1] + size < num and starts[-1] + stride < num:
+        starts = np.append(starts, starts[-1] + stride)
+    stops = np.minimum(starts + size, num)
+    counts = stops - starts
+    indptr = np.zeros(starts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.arange(indptr[-1], dtype=np.int64) - np.repeat(indptr[:-1] - starts, counts)
+    return _territory_mask(indptr, indices, num)
+
+
+def grid_territories(grid_shape: tuple, centers_shape: tuple, radius: float):
+    """
+    Disks of radius around astrocyte centers on a 2D grid of neurons, neuron (y, x) has index y * width + x
+
+    :param grid_shape: (height, width) of the neuron grid
+    :param centers_shape: (rows, columns) of astrocyte centers spread evenly over the grid
+    :param radius: radius of the territories in grid units
+    :return: mask: int8 CSR (rows * columns, height * width)
+    """
+    height, width = grid_shape
+    rows, columns = centers_shape
+    neuron_y, neuron_x = np.divmod(np.arange(height * width), width)
+    tree = cKDTree(np.stack((neuron_y, neuron_x), axis=1))
+    center_y, center_x = np.meshgrid((np.arange(rows) + 0.5) * height / rows - 0.5,
+                                     (np.arange(columns) + 0.5) * width / columns - 0.5, indexing='ij')
+    neighbors = tree.query_ball_point(np.stack((center_y.ravel(), center_x.ravel()), axis=1), radius)
+    counts = np.array([len(territory) for territory in neighbors], dtype=np.int64)
+    indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.concatenate([np.asarray(territory, dtype=np.int64) for territory in neighbors]) \
+        if indptr[-1] > 0 else np.zeros(0, dtype=np.int64)
+    return _territory_mask(indptr, indices, height * width)
+
+
+def index_territories(territories: list, num: int):
+    """
+    Territories from explicit lists of neuron indexes
+
+    :param territories: list of index arrays, one per astrocyte
+    :param num: number of neurons
+    :return: mask: int8 CSR (territories, num)
+    """
+    counts = np.array([len(territory) for territory in territories], dtype=np.int64)
+    indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.concatenate([np.asarray(territory, dtype=np.int64) for territory in territories]) \
+        if indptr[-1] > 0 else np.zeros(0, dtype=np.int64)
+    assert indices.shape[0] == 0 or (indices.min() >= 0 and indices.max() < num)
+    return _territory_mask(indptr, indices, num)
+
+
+def build_territories(net, pre, pre_num: int, post, post_num: int, pre_territories, post_territories=None,
+                      input_weight=45, output_weight=5, **astrocyte_kwargs):
+    """
+    Create one astrocyte per territory and connect all of them at once
+
+    :param net: NxNet
+    :param pre: presynaptic CompartmentGroup or spike generator
+    :param pre_num: number of presynaptic neurons
+    :param post: postsynaptic CompartmentGroup
+    :param post_num: number of postsynaptic neurons
+    :param pre_territories: mask (astrocytes, pre_num) or list of index arrays
+    :param post_territories: mask (astrocytes, post_num) or list of index arrays, None to reuse pre_territories
+    :param input_weight: int or array aligned with the pre territory mask
+    :param output_weight: int or array aligned with the transposed post territory mask
+    :param astrocyte_kwargs: parameters of AstrocytePopulation, scalars or one value per astrocyte
+    :return: AstrocytePopulation
+    """
+    # imported here so the tiling functions stay usable without NxSDK, e.g. for resource estimates
+    from combra_loihi.astro.population import AstrocytePopulation
+    if isinstance(pre_territories, list):
+        pre_territories = index_territories(pre_territories, pre_num)
+    if post_territories is None:
+        assert pre_num == post_num, "Pre and post populations differ, give post_territories"
+        post_territories = pre_territories
+    elif isinstance(post_territories, list):
+        post_territories = index_territories(post_territories, post_num)
+    pre_territories = sp.csr_matrix(pre_territories)
+    post_territories = sp.csr_matrix(post_territories)
+    assert pre_territories.shape[0] == post_territories.shape[0]
+    assert pre_territories.shape[1] == pre_num and post_territories.shape[1] == post_num
+    population = AstrocytePopulation(net, pre_territories.shape[0], **astrocyte_kwargs)
+    population.connectInputNeurons(pre, pre_num, connectionMask=pre_territories, weight=input_weight)
+    population.connectOutputNeurons(post, post_num, connectionMask=post_territories.T.tocsr(), weight=output_weight)
+    return population
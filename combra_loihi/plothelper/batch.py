@@ -0,0 +1,88 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the batch renderer of plot helper figures.
+
+Every plot job is drawn with the object oriented matplotlib API on an Agg canvas in a worker
+process, so jobs run on all cores, never touch the pyplot state and free their figure once saved.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from combra_loihi.plothelper.plothelper import SavePlot, _AggFigure, _VoltageFigure, _FiringRateFigure, _RasterFigure
+
+PLOT_KINDS = {
+    'voltage': _VoltageFigure,
+    'current': _VoltageFigure,
+    'firing_rate': _FiringRateFigure,
+    'raster': _RasterFigure,
+}
+
+
+class PlotJob:
+    def __init__(self, kind: str, name: str, directory: str, data, filetype='png', **kwargs):
+        """
+        One figure of a batch
+
+        :param kind: 'voltage', 'current', 'firing_rate' or 'raster'
+        :param name: name of the figure
+        :param directory: directory to the file
+        :param data: data of the figure, a .npy path is only opened by the worker
+        :param filetype: file type of saved figure
+        :param kwargs: enable_gap and window for 'firing_rate', sim_time and mode for 'raster'
+        """
+        assert kind in PLOT_KINDS, "Plot kind " + kind + " is not supported by PlotHelper."
+        self.kind = kind
+        self.name = name
+        self.directory = directory
+        self.data = data
+        self.filetype = filetype
+        self.kwargs = kwargs
+
+
+def RenderPlot(job: PlotJob):
+    """
+    Render one plot job on an Agg canvas
+
+    :param job: PlotJob
+    :return: path: path of the saved file
+    """
+    figure = PLOT_KINDS[job.kind](job.name, job.data, new_figure=_AggFigure, **job.kwargs)
+    path = SavePlot(figure, job.directory, job.name, job.filetype)
+    figure.clear()
+    return path
+
+
+def RenderPlots(jobs: list, max_workers=None):
+    """
+    Render plot jobs in a process pool
+
+    :param jobs: list of PlotJob
+    :param max_workers: number of processes, None for one per core, 1 renders in this process
+    :return: paths: paths of the saved files in the order of jobs
+    """
+    if max_workers == 1:
+        return [RenderPlot(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(RenderPlot, jobs))
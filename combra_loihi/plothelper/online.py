@@ -0,0 +1,194 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the online estimators of firing rates and state statistics.
+
+Each estimator consumes probe data chunk by chunk (rows x time steps of the chunk) and keeps
+state independent of the trace length, so long runs can be monitored live, e.g. from the sink
+of SegmentedRun. Results concatenated up to any chunk boundary equal the batch functions of the
+plot helper on the data seen so far.
+"""
+import numpy as np
+from scipy.signal import lfilter
+
+
+def _AsChunk(chunk):
+    chunk = np.asarray(chunk)
+    if chunk.ndim == 1:
+        chunk = chunk.reshape(1, -1)
+    return chunk
+
+
+class SlidingRate:
+    def __init__(self, window: int):
+        """
+        Sliding window firing rate, equal to FiringRateCompute on the data seen so far
+
+        :param window: window size in ms
+        """
+        assert window > 0
+        self.window = window
+        self.time = 0
+        self.tail = None
+
+    def update(self, chunk):
+        """
+        Consume one chunk of spikes
+
+        :param chunk: data of neuron spikes of the chunk
+        :return: fr_data: firing rates completed by the chunk
+        :return: fr_x: x axis of firing rates
+        """
+        chunk = _AsChunk(chunk)
+        if self.tail is None:
+            self.tail = np.zeros((chunk.shape[0], 0), dtype=np.int64)
+        """
+        the rate at x = t - window + window / 2 is emitted when step t arrives, like the batch version
+        the window ending with the last step seen so far stays pending
+        """
+        combined = np.hstack((self.tail, chunk.astype(np.int64, copy=False)))
+        first = self.time - self.tail.shape[1]
+        spike_cumsum = np.zeros((combined.shape[0], combined.shape[1] + 1), dtype=np.int64)
+        np.cumsum(combined, axis=1, out=spike_cumsum[:, 1:])
+        steps = np.arange(max(self.time, self.window), self.time + chunk.shape[1]) - first
+        spike_count = spike_cumsum[:, steps] - spike_cumsum[:, steps - self.window]
+        fr_data = spike_count / (self.window / 1000.)
+        fr_x = steps + first - self.window + int(self.window / 2)
+        self.tail = combined[:, -self.window:]
+        self.time += chunk.shape[1]
+        return fr_data, fr_x
+
+
+class EwmaRate:
+    def __init__(self, tau: float):
+        """
+        Exponentially weighted firing rate, r[t] = decay * r[t-1] + (1 - decay) * 1000 * spike[t]
+
+        :param tau: time constant in ms
+        """
+        assert tau > 0
+        self.decay = np.exp(-1. / tau)
+        self.state = None
+
+    def update(self, chunk):
+        """
+        Consume one chunk of spikes
+
+        :param chunk: data of neuron spikes of the chunk
+        :return: fr_data: firing rates at every step of the chunk
+        """
+        chunk = _AsChunk(chunk)
+        if self.state is None:
+            self.state = np.zeros((chunk.shape[0], 1))
+        fr_data, self.state = lfilter([(1. - self.decay) * 1000.], [1., -self.decay],
+                                      chunk.astype(np.float64), axis=1, zi=self.state)
+        return fr_data
+
+
+class IsiRate:
+    def __init__(self):
+        """
+        Inter-spike-interval firing rate, equal to FiringRateComputeGap on the data seen so far
+        """
+        self.time = 0
+        self.last_spike = None
+
+    def update(self, chunk):
+        """
+        Consume one chunk of spikes, every spike closes the interval since the previous spike
+
+        :param chunk: data of neuron spikes of the chunk
+        :return: rows: neuron of each closed interval
+        :return: starts: first time step of each interval
+        :return: stops: time step after each interval
+        :return: rates: firing rate of each interval, 1000 / (stop - start)
+        """
+        chunk = _AsChunk(chunk)
+        if self.last_spike is None:
+            self.last_spike = np.full(chunk.shape[0], -1, dtype=np.int64)
+        rows, times = np.nonzero(chunk)
+        times = times + self.time
+        starts = np.empty_like(times)
+        starts[1:] = times[:-1]
+        first = np.ones(rows.shape[0], dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        starts[first] = self.last_spike[rows[first]]
+        last = np.ones(rows.shape[0], dtype=bool)
+        last[:-1] = first[1:]
+        self.last_spike[rows[last]] = times[last]
+        self.time += chunk.shape[1]
+        closed = starts >= 0
+        rows = rows[closed]
+        starts = starts[closed]
+        stops = times[closed]
+        return rows, starts, stops, 1000. / (stops - starts)
+
+    @staticmethod
+    def fill(fr_data: np.ndarray, rows, starts, stops, rates):
+        """
+        Write intervals from update into a dense firing rate array
+
+        :param fr_data: firing rates (rows x time steps)
+        :return:
+        """
+        for row, start, stop, rate in zip(rows, starts, stops, rates):
+            fr_data[row, start:stop] = rate
+
+
+class RunningStats:
+    def __init__(self):
+        """
+        Running minimum, maximum and mean of each row, e.g. of ip3 and sic voltages
+        """
+        self.count = 0
+        self.total = None
+        self.min = None
+        self.max = None
+
+    def update(self, chunk):
+        """
+        Consume one chunk of probe data
+
+        :param chunk: probe data of the chunk
+        :return:
+        """
+        chunk = _AsChunk(chunk)
+        if chunk.shape[1] == 0:
+            return
+        chunk_min = chunk.min(axis=1)
+        chunk_max = chunk.max(axis=1)
+        chunk_total = chunk.sum(axis=1, dtype=np.int64 if chunk.dtype.kind in 'biu' else np.float64)
+        if self.total is None:
+            self.min, self.max, self.total = chunk_min, chunk_max, chunk_total
+        else:
+            self.min = np.minimum(self.min, chunk_min)
+            self.max = np.maximum(self.max, chunk_max)
+            self.total = self.total + chunk_total
+        self.count += chunk.shape[1]
+
+    @property
+    def mean(self):
+        return self.total / self.count
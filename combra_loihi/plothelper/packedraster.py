@@ -0,0 +1,213 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the bit-packed spike raster used for dense spike activity.
+
+Each neuron keeps one bit per time step packed along time with np.packbits (big bit order,
+time step t is bit 7 - t % 8 of byte t // 8). Counting, time slicing and masking work on the
+packed bytes with a popcount table, the raster is never unpacked for them.
+"""
+import numpy as np
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+# HIGH_MASK[k] keeps the first k time steps of a byte
+HIGH_MASK = np.array([(0xFF << (8 - k)) & 0xFF for k in range(9)], dtype=np.uint8)
+
+
+class PackedRaster:
+    def __init__(self, bits: np.ndarray, time_steps: int):
+        """
+        Packed spike raster of neurons
+
+        :param bits: uint8 packed spikes (neurons x ceil(time_steps / 8)), padding bits are zero
+        :param time_steps: number of time steps
+        """
+        assert bits.dtype == np.uint8 and bits.ndim == 2
+        assert bits.shape[1] == (time_steps + 7) // 8
+        self.bits = bits
+        self.time_steps = time_steps
+
+    @classmethod
+    def fromDense(cls, data: np.ndarray):
+        """
+        Packed raster from a dense spike matrix (neurons x time steps)
+
+        :param data: data of spikes
+        :return: PackedRaster
+        """
+        if type(data) == list:
+            data = np.array(data).reshape(1, len(data))
+        return cls(np.packbits(np.asarray(data) != 0, axis=1), data.shape[1])
+
+    @classmethod
+    def fromProbeData(cls, probe_data):
+        """
+        Packed raster from data of a spike probe
+
+        :param probe_data: probe.data of a spike probe
+        :return: PackedRaster
+        """
+        return cls.fromDense(np.asarray(probe_data).reshape(-1, np.shape(probe_data)[-1]))
+
+    @classmethod
+    def fromSpikeTrains(cls, spike_trains: SpikeTrains):
+        """
+        Packed raster from SpikeTrains, column 0 is time step t_start
+
+        :param spike_trains: SpikeTrains
+        :return: PackedRaster
+        """
+        bits = np.zeros((len(spike_trains), (spike_trains.time_steps + 7) // 8), dtype=np.uint8)
+        rows, times = spike_trains.flatTimes()
+        times = times - spike_trains.t_start
+        np.bitwise_or.at(bits, (rows, times >> 3), np.uint8(0x80) >> (times & 7).astype(np.uint8))
+        return cls(bits, spike_trains.time_steps)
+
+    @property
+    def shape(self):
+        return self.bits.shape[0], self.time_steps
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def __len__(self):
+        return self.bits.shape[0]
+
+    def __getitem__(self, item):
+        """
+        Packed raster of a neuron subset
+
+        :param item: neuron index, slice or index array
+        :return: PackedRaster
+        """
+        if isinstance(item, (int, np.integer)):
+            item = slice(item, item + 1 if item != -1 else None)
+        return PackedRaster(self.bits[item], self.time_steps)
+
+    def __or__(self, other):
+        assert self.shape == other.shape
+        return PackedRaster(self.bits | other.bits, self.time_steps)
+
+    def __and__(self, other):
+        assert self.shape == other.shape
+        return PackedRaster(self.bits & other.bits, self.time_steps)
+
+    def window(self, t_start: int, t_stop: int):
+        """
+        Packed raster of the time window [t_start, t_stop), a view when both ends are byte aligned
+
+        :param t_start: first timestep of the window
+        :param t_stop: timestep after the window
+        :return: PackedRaster
+        """
+        assert 0 <= t_start <= t_stop <= self.time_steps
+        time_steps = t_stop - t_start
+        byte_num = (time_steps + 7) // 8
+        first = t_start >> 3
+        shift = t_start & 7
+        if shift == 0:
+            bits = self.bits[:, first:first + byte_num]
+        else:
+            """
+            each new byte is the tail of one byte followed by the head of the next one
+            """
+            source = self.bits[:, first:first + byte_num + 1]
+            if source.shape[1] < byte_num + 1:
+                source = np.hstack((source, np.zeros((source.shape[0], 1), dtype=np.uint8)))
+            bits = (source[:, :-1] << np.uint8(shift)) | (source[:, 1:] >> np.uint8(8 - shift))
+        tail = time_steps & 7
+        if tail and (shift or t_stop < self.time_steps):
+            if shift == 0:
+                bits = bits.copy()
+            bits[:, -1] &= HIGH_MASK[tail]
+        return PackedRaster(bits, time_steps)
+
+    def counts(self):
+        """
+        Number of spikes of each neuron
+
+        :return: counts
+        """
+        return POPCOUNT[self.bits].sum(axis=1, dtype=np.int64)
+
+    def windowCounts(self, t_start: int, t_stop: int):
+        """
+        Number of spikes of each neuron in the time window [t_start, t_stop)
+
+        :param t_start: first timestep of the window
+        :param t_stop: timestep after the window
+        :return: counts
+        """
+        return self.window(t_start, t_stop).counts()
+
+    def cumulativeCounts(self):
+        """
+        Cumulative spike count of each neuron with a leading zero column
+
+        :return: spike_cumsum: int32 ndarray of shape (neurons, time steps + 1)
+        """
+        row_num = self.bits.shape[0]
+        byte_cumsum = np.zeros((row_num, self.bits.shape[1] + 1), dtype=np.int32)
+        np.cumsum(POPCOUNT[self.bits], axis=1, dtype=np.int32, out=byte_cumsum[:, 1:])
+        """
+        count before step t is all bytes before t // 8 plus the first t % 8 bits of byte t // 8
+        """
+        spike_cumsum = np.zeros((row_num, self.time_steps + 1), dtype=np.int32)
+        spike_cumsum[:, ::8] = byte_cumsum[:, :self.time_steps // 8 + 1]
+        for offset in range(1, 8):
+            steps = np.arange(offset, self.time_steps + 1, 8)
+            spike_cumsum[:, steps] = byte_cumsum[:, steps >> 3] + \
+                POPCOUNT[self.bits[:, steps >> 3] & HIGH_MASK[offset]]
+        return spike_cumsum
+
+    def toDense(self, dtype=np.int_):
+        """
+        Dense spike matrix
+
+        :param dtype: dtype of the matrix
+        :return: spike_data: ndarray of spikes
+        """
+        return np.unpackbits(self.bits, axis=1, count=self.time_steps).astype(dtype)
+
+    def toSpikeTrains(self, block=4096):
+        """
+        SpikeTrains of the raster, unpacking a block of neurons at a time
+
+        :param block: number of neurons unpacked at once
+        :return: SpikeTrains
+        """
+        row_num = self.bits.shape[0]
+        indptr = np.zeros(row_num + 1, dtype=np.int64)
+        times = []
+        for start in range(0, row_num, block):
+            rows, cols = np.nonzero(np.unpackbits(self.bits[start:start + block], axis=1, count=self.time_steps))
+            indptr[start + 1:start + block + 1] = np.searchsorted(rows, np.arange(1, min(block, row_num - start) + 1))
+            indptr[start + 1:start + block + 1] += indptr[start]
+            times.append(cols.astype(np.int32))
+        times = np.concatenate(times) if times else np.zeros(0, dtype=np.int32)
+        return SpikeTrains.fromIndptr(indptr, times, self.time_steps)
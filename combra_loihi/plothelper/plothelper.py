@@ -26,14 +26,77 @@ SOFTWARE.
 
 import matplotlib.figure
 from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
-from nxsdk.utils.plotutils import plotRaster
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+from combra_loihi.plothelper.packedraster import PackedRaster
 
 """
 This is the plot helper toolbox for Loihi SNN
 """
 
 
+def _LoadData(data):
+    """
+    Bring probe data into a 2D array without copying it
+
+    :param data: probe data, list of one row, .npy path (opened as memmap), SpikeTrains or PackedRaster
+    :return: data
+    """
+    if type(data) == str:
+        data = np.load(data, mmap_mode='r')
+    if type(data) == list:
+        data = np.array(data).reshape(1, len(data))
+    elif isinstance(data, np.ndarray) and data.ndim == 1:
+        data = data.reshape(1, -1)
+    return data
+
+
+# Figures stay below this size in inches however long the traces are
+MAX_FIGURE_WIDTH = 30.
+MAX_FIGURE_HEIGHT = 60.
+
+
+def _FigureSize(row_num: int, col_num: int):
+    """
+    Figure size growing with the trace length and row number up to the caps
+
+    :param row_num: number of rows
+    :param col_num: number of time steps
+    :return: figure_size
+    """
+    return min(col_num / 500., MAX_FIGURE_WIDTH), min(row_num * 2, MAX_FIGURE_HEIGHT)
+
+
+def MinMaxDecimate(y: np.ndarray, buckets: int):
+    """
+    Keep the minimum and maximum sample of each of equal-size buckets, in time order,
+    so spikes and peaks survive while the number of plotted vertices only depends on buckets
+
+    :param y: one row of data
+    :param buckets: number of buckets, e.g. the width of the axis in pixels
+    :return: index: index of kept samples
+    :return: y_decimated: kept samples
+    """
+    col_num = y.shape[0]
+    if col_num <= 2 * buckets:
+        return np.arange(col_num), np.asarray(y)
+    bucket_size = -(-col_num // buckets)
+    full = col_num // bucket_size * bucket_size
+    blocks = np.asarray(y[:full]).reshape(-1, bucket_size)
+    arg_min = blocks.argmin(axis=1)
+    arg_max = blocks.argmax(axis=1)
+    offsets = np.arange(blocks.shape[0]) * bucket_size
+    index = np.empty((blocks.shape[0], 2), dtype=np.int64)
+    index[:, 0] = np.minimum(arg_min, arg_max) + offsets
+    index[:, 1] = np.maximum(arg_min, arg_max) + offsets
+    index = index.ravel()
+    if full < col_num:
+        tail = np.asarray(y[full:])
+        index = np.concatenate((index, np.unique([full + tail.argmin(), full + tail.argmax()])))
+    return index, np.asarray(y[index])
+
+
 def SavePlot(figure: matplotlib.figure.Figure, directory: str, name: str, filetype: str):
     """
     Save matplotlib figure to a file
@@ -42,7 +105,7 @@ def SavePlot(figure: matplotlib.figure.Figure, directory: str, name: str, filety
     :param directory: directory to the file
     :param name: name of the file
     :param filetype: file type of saved figure (only support png and svg)
-    :return:
+    :return: path: path of the saved file, None if the file type is not supported
     """
     fileName = directory + name
     print("Plot " + name + " is save to file: " + fileName + ".")
@@ -52,32 +115,133 @@ def SavePlot(figure: matplotlib.figure.Figure, directory: str, name: str, filety
         figure.savefig(fileName + '.png', format='png')
     else:
         print("File type " + filetype + " is not supported by PlotHelper.")
+        return None
+    return fileName + '.' + filetype
 
 
-def MultiRowVoltagePlot(name: str, directory: str, data: np.ndarray, filetype: str):
+def _PyplotFigure(figure_size):
     """
-    Plot multiple rows of voltage data for each compartment separately
+    New figure managed by pyplot
+    """
+    return plt.figure(figsize=figure_size)
+
+
+def _AggFigure(figure_size):
+    """
+    New figure outside of pyplot drawn by Agg, it is freed with its last reference
+    """
+    figure = matplotlib.figure.Figure(figsize=figure_size)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _MultiRowFigure(name: str, x_list: np.ndarray, data: np.ndarray, figure_size, new_figure):
+    """
+    Draw each row of data on its own axis with the object oriented API
 
     :param name: name of the figure
-    :param directory: directory to the file
-    :param data: data of the figure from probe
-    :param filetype: file type of saved figure
+    :param x_list: x axis of data
+    :param data: data of the rows
+    :param figure_size: figure size
+    :param new_figure: _PyplotFigure or _AggFigure
     :return: figure: matplotlib figure
     """
-    if type(data) == list:
-        data = np.array(data).reshape(1, len(data))
     row_num = data.shape[0]
-    col_num = data.shape[1]
-    x_list = np.arange(col_num)
-    figure_size = (col_num / 500., row_num * 2)
-    figure, ax = plt.subplots(row_num, 1, sharex='col', figsize=figure_size)
-    if row_num == 1:
-        ax = [ax]
+    figure = new_figure(figure_size)
+    ax = figure.subplots(row_num, 1, sharex='col', squeeze=False)[:, 0]
+    buckets = max(int(figure_size[0] * figure.dpi), 1)
     for num in range(row_num):
-        ax[row_num - 1 - num].plot(x_list, data[num, :])
+        index, y_list = MinMaxDecimate(data[num, :], buckets)
+        ax[row_num - 1 - num].plot(x_list[index], y_list)
         ax[row_num - 1 - num].set_ylabel(str(num))
     ax[0].set_title(name)
-    plt.xlabel("Simulation time (ms)")
+    ax[row_num - 1].set_xlabel("Simulation time (ms)")
+    return figure
+
+
+def _VoltageFigure(name: str, data, new_figure=_PyplotFigure):
+    """
+    Figure of MultiRowVoltagePlot
+    """
+    data = _LoadData(data)
+    return _MultiRowFigure(name, np.arange(data.shape[1]), data,
+                           _FigureSize(data.shape[0], data.shape[1]), new_figure)
+
+
+def _FiringRateFigure(name: str, data, enable_gap=False, window=250, new_figure=_PyplotFigure):
+    """
+    Figure of FiringRatePlot
+    """
+    data = _LoadData(data)
+    row_num = data.shape[0]
+    col_num = data.shape[1]
+    if col_num < window:
+        window = int(col_num / 4)
+    if enable_gap:
+        fr_data, fr_x = FiringRateComputeGap(data)
+    else:
+        fr_data, fr_x = FiringRateCompute(data, window)
+    return _MultiRowFigure(name, fr_x, fr_data, _FigureSize(row_num, col_num), new_figure)
+
+
+# Above this number of spikes rasters are drawn as an image instead of one marker per spike
+RASTER_EVENT_LIMIT = 50000
+
+
+def _RasterFigure(name: str, data, sim_time: int, mode='auto', new_figure=_PyplotFigure):
+    """
+    Spike raster drawn with a single eventplot call, or as an image of spike counts binned
+    to the pixel columns of the axis for large populations
+
+    :param name: name of the figure
+    :param data: spike times of neurons, SpikeTrains, PackedRaster or data of spikes
+    :param sim_time: simulation time
+    :param mode: 'event', 'image' or 'auto' to choose from the number of spikes
+    :param new_figure: _PyplotFigure or _AggFigure
+    :return: figure: matplotlib figure
+    """
+    if isinstance(data, list):
+        data = SpikeTrains.fromSpikeTimes(data, sim_time)
+    elif not isinstance(data, SpikeTrains):
+        data = _LoadData(data)
+        if isinstance(data, PackedRaster):
+            data = data.toSpikeTrains()
+        else:
+            data = SpikeTrains.fromDense(data)
+    rows, times = data.flatTimes()
+    if mode == 'auto':
+        mode = 'image' if times.shape[0] > RASTER_EVENT_LIMIT else 'event'
+    assert mode in ('event', 'image')
+    figure = new_figure(None)
+    ax = figure.subplots()
+    if mode == 'event':
+        ax.eventplot(list(data), colors='k', linewidths=1)
+    else:
+        row_num = len(data)
+        column_num = max(min(sim_time, int(figure.get_figwidth() * figure.dpi)), 1)
+        columns = np.minimum(times.astype(np.int64) * column_num // max(sim_time, 1), column_num - 1)
+        keep = times < sim_time
+        counts = np.bincount(rows[keep] * column_num + columns[keep], minlength=row_num * column_num)
+        ax.imshow(counts.reshape(row_num, column_num), aspect='auto', origin='lower', cmap='Greys',
+                  interpolation='nearest', extent=(0, sim_time, -0.5, row_num - 0.5))
+    ax.set_xlim([0, sim_time])
+    ax.set_title(name)
+    ax.set_xlabel("Simulation time (ms)")
+    ax.set_ylabel("Neuron index")
+    return figure
+
+
+def MultiRowVoltagePlot(name: str, directory: str, data: np.ndarray, filetype: str):
+    """
+    Plot multiple rows of voltage data for each compartment separately
+
+    :param name: name of the figure
+    :param directory: directory to the file
+    :param data: data of the figure from probe (array, memmap or .npy path)
+    :param filetype: file type of saved figure
+    :return: figure: matplotlib figure
+    """
+    figure = _VoltageFigure(name, data)
     SavePlot(figure, directory, name, filetype)
     return figure
 
@@ -88,7 +252,7 @@ def MultiRowCurrentPlot(name: str, directory: str, data: np.ndarray, filetype: s
 
     :param name: name of the figure
     :param directory: directory to the file
-    :param data: data of the figure from probe
+    :param data: data of the figure from probe (array, memmap or .npy path)
     :param filetype: file type of saved figure
     :return: figure: matplotlib figure
     """
@@ -96,45 +260,138 @@ def MultiRowCurrentPlot(name: str, directory: str, data: np.ndarray, filetype: s
     return figure
 
 
-def FiringRateCompute(data: np.ndarray, window: int):
+def _SpikeCumsum(data: np.ndarray):
     """
-    Compute firing rate of single or multiple neurons using sliding window
+    Cumulative spike count of each row with a leading zero column
+
+    :param data: data of neuron spikes, SpikeTrains or PackedRaster
+    :return: spike_cumsum: ndarray of shape (rows, time steps + 1)
+    """
+    if isinstance(data, PackedRaster):
+        return data.cumulativeCounts()
+    row_num = data.shape[0]
+    col_num = data.shape[1]
+    if isinstance(data, SpikeTrains):
+        spike_cumsum = np.zeros((row_num, col_num + 1), dtype=np.int32)
+        for num, times in enumerate(data):
+            np.cumsum(np.bincount(times - data.t_start, minlength=col_num), out=spike_cumsum[num, 1:])
+        return spike_cumsum
+    if data.dtype.kind in 'biu':
+        dtype = np.int32 if col_num < np.iinfo(np.int32).max else np.int64
+    else:
+        dtype = np.float64
+    spike_cumsum = np.zeros((row_num, col_num + 1), dtype=dtype)
+    np.cumsum(data, axis=1, dtype=dtype, out=spike_cumsum[:, 1:])
+    return spike_cumsum
+
 
-    :param data: data of neuron spikes
+def _WindowFiringRate(spike_cumsum: np.ndarray, window: int):
+    """
+    Sliding window firing rate from cumulative spike counts
+
+    :param spike_cumsum: cumulative spike count from _SpikeCumsum
     :param window: window size in ms
     :return: fr_data: data of firing rates
     :return: fr_x: x axis of firing rates
     """
-    if type(data) == list:
-        data = np.array(data).reshape(1, len(data))
-    row_num = data.shape[0]
-    col_num = data.shape[1]
-    fr_data = np.zeros((row_num, col_num - window))
-    for num in range(col_num-window):
-        fr_data[:, num] = data[:, num:num+window].sum(axis=1) / (window / 1000.)
+    col_num = spike_cumsum.shape[1] - 1
+    spike_count = spike_cumsum[:, window:col_num] - spike_cumsum[:, :col_num - window]
+    fr_data = spike_count / (window / 1000.)
     fr_x = np.arange(col_num - window) + int(window / 2)
     return fr_data, fr_x
 
 
+def FiringRateCompute(data: np.ndarray, window: int):
+    """
+    Compute firing rate of single or multiple neurons using sliding window
+
+    :param data: data of neuron spikes (array, memmap or .npy path), SpikeTrains or PackedRaster
+    :param window: window size in ms
+    :return: fr_data: data of firing rates
+    :return: fr_x: x axis of firing rates
+    """
+    data = _LoadData(data)
+    # window 0 gives NaN rates and window == data.shape[1] empty ones, like the per window loop did
+    assert 0 <= window <= data.shape[1]
+    return _WindowFiringRate(_SpikeCumsum(data), window)
+
+
+def FiringRateComputeMultiWindow(data: np.ndarray, windows: list):
+    """
+    Compute firing rate of single or multiple neurons for several sliding window sizes
+
+    :param data: data of neuron spikes (array, memmap or .npy path), SpikeTrains or PackedRaster
+    :param windows: list of window sizes in ms
+    :return: fr_list: list of (fr_data, fr_x) for each window size
+    """
+    data = _LoadData(data)
+    spike_cumsum = _SpikeCumsum(data)
+    fr_list = []
+    for window in windows:
+        assert 0 <= window <= data.shape[1]
+        fr_list.append(_WindowFiringRate(spike_cumsum, window))
+    return fr_list
+
+
+def _GapFiringRateFill(fr_row: np.ndarray, times: np.ndarray):
+    """
+    Fill firing rate of one neuron from its sorted spike times, the rate between two spikes is 1000 / gap
+
+    :param fr_row: firing rate of the neuron to fill
+    :param times: sorted spike times of the neuron
+    :return:
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if times.shape[0] < 2:
+        return
+    gaps = np.diff(times)
+    valid = gaps > 0
+    if not valid.any():
+        return
+    rates = 1000. / gaps[valid]
+    stops = np.minimum(times[1:][valid], fr_row.shape[0])
+    starts = np.minimum(times[:-1][valid], stops)
+    fr_row[starts[0]:stops[-1]] = np.repeat(rates, stops - starts)
+
+
 def FiringRateComputeGap(data: np.ndarray):
     """
     Compute firing rate of single or multiple neurons using spike gap time
 
-    :param data: data of neuron spikes
+    :param data: data of neuron spikes (array, memmap or .npy path), SpikeTrains or PackedRaster
     :return: fr_data: data of firing rates
     :return: fr_x: x axis of firing rates
     """
-    if type(data) == list:
-        data = np.array(data).reshape(1, len(data))
+    data = _LoadData(data)
+    if isinstance(data, PackedRaster):
+        data = data.toSpikeTrains()
+    if isinstance(data, SpikeTrains):
+        return FiringRateComputeGapSpikeTimes([times - data.t_start for times in data], data.time_steps)
     row_num = data.shape[0]
     col_num = data.shape[1]
     fr_data = np.zeros((row_num, col_num))
     fr_x = np.arange(col_num)
-    spike_times = Spikes2SpikeTime(data)
+    spike_rows, spike_cols = np.nonzero(data)
+    row_ptr = np.searchsorted(spike_rows, np.arange(row_num + 1))
+    for r in range(row_num):
+        _GapFiringRateFill(fr_data[r, :], spike_cols[row_ptr[r]:row_ptr[r+1]])
+    return fr_data, fr_x
+
+
+def FiringRateComputeGapSpikeTimes(spike_times: list, time_steps: int):
+    """
+    Compute firing rate of single or multiple neurons using spike gap time directly from spike times
+
+    :param spike_times: sorted spike times of each neuron
+    :param time_steps: number of time steps
+    :return: fr_data: data of firing rates
+    :return: fr_x: x axis of firing rates
+    """
+    row_num = len(spike_times)
+    fr_data = np.zeros((row_num, time_steps))
+    fr_x = np.arange(time_steps)
     for r in range(row_num):
-        for t in range(len(spike_times[r]) - 1):
-            firing_rate = 1000. / (spike_times[r][t+1] - spike_times[r][t])
-            fr_data[r, spike_times[r][t]:spike_times[r][t+1]] = firing_rate
+        _GapFiringRateFill(fr_data[r, :], spike_times[r])
     return fr_data, fr_x
 
 
@@ -144,31 +401,13 @@ def FiringRatePlot(name: str, directory: str, data: np.ndarray, filetype: str, e
 
     :param name: name of the figure
     :param directory: directory to the file
-    :param data: data of the figure in neuron spikes
+    :param data: data of the figure in neuron spikes (array, memmap or .npy path), SpikeTrains or PackedRaster
     :param filetype: file type of saved figure
     :param enable_gap: if or not using spike gap to compute firing rate
     :param window: window size in ms
     :return: figure: matplotlib figure
     """
-    if type(data) == list:
-        data = np.array(data).reshape(1, len(data))
-    row_num = data.shape[0]
-    col_num = data.shape[1]
-    if col_num < window:
-        window = int(col_num / 4)
-    if enable_gap:
-        fr_data, fr_x = FiringRateComputeGap(data)
-    else:
-        fr_data, fr_x = FiringRateCompute(data, window)
-    figure_size = (col_num / 500., row_num * 2)
-    figure, ax = plt.subplots(row_num, 1, sharex='col', figsize=figure_size)
-    if row_num == 1:
-        ax = [ax]
-    for num in range(row_num):
-        ax[row_num - 1 - num].plot(fr_x, fr_data[num, :])
-        ax[row_num - 1 - num].set_ylabel(str(num))
-    ax[0].set_title(name)
-    plt.xlabel("Simulation time (ms)")
+    figure = _FiringRateFigure(name, data, enable_gap, window)
     SavePlot(figure, directory, name, filetype)
     return figure
 
@@ -196,25 +435,23 @@ def Spikes2SpikeTime(data: np.ndarray):
     :param data: data of spikes
     :return: spike_times: time of spikes
     """
-    if type(data) == list:
-        data = np.array(data).reshape(1, len(data))
+    data = _LoadData(data)
     spike_times = [np.where(data[num, :])[0].tolist() for num in range(data.shape[0])]
     return spike_times
 
 
-def SpikesRasterPlot(name: str, directory: str, data: list, sim_time: int, filetype: str):
+def SpikesRasterPlot(name: str, directory: str, data: list, sim_time: int, filetype: str, mode='auto'):
     """
     Plot Spike Raster
 
     :param name: name of the figure
     :param directory: directory to the figure
-    :param data: spike times of neurons
+    :param data: spike times of neurons, SpikeTrains, PackedRaster or data of spikes
     :param sim_time: simulation time
     :param filetype: type of file
+    :param mode: 'event' for one marker per spike, 'image' for binned spike counts, 'auto' to choose
     :return: figure: matplotlib figure
     """
-    figure = plt.figure()
-    plt.xlim([0, sim_time])
-    plotRaster(data)
+    figure = _RasterFigure(name, data, sim_time, mode)
     SavePlot(figure, directory, name, filetype)
     return figure
@@ -0,0 +1,225 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the compact spike train container shared by the plot helper.
+
+Spike times of all neurons live in one int32 array, neuron n owns times[starts[n]:stops[n]].
+Slicing by neuron or by time window only creates new starts/stops and shares the times array.
+"""
+import numpy as np
+
+
+def _RowSearchsorted(times: np.ndarray, starts: np.ndarray, stops: np.ndarray, value: int):
+    """
+    Binary search value in every row at once
+
+    :param times: spike times
+    :param starts: first index of each row
+    :param stops: index after the last of each row
+    :param value: searched time
+    :return: index of the first time >= value in each row
+    """
+    low = starts.copy()
+    high = stops.copy()
+    active = np.where(low < high)[0]
+    while active.shape[0] > 0:
+        mid = (low[active] + high[active]) >> 1
+        right = times[mid] < value
+        low[active] = np.where(right, mid + 1, low[active])
+        high[active] = np.where(right, high[active], mid)
+        active = active[low[active] < high[active]]
+    return low
+
+
+class SpikeTrains:
+    def __init__(self, times: np.ndarray, starts: np.ndarray, stops: np.ndarray, t_start: int, t_stop: int):
+        """
+        Spike trains of neurons in the time range [t_start, t_stop)
+
+        :param times: int32 spike times, sorted within each neuron
+        :param starts: first index of each neuron in times
+        :param stops: index after the last of each neuron in times
+        :param t_start: first timestep of the spike trains
+        :param t_stop: timestep after the spike trains
+        """
+        assert starts.shape == stops.shape
+        assert t_start <= t_stop
+        self.times = times
+        self.starts = starts
+        self.stops = stops
+        self.t_start = t_start
+        self.t_stop = t_stop
+
+    @classmethod
+    def fromIndptr(cls, indptr: np.ndarray, times: np.ndarray, time_steps: int):
+        """
+        Spike trains from CSR arrays, neuron n owns times[indptr[n]:indptr[n+1]]
+
+        :param indptr: row pointer of neurons
+        :param times: spike times sorted within each neuron
+        :param time_steps: number of time steps
+        :return: SpikeTrains
+        """
+        indptr = np.asarray(indptr, dtype=np.int64)
+        return cls(np.asarray(times, dtype=np.int32), indptr[:-1], indptr[1:], 0, time_steps)
+
+    @classmethod
+    def fromSpikeTimes(cls, spike_times: list, time_steps: int):
+        """
+        Spike trains from a list of spike times of each neuron
+
+        :param spike_times: time of spikes
+        :param time_steps: number of time steps
+        :return: SpikeTrains
+        """
+        counts = np.array([len(times) for times in spike_times], dtype=np.int64)
+        indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        times = np.zeros(indptr[-1], dtype=np.int32)
+        for num, neuron_times in enumerate(spike_times):
+            times[indptr[num]:indptr[num + 1]] = neuron_times
+        return cls.fromIndptr(indptr, times, time_steps)
+
+    @classmethod
+    def fromDense(cls, data: np.ndarray):
+        """
+        Spike trains from a dense spike matrix (neurons x time steps), e.g. spike probe data
+
+        :param data: data of spikes
+        :return: SpikeTrains
+        """
+        if type(data) == list:
+            data = np.array(data).reshape(1, len(data))
+        rows, cols = np.nonzero(data)
+        indptr = np.searchsorted(rows, np.arange(data.shape[0] + 1))
+        return cls.fromIndptr(indptr, cols.astype(np.int32), data.shape[1])
+
+    @classmethod
+    def fromProbeData(cls, probe_data):
+        """
+        Spike trains from data of a spike probe
+
+        :param probe_data: probe.data of a spike probe
+        :return: SpikeTrains
+        """
+        return cls.fromDense(np.asarray(probe_data).reshape(-1, np.shape(probe_data)[-1]))
+
+    @property
+    def time_steps(self):
+        return self.t_stop - self.t_start
+
+    @property
+    def shape(self):
+        return self.starts.shape[0], self.time_steps
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.starts.nbytes + self.stops.nbytes
+
+    def __len__(self):
+        return self.starts.shape[0]
+
+    def __getitem__(self, item):
+        """
+        Spike times (absolute time steps) of one neuron or spike trains of a neuron subset
+
+        :param item: neuron index, slice or index array
+        :return: int32 array view or SpikeTrains sharing the times array
+        """
+        if isinstance(item, (int, np.integer)):
+            return self.times[self.starts[item]:self.stops[item]]
+        return SpikeTrains(self.times, self.starts[item], self.stops[item], self.t_start, self.t_stop)
+
+    def __iter__(self):
+        for num in range(len(self)):
+            yield self.times[self.starts[num]:self.stops[num]]
+
+    def counts(self):
+        """
+        Number of spikes of each neuron
+
+        :return: counts
+        """
+        return self.stops - self.starts
+
+    def window(self, t_start: int, t_stop: int):
+        """
+        Spike trains in the time window [t_start, t_stop), sharing the times array
+
+        :param t_start: first timestep of the window
+        :param t_stop: timestep after the window
+        :return: SpikeTrains
+        """
+        t_start = max(t_start, self.t_start)
+        t_stop = min(max(t_stop, t_start), self.t_stop)
+        starts = _RowSearchsorted(self.times, self.starts, self.stops, t_start)
+        stops = _RowSearchsorted(self.times, starts, self.stops, t_stop)
+        return SpikeTrains(self.times, starts, stops, t_start, t_stop)
+
+    def flatTimes(self):
+        """
+        Spike times of all neurons and the neuron of each spike
+
+        :return: rows: neuron index of each spike
+        :return: times: spike times
+        """
+        counts = self.counts()
+        offsets = np.zeros(counts.shape[0], dtype=np.int64)
+        np.cumsum(counts[:-1], out=offsets[1:])
+        index = np.arange(counts.sum(), dtype=np.int64) + np.repeat(self.starts - offsets, counts)
+        return np.repeat(np.arange(counts.shape[0]), counts), self.times[index]
+
+    def toIndptr(self):
+        """
+        Contiguous CSR arrays of the spike trains
+
+        :return: indptr: row pointer of neurons
+        :return: times: spike times
+        """
+        counts = self.counts()
+        indptr = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return indptr, self.flatTimes()[1]
+
+    def toDense(self, dtype=np.int_):
+        """
+        Dense spike matrix, column 0 is time step t_start
+
+        :param dtype: dtype of the matrix
+        :return: spike_data: ndarray of spikes
+        """
+        spike_data = np.zeros(self.shape, dtype=dtype)
+        rows, times = self.flatTimes()
+        spike_data[rows, times - self.t_start] = 1
+        return spike_data
+
+    def toSpikeTimes(self):
+        """
+        List of spike times of each neuron
+
+        :return: spike_times: list of int32 arrays
+        """
+        return list(self)
@@ -0,0 +1,208 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module contains the on-disk probe recording format.
+
+A recording is a directory with one sub directory of chunk .npy files per probe and a JSON
+manifest of the probe condition enum value, compartment role, dtype and time range. Chunks
+are consolidated into one .npy per probe which is reopened as a read only memmap, so runs
+bigger than RAM can be analysed and reopening an old run costs nothing.
+"""
+import json
+import os
+import shutil
+import numpy as np
+
+MANIFEST = 'manifest.json'
+RECORDING_VERSION = 1
+
+
+class ProbeRecorder:
+    def __init__(self, directory: str):
+        """
+        Recorder of probe data, usable as sink of SegmentedRun. Chunk records reach the manifest
+        on register, flush and consolidate, not after every chunk, SegmentedRun flushes after every run.
+
+        :param directory: directory of the recording, an existing recording is appended to
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                self.manifest = json.load(file)
+            assert self.manifest['version'] == RECORDING_VERSION
+        else:
+            self.manifest = {'version': RECORDING_VERSION, 'probes': {}}
+
+    def register(self, name: str, condition=None, role=None):
+        """
+        Register a probe before its data arrives
+
+        :param name: name of the probe
+        :param condition: probe condition enum (or its int value)
+        :param role: compartment role, e.g. 'sr', 'ip3', 'sic', 'sg' or 'post'
+        :return:
+        """
+        if condition is not None:
+            condition = int(getattr(condition, 'value', condition))
+        entry = self.manifest['probes'].setdefault(
+            name, {'condition': None, 'role': None, 'dtype': None, 'rows': None,
+                   't_start': None, 't_stop': None, 'chunks': [], 'file': None})
+        if condition is not None:
+            entry['condition'] = condition
+        if role is not None:
+            entry['role'] = role
+        self._writeManifest()
+
+    def __call__(self, name: str, t_start: int, t_stop: int, data):
+        """
+        Append one chunk of probe data
+
+        :param name: name of the probe
+        :param t_start: first timestep of the chunk
+        :param t_stop: timestep after the chunk
+        :param data: probe data of the chunk (rows x time steps)
+        :return:
+        """
+        if name not in self.manifest['probes']:
+            self.register(name)
+        entry = self.manifest['probes'][name]
+        assert entry['file'] is None, "Probe " + name + " is already consolidated"
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        if entry['t_stop'] is None:
+            entry['t_start'] = t_start
+            entry['rows'] = data.shape[0]
+            entry['dtype'] = data.dtype.str
+        else:
+            assert entry['t_stop'] == t_start, "Chunks of probe " + name + " are not contiguous"
+            assert entry['rows'] == data.shape[0]
+            data = data.astype(np.dtype(entry['dtype']), copy=False)
+        entry['t_stop'] = t_stop
+        chunk_file = os.path.join(name, "%010d.npy" % t_start)
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        np.save(os.path.join(self.directory, chunk_file), data)
+        entry['chunks'].append([t_start, t_stop, chunk_file])
+
+    def flush(self):
+        """
+        Write the chunks appended since the last manifest update to the manifest
+
+        :return:
+        """
+        self._writeManifest()
+
+    def record(self, name: str, probe_data, condition=None, role=None, t_start=0):
+        """
+        Record the whole data of a probe after a run
+
+        :param name: name of the probe
+        :param probe_data: probe.data
+        :param condition: probe condition enum (or its int value)
+        :param role: compartment role
+        :param t_start: first timestep of the data
+        :return:
+        """
+        self.register(name, condition, role)
+        probe_data = np.asarray(probe_data)
+        self(name, t_start, t_start + probe_data.shape[-1], probe_data)
+        self.flush()
+
+    def consolidate(self):
+        """
+        Merge the chunks of every probe into one .npy file, one chunk in memory at a time
+
+        :return:
+        """
+        for name, entry in self.manifest['probes'].items():
+            if entry['file'] is not None or not entry['chunks']:
+                continue
+            chunks = [np.load(os.path.join(self.directory, chunk_file), mmap_mode='r')
+                      for _, _, chunk_file in entry['chunks']]
+            column_num = sum(chunk.shape[1] for chunk in chunks)
+            file_name = name + '.npy'
+            merged = np.lib.format.open_memmap(os.path.join(self.directory, file_name), mode='w+',
+                                               dtype=np.dtype(entry['dtype']), shape=(entry['rows'], column_num))
+            column = 0
+            for chunk in chunks:
+                merged[:, column:column + chunk.shape[1]] = chunk
+                column += chunk.shape[1]
+            merged.flush()
+            del merged, chunks
+            entry['file'] = file_name
+            entry['chunks'] = []
+            self._writeManifest()
+            shutil.rmtree(os.path.join(self.directory, name))
+
+    def _writeManifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        tmp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.manifest, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+class Recording:
+    def __init__(self, directory: str):
+        """
+        Read only view of a recording, probe data is opened as memmap on access
+
+        :param directory: directory of the recording
+        """
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as file:
+            self.manifest = json.load(file)
+        assert self.manifest['version'] == RECORDING_VERSION
+
+    def names(self):
+        return sorted(self.manifest['probes'])
+
+    def info(self, name: str):
+        """
+        Manifest entry of a probe: condition, role, dtype, rows, t_start and t_stop
+
+        :param name: name of the probe
+        :return: entry
+        """
+        return self.manifest['probes'][name]
+
+    def path(self, name: str):
+        """
+        Path of the .npy file holding the whole data of a probe
+
+        :param name: name of the probe
+        :return: path
+        """
+        entry = self.manifest['probes'][name]
+        if entry['file'] is not None:
+            return os.path.join(self.directory, entry['file'])
+        assert len(entry['chunks']) == 1, "Probe " + name + " has several chunks, consolidate the recording"
+        return os.path.join(self.directory, entry['chunks'][0][2])
+
+    def __getitem__(self, name: str):
+        return np.load(self.path(name), mmap_mode='r')
@@ -0,0 +1,192 @@
+"""
+MIT License
+
+Copyright (c) 2018 Guangzhi Tang
+Copyright (c) 2018 Arpit Shah
+Copyright (c) 2018 Computational Brain Lab, Computer Science Department, Rutgers University
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+"""
+This module contains the parameter sweep runner.
+
+Every point of a sweep is a set of FeedforwardNANEmulator constructor arguments, Astrocyte arguments
+included, plus a seed. Points run in a process pool on the CPU emulator and their summaries are cached
+on disk under a hash of the point, so interrupted or repeated sweeps skip the points already done.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from combra_loihi.nan.emulator import FeedforwardNANEmulator
+
+# Bump to invalidate cached results after a change of the emulator or the summaries
+CACHE_VERSION = 2
+
+NAN_ARGS = ('pre_num', 'post_num', 'pre_fr', 'pre_post_w', 'pre_post_conn_p',
+            'post_vth', 'post_cdecay', 'post_vdecay', 'sim_time')
+SUMMARY_FIELDS = ('post_fr', 'sr_spikes', 'ip3_spikes', 'sic_peak', 'sg_spikes')
+
+
+def grid_spec(**axes):
+    """
+    Cartesian product of parameter values
+
+    :param axes: parameter name -> list of values
+    :return: list of configs
+    """
+    names = sorted(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*[axes[name] for name in names])]
+
+
+def random_spec(num, seed=None, **axes):
+    """
+    Random search over parameter values
+
+    :param num: number of configs
+    :param seed: seed of the random generator
+    :param axes: parameter name -> list of values to choose from, or (low, high) tuple to sample uniformly
+                 (integers when both bounds are integers)
+    :return: list of configs
+    """
+    rng = np.random.default_rng(seed)
+    configs = [dict() for _ in range(num)]
+    for name in sorted(axes):
+        axis = axes[name]
+        if isinstance(axis, tuple):
+            low, high = axis
+            if isinstance(low, int) and isinstance(high, int):
+                values = rng.integers(low, high, size=num, endpoint=True).tolist()
+            else:
+                values = rng.uniform(low, high, size=num).tolist()
+        else:
+            values = [axis[num] for num in rng.integers(0, len(axis), size=num)]
+        for config, value in zip(configs, values):
+            config[name] = value
+    return configs
+
+
+def _json_default(value):
+    """
+    numpy scalars and arrays of configs, e.g. from grid_spec(pre_fr=np.arange(...)), as plain values
+    """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError("Object of type " + type(value).__name__ + " is not JSON serializable")
+
+
+def point_key(config: dict, seed: int):
+    """
+    Content address of a sweep point, numpy and plain values of a parameter give the same key
+
+    :param config: constructor arguments
+    :param seed: seed of the trial
+    :return: hex digest
+    """
+    content = json.dumps({'version': CACHE_VERSION, 'config': config, 'seed': seed}, sort_keys=True,
+                         default=_json_default)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def run_point(config: dict, seed: int):
+    """
+    Run one sweep point on the CPU emulator and summarize it
+
+    :param config: FeedforwardNANEmulator and Astrocyte constructor arguments
+    :param seed: seed of the trial
+    :return: summary: dict of SUMMARY_FIELDS
+    """
+    if ('sic_amplitude' in config) != ('sic_window' in config):
+        raise ValueError("sic_amplitude and sic_window must be swept together, the point has only one of them")
+    # numpy scalars would fail the isinstance checks of FeedforwardNANEmulator
+    config = {name: value.item() if isinstance(value, np.generic) else value for name, value in config.items()}
+    nan_kwargs = {name: value for name, value in config.items() if name in NAN_ARGS}
+    astro_kwargs = {name: value for name, value in config.items() if name not in NAN_ARGS}
+    nan = FeedforwardNANEmulator(seed=seed, astrocyte_kwargs=astro_kwargs, **nan_kwargs)
+    post_data, astro_data = nan.run(['SPIKE'], [3, 6, 8, 11])
+    return {'post_fr': float(post_data[0].sum() / nan.post_num / (nan.sim_time / 1000.)),
+            'sr_spikes': int(astro_data[0].sum()),
+            'ip3_spikes': int(astro_data[1].sum()),
+            'sic_peak': int(astro_data[2].max()),
+            'sg_spikes': int(astro_data[3].sum())}
+
+
+def _cache_path(cache_dir, config, seed):
+    return os.path.join(cache_dir, point_key(config, seed) + '.json')
+
+
+def _run_cached(config, seed, cache_dir):
+    summary = run_point(config, seed)
+    path = _cache_path(cache_dir, config, seed)
+    tmp_path = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump({'config': config, 'seed': seed, 'summary': summary}, file, sort_keys=True,
+                  default=_json_default)
+    os.replace(tmp_path, path)
+    return summary
+
+
+def run_sweep(configs: list, cache_dir: str, seeds=(0,), max_workers=None, callback=None):
+    """
+    Run every config for every seed in a process pool, skipping points already in the cache
+
+    :param configs: list of configs from grid_spec, random_spec or hand written dicts
+    :param cache_dir: directory of cached point summaries and of results.csv
+    :param seeds: seeds of the trials of every config
+    :param max_workers: number of processes, None for one per core
+    :param callback: called with (config, seed, summary) as every point finishes
+    :return: results: structured ndarray with one row per point, cached points first
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    names = sorted(set(name for config in configs for name in config))
+    fields = names + ['seed'] + list(SUMMARY_FIELDS)
+    rows = []
+    with open(os.path.join(cache_dir, 'results.csv'), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(fields)
+
+        def collect(config, seed, summary):
+            row = [config.get(name, np.nan) for name in names] + [seed] + [summary[f] for f in SUMMARY_FIELDS]
+            writer.writerow(row)
+            file.flush()
+            rows.append(tuple(row))
+            if callback is not None:
+                callback(config, seed, summary)
+
+        pending = []
+        for config in configs:
+            for seed in seeds:
+                path = _cache_path(cache_dir, config, seed)
+                if os.path.exists(path):
+                    with open(path) as cached:
+                        collect(config, seed, json.load(cached)['summary'])
+                else:
+                    pending.append((config, seed))
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(_run_cached, config, seed, cache_dir): (config, seed)
+                           for config, seed in pending}
+                for future in as_completed(futures):
+                    config, seed = futures[future]
+                    collect(config, seed, future.result())
+    return np.array(rows, dtype=[(field, np.float64) for field in fields])
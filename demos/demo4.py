@@ -66,7 +66,7 @@ if __name__ == '__main__':
     fig = plt.figure(1, figsize=(18, 28))
     ax0 = plt.subplot(6, 1, 1)
     ax0.set_xlim(0, sim_time)
-    plotRaster(pre_spikes)
+    plotRaster(pre_spikes.toSpikeTimes())
     plt.ylabel('neuron index')
     plt.xlabel('time (ms)')
     plt.title('Presynaptic neurons poisson spikes')
@@ -0,0 +1,22 @@
+import os
+import numpy as np
+from combra_loihi.plothelper.batch import PlotJob, RenderPlots
+
+
+def _jobs(directory, data_path):
+    spikes = (np.random.default_rng(0).random((3, 400)) < 0.05).astype(int)
+    return [PlotJob('voltage', 'voltage', directory, data_path),
+            PlotJob('firing_rate', 'rate', directory, spikes, window=50),
+            PlotJob('raster', 'raster', directory, spikes, sim_time=400, mode='image'),
+            PlotJob('current', 'current', directory, np.arange(100), filetype='svg')]
+
+
+def test_render_plots(tmp_path):
+    data_path = str(tmp_path / 'voltage.npy')
+    np.save(data_path, np.random.default_rng(1).integers(0, 100, (2, 1000)))
+    for max_workers, subdirectory in ((1, 'serial'), (2, 'pool')):
+        directory = str(tmp_path / subdirectory) + os.sep
+        os.mkdir(directory)
+        paths = RenderPlots(_jobs(directory, data_path), max_workers=max_workers)
+        assert paths == [directory + name for name in ('voltage.png', 'rate.png', 'raster.png', 'current.svg')]
+        assert all(os.path.getsize(path) > 0 for path in paths)
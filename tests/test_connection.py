@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from combra_loihi.astro.connection import connection_arrays, population_connection_arrays
+
+
+def _dense(array):
+    return array.toarray() if sp.issparse(array) else np.asarray(array)
+
+
+def test_full_connection():
+    mask, w = connection_arrays(1, 10, (1, 4))
+    np.testing.assert_array_equal(mask, np.ones((1, 4)))
+    np.testing.assert_array_equal(w, np.full((1, 4), 10))
+
+
+def test_dense_mask():
+    dense = np.array([[1, 0, 1, 1]])
+    mask, w = connection_arrays(dense, np.array([[1, 2, 3, 4]]), (1, 4))
+    np.testing.assert_array_equal(mask, dense)
+    np.testing.assert_array_equal(w, [[1, 2, 3, 4]])
+
+
+def test_dense_vector_is_not_an_index_array():
+    for shape in ((1, 4), (4, 1)):
+        mask, w = connection_arrays(np.array([1, 0, 1, 1]), 10, shape)
+        np.testing.assert_array_equal(_dense(mask).reshape(-1), [1, 0, 1, 1])
+        np.testing.assert_array_equal(_dense(w).reshape(-1), [10, 10, 10, 10])
+
+
+@pytest.mark.parametrize('shape, compressed', [((1, 10), sp.csr_matrix), ((10, 1), sp.csc_matrix)])
+def test_index_array(shape, compressed):
+    mask, w = connection_arrays(np.array([7, 2, 5]), np.array([1, 2, 3]), shape)
+    assert isinstance(mask, compressed) and isinstance(w, compressed)
+    expected = np.zeros(10, dtype=np.int64)
+    expected[[7, 2, 5]] = [1, 2, 3]
+    np.testing.assert_array_equal(_dense(w).reshape(-1), expected)
+    np.testing.assert_array_equal(_dense(mask).reshape(-1), expected != 0)
+    mask, w = connection_arrays(np.array([7, 2, 5]), 4, shape)
+    np.testing.assert_array_equal(_dense(w).reshape(-1), (expected != 0) * 4)
+
+
+def test_index_array_rejects_ambiguous_and_invalid():
+    with pytest.raises(AssertionError):
+        connection_arrays(np.array([True, False, True, True]), 10, (1, 4))
+    with pytest.raises(AssertionError):
+        connection_arrays(np.array([2, 2]), np.array([5, 7]), (1, 10))
+    with pytest.raises(AssertionError):
+        connection_arrays(np.array([3, 10]), 1, (1, 10))
+    with pytest.raises(AssertionError):
+        connection_arrays(np.array([1.0, 3.0]), 1, (1, 10))
+
+
+def test_sparse_mask():
+    sparse = sp.csr_matrix(np.array([[0, 1, 0, 1, 0]]))
+    mask, w = connection_arrays(sparse, np.arange(5).reshape(1, 5), (1, 5))
+    np.testing.assert_array_equal(_dense(mask), [[0, 1, 0, 1, 0]])
+    np.testing.assert_array_equal(_dense(w), [[0, 1, 0, 3, 0]])
+    mask, w = connection_arrays(1, sp.csr_matrix(np.array([[0, 6, 0, 0, 9]])), (1, 5))
+    np.testing.assert_array_equal(_dense(mask), [[0, 1, 0, 0, 1]])
+
+
+def test_population_sparse_mask():
+    sparse = sp.random(3, 8, density=0.4, random_state=0, format='csr')
+    mask, w = population_connection_arrays(sparse, 7, (3, 8))
+    np.testing.assert_array_equal(_dense(mask), sparse.toarray() != 0)
+    np.testing.assert_array_equal(_dense(w), (sparse.toarray() != 0) * 7)
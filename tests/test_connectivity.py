@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from combra_loihi.nan.connectivity import bernoulli_mask, fixed_indegree_mask, fixed_outdegree_mask, pre_post_mask
+
+
+def _check_csr(mask):
+    assert mask.dtype == np.int8 and (mask.data == 1).all()
+    for row in range(mask.shape[0]):
+        assert (np.diff(mask.indices[mask.indptr[row]:mask.indptr[row + 1]]) > 0).all()
+
+
+@pytest.mark.parametrize('indegree', [0, 1, 30, 200, 399, 400])
+def test_fixed_indegree(indegree):
+    mask = fixed_indegree_mask(50, 400, indegree, rng=0)
+    _check_csr(mask)
+    assert mask.shape == (50, 400)
+    assert (np.diff(mask.indptr) == indegree).all()
+
+
+def test_fixed_indegree_equal_to_cols():
+    mask = pre_post_mask(10, 3000, 1.0, 'fixed_indegree', rng=0)
+    assert (mask.toarray() == 1).all()
+    mask = pre_post_mask(100, 5000, 1.0, 'fixed_indegree', rng=0)
+    assert mask.nnz == 100 * 5000
+
+
+@pytest.mark.parametrize('outdegree', [3, 60, 80])
+def test_fixed_outdegree(outdegree):
+    mask = fixed_outdegree_mask(80, 500, outdegree, rng=1)
+    _check_csr(mask)
+    assert mask.shape == (80, 500)
+    assert (np.bincount(mask.indices, minlength=500) == outdegree).all()
+
+
+def test_dense_rows_are_uniform():
+    mask = fixed_indegree_mask(4000, 20, 15, rng=2)
+    column_counts = np.bincount(mask.indices, minlength=20)
+    assert np.abs(column_counts / 4000. - 0.75).max() < 0.03
+
+
+@pytest.mark.parametrize('p', [0.02, 0.2, 0.6])
+def test_bernoulli_density(p):
+    mask = bernoulli_mask(300, 400, p, rng=3)
+    _check_csr(mask)
+    assert abs(mask.nnz / (300 * 400.) - p) < 0.01
+
+
+def test_pre_post_mask_modes():
+    assert (np.diff(pre_post_mask(30, 50, 0.2, 'fixed_indegree', rng=4).indptr) == 10).all()
+    assert (np.bincount(pre_post_mask(30, 50, 0.2, 'fixed_outdegree', rng=4).indices, minlength=50) == 6).all()
+    with pytest.raises(ValueError):
+        pre_post_mask(30, 50, 0.2, 'ring')
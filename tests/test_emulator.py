@@ -0,0 +1,116 @@
+import numpy as np
+from combra_loihi.astro.emulator import AstrocyteEmulator, SG_SPIKE, cuba_step, quantize_weight
+from combra_loihi.astro.sic_calibration import DECAY_UNIT, WEIGHT_SCALE
+from combra_loihi.nan.emulator import FeedforwardNANEmulator
+
+
+def _reference_trace(synaptic_input, current_decay, voltage_decay):
+    """
+    Loihi compartment update with Python integers, decay rounds toward zero
+    """
+    u, v, trace = 0, 0, []
+    for x in synaptic_input:
+        u = int(u * (DECAY_UNIT - current_decay) / DECAY_UNIT) + int(x)
+        v = int(v * (DECAY_UNIT - voltage_decay) / DECAY_UNIT) + u
+        trace.append((u, v))
+    return np.array(trace)
+
+
+def test_cuba_step_negative_weight_rounds_toward_zero():
+    rng = np.random.default_rng(0)
+    weight = quantize_weight(-20, signMode=1) * WEIGHT_SCALE
+    synaptic_input = weight * (rng.random(500) < 0.2)
+    current_decay, voltage_decay = int(1 / 10 * 2 ** 12), int(1 / 4 * 2 ** 12)
+    u = np.zeros(1, dtype=np.int64)
+    v = np.zeros(1, dtype=np.int64)
+    trace = []
+    for x in synaptic_input:
+        cuba_step(u, v, DECAY_UNIT - current_decay, DECAY_UNIT - voltage_decay, np.array([x]))
+        trace.append((u[0], v[0]))
+    trace = np.array(trace)
+    assert (trace < 0).any()
+    np.testing.assert_array_equal(trace, _reference_trace(synaptic_input, current_decay, voltage_decay))
+
+
+def test_cuba_step_mixed_sign_states():
+    u = np.array([-4097, -1, 0, 1, 4097], dtype=np.int64)
+    v = np.zeros(5, dtype=np.int64)
+    cuba_step(u, v, DECAY_UNIT - 1, DECAY_UNIT, np.zeros(5, dtype=np.int64))
+    np.testing.assert_array_equal(u, [int(x * (DECAY_UNIT - 1) / DECAY_UNIT) for x in (-4097, -1, 0, 1, 4097)])
+
+
+def _decay(x, d):
+    return int(x * (DECAY_UNIT - d) / DECAY_UNIT)
+
+
+class _HandAstrocyte:
+    """
+    One astrocyte stepped compartment by compartment with Python integers
+    """
+    def __init__(self):
+        self.u = {'sr': 0, 'ip3': 0, 'sic': 0, 'sg': 0}
+        self.v = {'sr': 0, 'ip3': 0, 'sic': 0, 'sg': 0}
+        self.s = {'sr': False, 'ip3': False, 'sg': False}
+        self.cdecay = {'sr': 409, 'ip3': 4096, 'sic': 40, 'sg': 409}
+        self.vdecay = {'sr': 1024, 'ip3': 1, 'sic': 40, 'sg': 40}
+        self.vth = {'sr': 100 * 64, 'ip3': 15000 * 64, 'sg': 5000 * 64}
+
+    def _compartment(self, role, synaptic_input, join=0):
+        if synaptic_input is not None:
+            self.u[role] = _decay(self.u[role], self.cdecay[role]) + synaptic_input
+        self.v[role] = _decay(self.v[role], self.vdecay[role]) + self.u[role] + join
+        if role in self.vth:
+            self.s[role] = self.v[role] > self.vth[role]
+            if self.s[role]:
+                self.v[role] = 0
+
+    def step(self, sr_input):
+        ip3_spike, sr_spike = self.s['ip3'], self.s['sr']
+        self._compartment('ip3', sr_spike * 20 * 64)
+        self._compartment('sr', sr_input)
+        self._compartment('sic', ip3_spike * 20 * 64)
+        self._compartment('sg', None, self.v['sic'])
+        return self.s['sg']
+
+
+def test_astrocyte_emulator_matches_hand_stepped():
+    rng = np.random.default_rng(0)
+    emulator = AstrocyteEmulator(1)
+    reference = _HandAstrocyte()
+    sr_input = (rng.random(6000) < 0.3) * 45 * 64
+    sg_spikes = 0
+    for x in sr_input:
+        spike = emulator.step(np.array([x]))[0]
+        assert spike == reference.step(int(x))
+        sg_spikes += spike
+        for role in ('sr', 'ip3', 'sic', 'sg'):
+            assert (emulator.state[role]['u'][0], emulator.state[role]['v'][0]) == \
+                (reference.u[role], reference.v[role])
+    assert sg_spikes > 0
+
+
+def test_astrocyte_emulator_run_delays_input():
+    rng = np.random.default_rng(1)
+    input_spikes = rng.random((10, 3000)) < 0.05
+    emulator = AstrocyteEmulator(2)
+    emulator.connectInputNeurons(10, weight=45)
+    data = emulator.run(input_spikes, [SG_SPIKE, 2], chunk=700)
+    emulator.reset()
+    delayed = np.concatenate((np.zeros((10, 1)), input_spikes[:, :-1]), axis=1)
+    sr_voltage = []
+    for t in range(3000):
+        emulator.step(emulator.input_weight.dot(delayed[:, t]).astype(np.int64))
+        sr_voltage.append(emulator.state['sr']['v'].copy())
+    np.testing.assert_array_equal(data[1], np.array(sr_voltage).T)
+
+
+def test_feedforward_emulator_chunking_by_memory():
+    data = []
+    for memory in (2 ** 28, 50000):
+        emulator = FeedforwardNANEmulator(trials=3, pre_num=30, post_num=20, sim_time=1500, seed=3)
+        assert emulator.mask.dtype == np.int8
+        data.append(emulator.run(['SPIKE', 'COMPARTMENT_VOLTAGE'], [SG_SPIKE], memory=memory))
+    for post_a, post_b in zip(data[0][0], data[1][0]):
+        np.testing.assert_array_equal(post_a, post_b)
+    np.testing.assert_array_equal(data[0][1][0], data[1][1][0])
+    assert data[0][0][0].any()
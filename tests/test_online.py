@@ -0,0 +1,60 @@
+import numpy as np
+from scipy.signal import lfilter
+from combra_loihi.plothelper.online import SlidingRate, EwmaRate, IsiRate, RunningStats
+from combra_loihi.plothelper.plothelper import FiringRateCompute, FiringRateComputeGap
+
+# chunk boundaries, with chunks shorter than the window, empty chunks and single steps
+BOUNDS = (0, 3, 3, 4, 30, 31, 90, 157, 300)
+
+
+def _chunks(data):
+    return [data[:, start:stop] for start, stop in zip(BOUNDS[:-1], BOUNDS[1:])]
+
+
+def _spikes(seed=0):
+    return (np.random.default_rng(seed).random((4, BOUNDS[-1])) < 0.08).astype(int)
+
+
+def test_sliding_rate_matches_batch_at_every_boundary():
+    data = _spikes()
+    for window in (1, 7, 25, 100):
+        estimator = SlidingRate(window)
+        fr_list = []
+        x_list = []
+        for chunk, stop in zip(_chunks(data), BOUNDS[1:]):
+            fr_data, fr_x = estimator.update(chunk)
+            fr_list.append(fr_data)
+            x_list.append(fr_x)
+            if stop >= window:
+                batch_data, batch_x = FiringRateCompute(data[:, :stop], window)
+                np.testing.assert_allclose(np.hstack(fr_list), batch_data)
+                np.testing.assert_array_equal(np.concatenate(x_list), batch_x)
+
+
+def test_isi_rate_matches_batch_at_every_boundary():
+    data = _spikes(1)
+    estimator = IsiRate()
+    fr_data = np.zeros(data.shape)
+    for chunk, stop in zip(_chunks(data), BOUNDS[1:]):
+        IsiRate.fill(fr_data, *estimator.update(chunk))
+        np.testing.assert_allclose(fr_data[:, :stop], FiringRateComputeGap(data[:, :stop])[0])
+
+
+def test_ewma_rate_matches_full_filter():
+    data = _spikes(2)
+    estimator = EwmaRate(20.)
+    fr_data = np.hstack([estimator.update(chunk) for chunk in _chunks(data)])
+    decay = np.exp(-1. / 20.)
+    np.testing.assert_allclose(fr_data, lfilter([(1. - decay) * 1000.], [1., -decay], data.astype(float), axis=1))
+
+
+def test_running_stats_match_numpy():
+    data = np.random.default_rng(3).integers(-500, 500, (3, BOUNDS[-1]))
+    stats = RunningStats()
+    for chunk, stop in zip(_chunks(data), BOUNDS[1:]):
+        stats.update(chunk)
+        if stop > 0:
+            np.testing.assert_array_equal(stats.min, data[:, :stop].min(axis=1))
+            np.testing.assert_array_equal(stats.max, data[:, :stop].max(axis=1))
+            np.testing.assert_allclose(stats.mean, data[:, :stop].mean(axis=1))
+    assert stats.count == BOUNDS[-1]
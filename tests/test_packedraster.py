@@ -0,0 +1,43 @@
+import numpy as np
+from combra_loihi.plothelper.packedraster import PackedRaster
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+
+
+def _random_dense(seed=0, neurons=6, time_steps=61):
+    data = (np.random.default_rng(seed).random((neurons, time_steps)) < 0.3).astype(int)
+    data[:, -1] = 1
+    return data
+
+
+def test_packed_raster_round_trips():
+    data = _random_dense()
+    raster = PackedRaster.fromDense(data)
+    assert raster.shape == data.shape and raster.bits.shape == (6, 8)
+    np.testing.assert_array_equal(raster.toDense(), data)
+    np.testing.assert_array_equal(raster.counts(), data.sum(axis=1))
+    spike_trains = raster.toSpikeTrains(block=4)
+    np.testing.assert_array_equal(spike_trains.toDense(), data)
+    np.testing.assert_array_equal(PackedRaster.fromSpikeTrains(spike_trains).bits, raster.bits)
+    np.testing.assert_array_equal(PackedRaster.fromSpikeTrains(SpikeTrains.fromDense(data).window(9, 40)).toDense(),
+                                  data[:, 9:40])
+
+
+def test_packed_raster_windows():
+    data = _random_dense(1)
+    raster = PackedRaster.fromDense(data)
+    for t_start in range(0, 20):
+        for t_stop in (t_start, t_start + 5, t_start + 8, 61):
+            window = raster.window(t_start, t_stop)
+            np.testing.assert_array_equal(window.toDense(), data[:, t_start:t_stop])
+            np.testing.assert_array_equal(window.counts(), data[:, t_start:t_stop].sum(axis=1))
+            np.testing.assert_array_equal(raster.windowCounts(t_start, t_stop), window.counts())
+
+
+def test_packed_raster_cumulative_counts():
+    data = _random_dense(2)
+    raster = PackedRaster.fromDense(data)
+    expected = np.zeros((data.shape[0], data.shape[1] + 1), dtype=np.int32)
+    np.cumsum(data, axis=1, out=expected[:, 1:])
+    np.testing.assert_array_equal(raster.cumulativeCounts(), expected)
+    np.testing.assert_array_equal((raster[1] | raster[2]).toDense(), data[1:2] | data[2:3])
+    np.testing.assert_array_equal((raster[1] & raster[2]).toDense(), data[1:2] & data[2:3])
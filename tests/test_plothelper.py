@@ -0,0 +1,98 @@
+import numpy as np
+from combra_loihi.plothelper import plothelper
+from combra_loihi.plothelper.plothelper import FiringRateCompute, FiringRateComputeGapSpikeTimes, MinMaxDecimate
+
+
+def _loop_firing_rate(data, window):
+    """
+    Per window loop of the original FiringRateCompute
+    """
+    fr_data = np.zeros((data.shape[0], data.shape[1] - window))
+    for num in range(data.shape[1] - window):
+        fr_data[:, num] = data[:, num:num + window].sum(axis=1) / (window / 1000.)
+    return fr_data, np.arange(data.shape[1] - window) + int(window / 2)
+
+
+def test_firing_rate_compute_matches_loop():
+    data = np.random.default_rng(0).random((3, 400)) < 0.05
+    for window in (1, 25, 250, 399):
+        fr_data, fr_x = FiringRateCompute(data, window)
+        loop_data, loop_x = _loop_firing_rate(data, window)
+        np.testing.assert_allclose(fr_data, loop_data)
+        np.testing.assert_array_equal(fr_x, loop_x)
+
+
+def test_firing_rate_compute_degenerate_windows():
+    data = np.zeros((2, 3), dtype=bool)
+    data[0, 1] = True
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fr_data, fr_x = FiringRateCompute(data, 0)
+        loop_data, loop_x = _loop_firing_rate(data, 0)
+    assert fr_data.shape == (2, 3) and np.isnan(fr_data).all()
+    np.testing.assert_array_equal(fr_x, loop_x)
+    fr_data, fr_x = FiringRateCompute(data, 3)
+    assert fr_data.shape == (2, 0) and fr_x.shape == (0,)
+
+
+def test_firing_rate_gap_spike_times():
+    fr_data, fr_x = FiringRateComputeGapSpikeTimes([np.array([2, 6, 6, 10]), np.array([5, 5]), np.array([3])], 20)
+    assert fr_data.shape == (3, 20)
+    np.testing.assert_array_equal(fr_x, np.arange(20))
+    np.testing.assert_allclose(fr_data[0, 2:10], 250.)
+    assert not fr_data[0, :2].any() and not fr_data[0, 10:].any()
+    assert not fr_data[1:].any()
+
+
+def test_min_max_decimate_keeps_bucket_extremes():
+    y = np.random.default_rng(1).normal(size=1003)
+    y[517] = 50.
+    index, y_decimated = MinMaxDecimate(y, 100)
+    assert index.shape[0] <= 2 * 100 + 2
+    assert (np.diff(index) > 0).all()
+    np.testing.assert_array_equal(y_decimated, y[index])
+    bucket_size = -(-1003 // 100)
+    for start in range(0, 1003, bucket_size):
+        bucket = y[start:start + bucket_size]
+        kept = y[index[(index >= start) & (index < start + bucket_size)]]
+        assert kept.min() == bucket.min() and kept.max() == bucket.max()
+    assert 517 in index
+
+
+def test_min_max_decimate_short_rows_and_figure_size():
+    y = np.arange(10)
+    index, y_decimated = MinMaxDecimate(y, 5)
+    np.testing.assert_array_equal(index, np.arange(10))
+    np.testing.assert_array_equal(y_decimated, y)
+    assert plothelper._FigureSize(3, 1000) == (2., 6)
+    assert plothelper._FigureSize(1000, 10 ** 7) == (plothelper.MAX_FIGURE_WIDTH, plothelper.MAX_FIGURE_HEIGHT)
+
+
+def test_voltage_figure_plots_decimated_rows():
+    data = np.random.default_rng(2).integers(0, 100, (2, 200000))
+    figure = plothelper._VoltageFigure('voltage', data, new_figure=plothelper._AggFigure)
+    buckets = int(figure.get_figwidth() * figure.dpi)
+    for ax in figure.axes:
+        (line,) = ax.get_lines()
+        assert line.get_xdata().shape[0] <= 2 * buckets + 2
+    assert figure.axes[1].get_lines()[0].get_ydata().max() == data[0].max()
+
+
+def test_raster_figure_modes():
+    data = (np.random.default_rng(3).random((5, 300)) < 0.1).astype(int)
+    image_figure = plothelper._RasterFigure('raster', data, 300, mode='image', new_figure=plothelper._AggFigure)
+    (image,) = image_figure.axes[0].get_images()
+    assert image.get_array().shape[0] == 5 and image.get_array().sum() == data.sum()
+    np.testing.assert_array_equal(image.get_array().sum(axis=1), data.sum(axis=1))
+    event_figure = plothelper._RasterFigure('raster', [np.nonzero(row)[0] for row in data], 300,
+                                            new_figure=plothelper._AggFigure)
+    assert len(event_figure.axes[0].collections) == 5 and not event_figure.axes[0].get_images()
+    # spikes after sim_time are not drawn
+    cut = plothelper._RasterFigure('raster', data, 150, mode='image', new_figure=plothelper._AggFigure)
+    assert cut.axes[0].get_images()[0].get_array().sum() == data[:, :150].sum()
+
+
+def test_raster_figure_auto_mode(monkeypatch):
+    data = (np.random.default_rng(4).random((4, 200)) < 0.2).astype(int)
+    monkeypatch.setattr(plothelper, 'RASTER_EVENT_LIMIT', int(data.sum()) - 1)
+    figure = plothelper._RasterFigure('raster', data, 200, new_figure=plothelper._AggFigure)
+    assert figure.axes[0].get_images()
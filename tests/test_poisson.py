@@ -0,0 +1,39 @@
+import numpy as np
+from combra_loihi.nan.poisson import poisson_spike_times, poisson_spike_trains
+
+
+def test_spike_times_layout():
+    indptr, times = poisson_spike_times(50, 2000, 20, rng=0, block=7)
+    assert indptr.shape == (51,) and indptr[0] == 0 and indptr[-1] == times.shape[0]
+    assert times.dtype == np.int32
+    for n in range(50):
+        row = times[indptr[n]:indptr[n + 1]]
+        assert (np.diff(row) > 0).all()
+        assert row.shape[0] == 0 or (row[0] >= 0 and row[-1] < 2000)
+
+
+def test_spike_times_rate():
+    indptr, times = poisson_spike_times(400, 5000, 20, rng=1)
+    rate = times.shape[0] / 400 / 5.
+    assert abs(rate - 20) < 1
+    """
+    one Bernoulli draw per ms: spikes per ms bin follow p = firing rate / 1000
+    """
+    _, counts = np.unique(times, return_counts=True)
+    assert abs(counts.mean() / 400 - 0.02) < 0.005
+
+
+def test_spike_times_high_rate_and_edges():
+    indptr, times = poisson_spike_times(3, 100, 1000, rng=2)
+    for n in range(3):
+        np.testing.assert_array_equal(times[indptr[n]:indptr[n + 1]], np.arange(100))
+    indptr, times = poisson_spike_times(4, 100, 0, rng=2)
+    assert times.shape == (0,) and (indptr == 0).all()
+
+
+def test_spike_trains_match_spike_times():
+    indptr, times = poisson_spike_times(10, 1000, 30, rng=3)
+    trains = poisson_spike_trains(10, 1000, 30, rng=3)
+    assert len(trains) == 10
+    for n in range(10):
+        np.testing.assert_array_equal(trains[n], times[indptr[n]:indptr[n + 1]])
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+nx = pytest.importorskip('nxsdk.api.n2a')
+from combra_loihi.astro.population import AstrocytePopulation  # noqa: E402
+
+
+def test_astrocyte_view_spike_generator_is_group():
+    net = nx.NxNet()
+    population = AstrocytePopulation(net, 3, ip3_sensitivity=np.array([0.1, 0.2, 0.3]))
+    view = population[1]
+    assert view is population[-2]
+    assert isinstance(view.astrocyte_setup[-1], nx.CompartmentGroup)
+    assert view._ip3Sensitivity == pytest.approx(0.2)
+    outputs = net.createCompartmentGroup(size=2)
+    view.connectOutputNeurons(outputs, 2)
+    assert view.astrocyte_output_conn is not None
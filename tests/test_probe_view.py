@@ -0,0 +1,52 @@
+import numpy as np
+from combra_loihi.astro.probe_view import ProbeView, compartment_probe_view
+
+
+class _CountingProbe:
+    """
+    Probe stand-in counting reads of its data
+    """
+    def __init__(self, data):
+        self._data = data
+        self.reads = 0
+
+    @property
+    def data(self):
+        self.reads += 1
+        return self._data
+
+
+def _view(rows=None):
+    rng = np.random.default_rng(0)
+    conditions = [[_CountingProbe(rng.integers(0, 9, (2, 12))) for _ in range(3)] for _ in range(2)]
+    return ProbeView(conditions, ['u', 'v'], rows=rows), conditions
+
+
+def test_probe_view_matches_probe_data():
+    view, conditions = _view()
+    expected = np.stack([np.concatenate([probe._data for probe in probes]) for probes in conditions], axis=1)
+    assert view.unit_num == 6
+    np.testing.assert_array_equal(view.data(), expected)
+    np.testing.assert_array_equal(view.data(slice(1, 5), ['v'], slice(3, 7)),
+                                  expected[1:5, 1:2, 3:7])
+    np.testing.assert_array_equal(view[2:4, 1:], expected[2:4, 1:])
+
+
+def test_probe_view_reads_each_probe_once():
+    view, conditions = _view()
+    for _ in range(3):
+        view[0:1]
+        view.data(slice(3, 6), [1])
+    assert view.unit_num == 6
+    assert all(probe.reads == 1 for probes in conditions for probe in probes)
+    view.refresh()
+    view[0:1]
+    assert all(probe.reads == 2 for probes in conditions for probe in probes)
+
+
+def test_probe_view_unit_num_from_rows():
+    view, conditions = _view(rows=[2, 2, 2])
+    assert view.unit_num == 6
+    assert all(probe.reads == 0 for probes in conditions for probe in probes)
+    view = compartment_probe_view([_CountingProbe(np.zeros((4, 5)))], ['SPIKE'], unit_num=4)
+    assert view.unit_num == 4 and view.probes[0][0].reads == 0
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+import numpy as np
+from combra_loihi.astro import prototypes
+from combra_loihi.astro.prototypes import PrototypeRegistry, prototype_groups
+
+
+def _sg_parameters(vth, current_decay=409, voltage_decay=40):
+    return SimpleNamespace(sgVThMant=vth, sgCurrentDecay=current_decay, sgVoltageDecay=voltage_decay)
+
+
+def test_prototype_groups_scalars():
+    values, prototype_map = prototype_groups('sg', _sg_parameters(5000), 4)
+    assert values == [(5000, 409, 40)]
+    np.testing.assert_array_equal(prototype_map, [0, 0, 0, 0])
+
+
+def test_prototype_groups_reconstructs_parameters():
+    vth = np.array([7, 5, 7, 6, 5, 7])
+    voltage_decay = np.array([40, 40, 40, 41, 40, 40])
+    values, prototype_map = prototype_groups('sg', _sg_parameters(vth, voltage_decay=voltage_decay), 6)
+    assert len(values) == len(set(values)) == 3
+    assert prototype_map.shape == (6,)
+    rebuilt = np.array(values)[prototype_map]
+    np.testing.assert_array_equal(rebuilt, np.stack([vth, np.full(6, 409), voltage_decay], axis=1))
+
+
+def test_prototype_registry_shares_equal_keys(monkeypatch):
+    monkeypatch.setattr(prototypes, '_new_prototype', lambda role, values: (role, values))
+    registry = PrototypeRegistry()
+    values, _ = prototype_groups('sg', _sg_parameters(np.array([5.0, 6.0, 5.0])), 3)
+    first = registry.get('sg', values[0])
+    assert registry.get('sg', (np.int64(5), 409, 40)) is first
+    registry.get('sg', values[1])
+    registry.get('sic', (40, 40))
+    counts = registry.counts()
+    assert counts['sg'] == 2 and counts['sic'] == 1 and counts['sr'] == 0
+    assert registry.numCompartmentPrototypes() == 3
@@ -0,0 +1,116 @@
+import numpy as np
+import scipy.sparse as sp
+from combra_loihi.analysis import resources
+from combra_loihi.analysis.resources import feedforward_nan_description, estimate_resources
+
+
+def _reference_occupancy(description):
+    """
+    Compartment by compartment greedy packing, columns 0, 1, 2 and 4 of core_occupancy
+    """
+    groups = description.groups
+    sources = {}
+    compartments = {}
+    for name in description.group_order:
+        sources[name] = sum(groups[other]['size'] for other in sources)
+        if not groups[name]['spike_generator']:
+            compartments[name] = sum(groups[other]['size'] for other in compartments)
+    compartment_num = sum(groups[name]['size'] for name in compartments)
+    source_num = sum(groups[name]['size'] for name in sources)
+    synapses = sp.lil_matrix((compartment_num, source_num), dtype=np.int8)
+    bits = np.zeros(compartment_num, dtype=np.int64)
+    for connection in description.connections:
+        mask = connection['mask']
+        row, col = compartments[connection['destination']], sources[connection['source']]
+        synapses[row:row + mask.shape[0], col:col + mask.shape[1]] = mask
+        bits[row:row + mask.shape[0]] += np.diff(mask.indptr) * (connection['weight_bits'] + 10)
+    synapses = synapses.tocsr()
+    group = np.concatenate([np.full(groups[name]['size'], num) for num, name in enumerate(compartments)])
+    prototypes = [groups[name]['prototypes'] for name in compartments]
+    cores = []
+    seen = set()
+    for compartment in range(compartment_num):
+        inputs = set(synapses.indices[synapses.indptr[compartment]:synapses.indptr[compartment + 1]].tolist())
+        new_prototypes = prototypes[group[compartment]] if compartment == 0 or \
+            group[compartment] != group[compartment - 1] else 0
+        if cores and cores[-1][0] > 0 and (
+                cores[-1][0] == resources.CORE_COMPARTMENTS
+                or cores[-1][1] + bits[compartment] > resources.CORE_SYNAPSE_BITS
+                or cores[-1][2] + len(inputs - seen) > resources.CORE_INPUT_AXONS
+                or cores[-1][3] + new_prototypes > resources.CORE_COMPARTMENT_PROTOTYPES):
+            cores.append([0, 0, 0, 0])
+            seen = set()
+            new_prototypes = prototypes[group[compartment]]
+        if not cores:
+            cores.append([0, 0, 0, 0])
+        cores[-1][0] += 1
+        cores[-1][1] += bits[compartment]
+        cores[-1][2] += len(inputs - seen)
+        cores[-1][3] += new_prototypes
+        seen |= inputs
+    limits = [resources.CORE_COMPARTMENTS, resources.CORE_SYNAPSE_BITS, resources.CORE_INPUT_AXONS,
+              resources.CORE_COMPARTMENT_PROTOTYPES]
+    return np.array(cores, dtype=np.float64) / limits
+
+
+def _random_mask(rng, shape, num):
+    return sp.csr_matrix((np.ones(num), (rng.integers(0, shape[0], num), rng.integers(0, shape[1], num))),
+                         shape=shape)
+
+
+def test_packing_matches_greedy_reference():
+    rng = np.random.default_rng(0)
+    for pre_num, post_num, synapse_num, astrocytes, prototypes in (
+            (20, 20, 40, 1, None),
+            (6000, 300, 1000000, 3, None),
+            (3000, 2500, 200000, 40, {'sr': 20, 'ip3': 9, 'sic': 30, 'sg': 5}),
+            (10, 3000, 60, 1500, {'sr': 33})):
+        description = feedforward_nan_description(
+            pre_num, post_num, _random_mask(rng, (post_num, pre_num), synapse_num),
+            _random_mask(rng, (astrocytes, pre_num), 4 * pre_num),
+            _random_mask(rng, (post_num, astrocytes), 4 * post_num), astrocytes, prototypes)
+        occupancy = estimate_resources(description)['core_occupancy']
+        np.testing.assert_allclose(occupancy[:, [0, 1, 2, 4]], _reference_occupancy(description))
+
+
+def _reference_output_axons(description, core_bounds):
+    """
+    Distinct destination cores of every source compartment, summed over the cores of the sources
+    """
+    groups = description.groups
+    compartments = {}
+    for name in description.group_order:
+        if not groups[name]['spike_generator']:
+            compartments[name] = sum(groups[other]['size'] for other in compartments)
+    core_of_compartment = np.repeat(np.arange(len(core_bounds) - 1), np.diff(core_bounds))
+    sources = []
+    destinations = []
+    for connection in description.connections:
+        if connection['source'] not in compartments:
+            continue
+        coo = connection['mask'].tocoo()
+        sources.append(compartments[connection['source']] + coo.col)
+        destinations.append(core_of_compartment[compartments[connection['destination']] + coo.row])
+    pairs = set(zip(np.concatenate(sources).tolist(), np.concatenate(destinations).tolist()))
+    output_axons = np.zeros(len(core_bounds) - 1)
+    for source, _ in pairs:
+        output_axons[core_of_compartment[source]] += 1
+    return output_axons
+
+
+def test_packing_limits_output_axons():
+    description = resources.NetworkDescription()
+    description.addGroup('a', 1200)
+    description.addGroup('b', 2000)
+    description.addConnection('a_2_b', 'a', 'b', 1)
+    description.addConnection('b_2_a', 'b', 'a', _random_mask(np.random.default_rng(1), (1200, 2000), 5000))
+    report = estimate_resources(description)
+    occupancy = report['core_occupancy']
+    assert (occupancy <= 1).all()
+    core_bounds = np.zeros(report['cores'] + 1, dtype=np.int64)
+    np.cumsum(np.rint(occupancy[:, 0] * resources.CORE_COMPARTMENTS).astype(np.int64), out=core_bounds[1:])
+    np.testing.assert_allclose(occupancy[:, 3] * resources.CORE_OUTPUT_AXONS,
+                               _reference_output_axons(description, core_bounds))
+    # every compartment of a reaches all cores of b, without the output axon limit a would fill 2 cores
+    a_cores = np.searchsorted(core_bounds, 1200)
+    assert a_cores > 2 and occupancy[:a_cores, 3].max() > 0.9
@@ -0,0 +1,123 @@
+import numpy as np
+from combra_loihi.nan.segmented import SegmentedRun, SpikeTimesInput, PoissonInput
+from combra_loihi.recording import ProbeRecorder, Recording
+
+
+class RecordingNet:
+    """
+    Stand-in of nx.NxNet recording every run call, its probes record the timestep of every column
+    """
+    def __init__(self):
+        self.time = 0
+        self.runs = []
+        self.probes = []
+
+    def run(self, steps):
+        self.runs.append((self.time, steps))
+        for probe in self.probes:
+            probe.extend(self.time, steps)
+        self.time += steps
+
+
+class RecordingProbe:
+    def __init__(self, net, rows=2):
+        self.rows = rows
+        self.columns = []
+        net.probes.append(self)
+
+    def extend(self, t_start, steps):
+        self.columns.extend(range(t_start, t_start + steps))
+
+    @property
+    def data(self):
+        return np.tile(np.array(self.columns, dtype=np.int64), (self.rows, 1))
+
+
+class ClearableProbe(RecordingProbe):
+    def __init__(self, net, rows=2):
+        super().__init__(net, rows)
+        self.clears = 0
+
+    def clear(self):
+        self.columns = []
+        self.clears += 1
+
+
+class RecordingSpikeGen:
+    def __init__(self):
+        self.calls = []
+
+    def addSpikes(self, spikeInputPortNodeIds, spikeTimes):
+        self.calls.append((list(spikeInputPortNodeIds), [np.asarray(times) for times in spikeTimes]))
+
+
+def _collect(chunks):
+    def sink(name, t_start, t_stop, data):
+        chunks.setdefault(name, []).append((t_start, t_stop, data))
+    return sink
+
+
+def test_chunk_boundaries_and_cursor():
+    net = RecordingNet()
+    probes = {'plain': RecordingProbe(net), 'clearable': ClearableProbe(net)}
+    chunks = {}
+    driver = SegmentedRun(net, probes, _collect(chunks), chunk=300)
+    driver.run(700)
+    driver.run(250)
+    assert net.runs == [(0, 300), (300, 300), (600, 100), (700, 250)]
+    for name in probes:
+        assert [(t_start, t_stop) for t_start, t_stop, _ in chunks[name]] == [(0, 300), (300, 600),
+                                                                                (600, 700), (700, 950)]
+        for t_start, t_stop, data in chunks[name]:
+            assert data.shape == (2, t_stop - t_start)
+            np.testing.assert_array_equal(data[0], np.arange(t_start, t_stop))
+    """
+    the plain probe keeps its trace and is read past the cursor, the clearable one is emptied
+    """
+    assert driver.cursor['plain'] == 950
+    assert len(probes['plain'].columns) == 950
+    assert driver.cursor['clearable'] == 0
+    assert probes['clearable'].clears == 4
+    assert probes['clearable'].columns == []
+
+
+def test_spike_times_windows():
+    net = RecordingNet()
+    spike_gen = RecordingSpikeGen()
+    spike_times = [np.array([0, 99, 100, 250]), np.array([], dtype=np.int64), np.array([150, 299])]
+    driver = SegmentedRun(net, {}, _collect({}), inputs=[SpikeTimesInput(spike_gen, spike_times)], chunk=100)
+    driver.run(300)
+    ports = [call[0] for call in spike_gen.calls]
+    windows = [[times.tolist() for times in call[1]] for call in spike_gen.calls]
+    assert ports == [[0], [0, 2], [0, 2]]
+    assert windows == [[[0, 99]], [[100], [150]], [[250], [299]]]
+
+
+def test_poisson_windows():
+    net = RecordingNet()
+    spike_gen = RecordingSpikeGen()
+    driver = SegmentedRun(net, {}, _collect({}), inputs=[PoissonInput(spike_gen, 10, 50, rng=0)], chunk=200)
+    driver.run(1000)
+    assert len(spike_gen.calls) == 5
+    for num, (ports, windows) in enumerate(spike_gen.calls):
+        for times in windows:
+            assert ((num * 200 <= times) & (times < (num + 1) * 200)).all()
+
+
+def test_probe_recorder_sink(tmp_path, monkeypatch):
+    writes = []
+    write_manifest = ProbeRecorder._writeManifest
+    monkeypatch.setattr(ProbeRecorder, '_writeManifest', lambda self: writes.append(1) or write_manifest(self))
+    net = RecordingNet()
+    probes = {'ip3_v': RecordingProbe(net, rows=1), 'post_s': RecordingProbe(net, rows=3)}
+    driver = SegmentedRun(net, probes, ProbeRecorder(str(tmp_path)), chunk=100,
+                          probe_info={'ip3_v': (5, 'ip3'), 'post_s': (None, 'post')})
+    driver.run(1000)
+    assert len(writes) == 3
+    recording = Recording(str(tmp_path))
+    assert (recording.info('ip3_v')['condition'], recording.info('ip3_v')['role']) == (5, 'ip3')
+    assert recording.info('post_s')['role'] == 'post'
+    assert len(recording.info('post_s')['chunks']) == 10
+    driver.sink.consolidate()
+    recording = Recording(str(tmp_path))
+    np.testing.assert_array_equal(recording['post_s'], probes['post_s'].data)
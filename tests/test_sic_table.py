@@ -0,0 +1,63 @@
+import numpy as np
+from combra_loihi.astro import sic_table
+from combra_loihi.astro.sic_table import calculate_sic_props_batch, load_sic_table
+
+
+def _linear_scan(configs, firing_rate, window_size):
+    """
+    Original smart setup scan: starts from row 15 and keeps the first strictly better row
+    """
+    cost = np.power(configs[:, 2] - firing_rate, 2) + np.power(configs[:, 3] - window_size, 2)
+    row = 15 if cost[15] == cost.min() else int(cost.argmin())
+    return configs[row, 0], configs[row, 1]
+
+
+def test_batch_lookup_matches_linear_scan():
+    configs = np.asarray(load_sic_table().configs)
+    rng = np.random.default_rng(0)
+    rates = np.concatenate((rng.integers(0, sic_table.MAX_SIC_FIRING_RATE + 1, 3000), [0, 356, 0, 356]))
+    windows = np.concatenate((rng.integers(0, sic_table.MAX_SIC_WINDOW + 1, 3000), [0, 0, 608, 608]))
+    weight, sic_decay = calculate_sic_props_batch(rates, windows)
+    for num in range(rates.shape[0]):
+        assert (weight[num], sic_decay[num]) == _linear_scan(configs, rates[num], windows[num])
+
+
+def test_batch_lookup_keeps_shape():
+    weight, sic_decay = calculate_sic_props_batch(np.full((2, 3), 100), np.full((2, 3), 300))
+    assert weight.shape == (2, 3) and sic_decay.shape == (2, 3)
+
+
+def _extended_rows(rates, windows):
+    """
+    (firing rate, window) reached by the extended table rows chosen for each query
+    """
+    index = sic_table.load_extended_sic_table()
+    rows = index.configs[index.query(rates, windows)]
+    return rows[:, 2], rows[:, 3]
+
+
+def test_extended_lookup_accuracy():
+    index = sic_table.load_extended_sic_table()
+    max_rate, max_window = index.limits
+    points = index.points[(index.points[:, 0] <= max_rate) & (0 <= index.points[:, 1])
+                          & (index.points[:, 1] <= max_window)]
+    rng = np.random.default_rng(0)
+    points = points[rng.choice(points.shape[0], 2000, replace=False)]
+    """
+    queries within 1% of the range of a reachable point resolve within 1.5% of the range on both axes
+    """
+    rates = points[:, 0] + rng.uniform(-0.01, 0.01, points.shape[0]) * max_rate
+    windows = points[:, 1] + rng.uniform(-0.01, 0.01, points.shape[0]) * max_window
+    found_rates, found_windows = _extended_rows(rates, windows)
+    assert (np.abs(found_rates - rates) <= 0.015 * max_rate).all()
+    assert (np.abs(found_windows - windows) <= 0.015 * max_window).all()
+
+
+def test_extended_lookup_does_not_sacrifice_rate_to_window():
+    found_rates, found_windows = _extended_rows([800, 500], [100, 1000])
+    assert abs(found_rates[0] - 800) <= 20
+    assert (found_rates[1], found_windows[1]) == (500, 1000)
+
+
+def test_sic_limits_follow_build_target():
+    assert sic_table.sic_limits() == tuple(sic_table.load_extended_sic_table().limits)
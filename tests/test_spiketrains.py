@@ -0,0 +1,43 @@
+import numpy as np
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+
+
+def _random_dense(seed=0, neurons=7, time_steps=53):
+    data = (np.random.default_rng(seed).random((neurons, time_steps)) < 0.2).astype(int)
+    data[2] = 0
+    return data
+
+
+def test_spike_trains_round_trips():
+    data = _random_dense()
+    spike_trains = SpikeTrains.fromDense(data)
+    assert spike_trains.shape == data.shape
+    np.testing.assert_array_equal(spike_trains.toDense(), data)
+    np.testing.assert_array_equal(spike_trains.counts(), data.sum(axis=1))
+    spike_times = spike_trains.toSpikeTimes()
+    assert len(spike_times) == data.shape[0]
+    for num, times in enumerate(spike_times):
+        np.testing.assert_array_equal(times, np.nonzero(data[num])[0])
+        np.testing.assert_array_equal(spike_trains[num], times)
+    np.testing.assert_array_equal(SpikeTrains.fromSpikeTimes(spike_times, data.shape[1]).toDense(), data)
+    indptr, times = spike_trains.toIndptr()
+    np.testing.assert_array_equal(SpikeTrains.fromIndptr(indptr, times, data.shape[1]).toDense(), data)
+
+
+def test_spike_trains_window_and_subset():
+    data = _random_dense(1)
+    spike_trains = SpikeTrains.fromDense(data)
+    for t_start, t_stop in ((0, 53), (5, 17), (17, 17), (40, 80)):
+        window = spike_trains.window(t_start, t_stop)
+        np.testing.assert_array_equal(window.toDense(), data[:, t_start:min(t_stop, 53)])
+        indptr, times = window.toIndptr()
+        assert indptr[-1] == window.counts().sum() and (times >= window.t_start).all()
+    subset = spike_trains[[4, 0, 2]]
+    np.testing.assert_array_equal(subset.toDense(), data[[4, 0, 2]])
+    np.testing.assert_array_equal(spike_trains[1:3].window(8, 30).toDense(), data[1:3, 8:30])
+
+
+def test_spike_trains_from_list():
+    spike_trains = SpikeTrains.fromDense([0, 1, 0, 1, 1])
+    assert spike_trains.shape == (1, 5)
+    np.testing.assert_array_equal(spike_trains[0], [1, 3, 4])
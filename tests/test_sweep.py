@@ -0,0 +1,43 @@
+import json
+import os
+import numpy as np
+import pytest
+from combra_loihi.sweep import grid_spec, random_spec, point_key, run_point, run_sweep, SUMMARY_FIELDS
+
+SMALL = dict(pre_num=10, post_num=5, sim_time=300)
+
+
+def test_point_key_numpy_values():
+    configs = grid_spec(pre_fr=list(np.arange(10, 30, 10)), post_vth=[100])
+    assert point_key(configs[0], 0) == point_key({'pre_fr': 10, 'post_vth': 100}, 0)
+    assert point_key(configs[0], 0) != point_key(configs[1], 0)
+    for config in random_spec(3, seed=0, pre_fr=np.array([10, 20]), pre_post_w=(10, 30)):
+        point_key(config, 0)
+    assert run_point(dict(SMALL, pre_fr=np.int64(20)), 0) == run_point(dict(SMALL, pre_fr=20), 0)
+
+
+def test_run_point_rejects_half_sic_spec():
+    with pytest.raises(ValueError):
+        run_point(dict(SMALL, sic_amplitude=100), 0)
+    with pytest.raises(ValueError):
+        run_point(dict(SMALL, sic_window=300), 0)
+
+
+def test_run_sweep_cache_hits(tmp_path):
+    configs = [dict(SMALL, pre_fr=int(pre_fr)) for pre_fr in np.array([10, 40])]
+    results = run_sweep(configs, str(tmp_path), seeds=(0, 1), max_workers=1)
+    assert results.shape == (4,)
+    cached = [name for name in os.listdir(str(tmp_path)) if name.endswith('.json')]
+    assert len(cached) == 4
+    """
+    a second sweep reads every point from the cache, marked summaries prove no point ran again
+    """
+    for name in cached:
+        path = os.path.join(str(tmp_path), name)
+        with open(path) as file:
+            point = json.load(file)
+        point['summary'] = {field: -1 for field in SUMMARY_FIELDS}
+        with open(path, 'w') as file:
+            json.dump(point, file)
+    results = run_sweep(configs, str(tmp_path), seeds=(0, 1), max_workers=1)
+    assert (results['sg_spikes'] == -1).all() and (results['post_fr'] == -1).all()
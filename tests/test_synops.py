@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+import numpy as np
+import scipy.sparse as sp
+from combra_loihi.analysis.resources import feedforward_nan_description
+from combra_loihi.analysis.synops import synaptic_ops, feedforward_nan_synops
+from combra_loihi.plothelper.packedraster import PackedRaster
+from combra_loihi.plothelper.spiketrains import SpikeTrains
+
+
+def _brute_force_ops(mask, spikes):
+    """
+    Loop over synapses and time steps of a dense mask (destination x source)
+    """
+    ops = np.zeros(spikes.shape[1], dtype=np.int64)
+    for _, source in zip(*np.nonzero(mask)):
+        for t in range(spikes.shape[1]):
+            ops[t] += spikes[source, t]
+    return ops
+
+
+def _network(rng, pre_num=30, post_num=12, astrocytes=2):
+    pre_post = rng.random((post_num, pre_num)) < 0.3
+    astro_input = rng.random((astrocytes, pre_num)) < 0.5
+    astro_output = rng.random((post_num, astrocytes)) < 0.5
+    description = feedforward_nan_description(pre_num, post_num, pre_post, sp.csr_matrix(astro_input),
+                                              astro_output, astrocytes)
+    return description, pre_post, astro_input, astro_output
+
+
+def test_synaptic_ops_match_brute_force():
+    rng = np.random.default_rng(0)
+    description, pre_post, astro_input, astro_output = _network(rng)
+    pre = (rng.random((30, 40)) < 0.2).astype(int)
+    sg = (rng.random((2, 40)) < 0.3).astype(int)
+    for pre_spikes in (pre, SpikeTrains.fromDense(pre), PackedRaster.fromDense(pre)):
+        report = synaptic_ops(description, {'pre': pre_spikes, 'astro_sg': sg})
+        np.testing.assert_array_equal(report['ops']['pre_2_post'], _brute_force_ops(pre_post, pre))
+        np.testing.assert_array_equal(report['ops']['astro_input'], _brute_force_ops(astro_input, pre))
+        np.testing.assert_array_equal(report['ops']['astro_output'], _brute_force_ops(astro_output, sg))
+        assert 'astro_sr2ip3' not in report['ops']
+        total = report['ops']['pre_2_post'] + report['ops']['astro_input'] + report['ops']['astro_output']
+        np.testing.assert_array_equal(report['total'], total)
+        assert report['peak']['pre_2_post'] == report['ops']['pre_2_post'].max()
+        assert report['peak_step']['pre_2_post'] == report['ops']['pre_2_post'].argmax()
+        np.testing.assert_array_equal(report['spikes']['pre'], pre.sum(axis=0))
+
+
+def test_synaptic_ops_time_steps():
+    rng = np.random.default_rng(1)
+    description, pre_post, _, _ = _network(rng)
+    pre = (rng.random((30, 40)) < 0.2).astype(int)
+    short = synaptic_ops(description, {'pre': pre}, time_steps=25)
+    np.testing.assert_array_equal(short['ops']['pre_2_post'], _brute_force_ops(pre_post, pre[:, :25]))
+    long = synaptic_ops(description, {'pre': SpikeTrains.fromDense(pre).window(10, 40)}, time_steps=50)
+    expected = np.zeros(50, dtype=np.int64)
+    expected[:30] = _brute_force_ops(pre_post, pre[:, 10:])
+    np.testing.assert_array_equal(long['ops']['pre_2_post'], expected)
+
+
+def test_feedforward_nan_synops():
+    rng = np.random.default_rng(2)
+    pre_post = (rng.random((12, 30)) < 0.3).astype(int)
+    pre = (rng.random((30, 40)) < 0.2).astype(int)
+    astrocyte = SimpleNamespace(astrocyte_input_mask=None, astrocyte_output_mask=None)
+    nan = SimpleNamespace(pre_num=30, post_num=12, pre_2_post_mask=pre_post, astrocyte=astrocyte, sim_time=40,
+                          poisson_spike=SpikeTrains.fromDense(pre))
+    report = feedforward_nan_synops(nan, astrocyte_spikes=np.ones((1, 40), dtype=int))
+    np.testing.assert_array_equal(report['ops']['pre_2_post'], _brute_force_ops(pre_post, pre))
+    np.testing.assert_array_equal(report['ops']['astro_input'], pre.sum(axis=0))
+    np.testing.assert_array_equal(report['ops']['astro_output'], np.full(40, 12))
@@ -0,0 +1,30 @@
+import numpy as np
+from combra_loihi.nan.territory import block_territories, window_territories
+
+
+def _windows(mask):
+    return [mask.indices[mask.indptr[row]:mask.indptr[row + 1]].tolist() for row in range(mask.shape[0])]
+
+
+def test_exact_cover():
+    mask = block_territories(30, 10)
+    assert mask.shape == (3, 30)
+    assert _windows(mask) == [list(range(0, 10)), list(range(10, 20)), list(range(20, 30))]
+
+
+def test_last_block_smaller():
+    assert _windows(block_territories(25, 10))[-1] == list(range(20, 25))
+
+
+def test_overlapping_windows():
+    mask = window_territories(20, 8, 4)
+    assert _windows(mask) == [list(range(start, min(start + 8, 20))) for start in (0, 4, 8, 12)]
+    assert mask.dtype == np.int8
+
+
+def test_stride_larger_than_size():
+    mask = window_territories(105, 10, 30)
+    assert mask.shape == (4, 105)
+    assert _windows(mask) == [list(range(start, start + 10)) for start in (0, 30, 60, 90)]
+    mask = window_territories(125, 10, 30)
+    assert _windows(mask)[-1] == list(range(120, 125))